@@ -5,28 +5,223 @@ import time
 import logging
 import urllib3
 
-from config import BASE_API_URL, MAIN_SITE_CHECK_URL, MAX_RETRIES, MAX_BACKOFF_DELAY, SESSION
+from config import BASE_API_URL, MAIN_SITE_CHECK_URL, MAX_RETRIES, MAX_BACKOFF_DELAY, SESSION, HTTP_KEEP_WARM_INTERVAL_SECONDS, REQUEST_GOVERNOR, RESPONSE_CACHE, REQUEST_COALESCER, ADAPTIVE_TIMEOUTS, SITE_CHECK_TIMEOUT
+from http_transport import keep_connection_warm, POOL_STATS
+from pdf_download import write_base64_pdf
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 logger = logging.getLogger(__name__)
 
+# محللات JSON المتاحة، بترتيب الأفضلية. كلها تقرأ bytes مباشرة (دون تحويل الاستجابة إلى نص أولاً)
+# وتطلق ValueError (أو فئة فرعية منه) عند فشل التحليل.
+def _stdlib_json_loads(content):
+    # json.loads(bytes) يكتشف الترميز أولاً وهو أبطأ؛ الخادم يرسل UTF-8 دائمًا
+    return json.loads(content.decode('utf-8'))
+
+
+JSON_DECODERS = {}
+if orjson is not None:
+    JSON_DECODERS['orjson'] = orjson.loads
+if ujson is not None:
+    JSON_DECODERS['ujson'] = ujson.loads
+JSON_DECODERS['json'] = _stdlib_json_loads
+
+_json_decoder_name = next(iter(JSON_DECODERS))
+_decode_json_bytes = JSON_DECODERS[_json_decoder_name]
+
+
+def get_json_decoder():
+    """Name of the JSON decoder used for API responses ("orjson", "ujson" or "json")."""
+    return _json_decoder_name
+
+
+def set_json_decoder(name):
+    """Switches the JSON decoder used for API responses. Raises ValueError if it is not installed."""
+    global _json_decoder_name, _decode_json_bytes
+    if name not in JSON_DECODERS:
+        raise ValueError(f"JSON decoder '{name}' is not available (available: {', '.join(JSON_DECODERS)})")
+    _json_decoder_name = name
+    _decode_json_bytes = JSON_DECODERS[name]
+    logger.info(f"محلل JSON لاستجابات الخادم: {name}")
+
+
+def decode_response_json(response):
+    """Decodes the JSON body of a response from its raw bytes. Raises ValueError on invalid JSON."""
+    return _decode_json_bytes(response.content)
+
+
+_SUPPORTED_METHODS = ('GET', 'POST')
+_RDV_CREATE_ENDPOINT = 'RendezVous/Create'
+_SITE_CHECK_TIMEOUT_KEY = 'site_check' # مفتاح زمن استجابة فحص الموقع في ADAPTIVE_TIMEOUTS
+_RESPONSE_EXCERPT_LENGTH = 200
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+# نتيجة تصنيف الاستجابة
+_OUTCOME_DONE, _OUTCOME_RETRY, _OUTCOME_RETRY_429 = range(3)
+
+
+def _response_excerpt(response):
+    return response.text[:_RESPONSE_EXCERPT_LENGTH] if response is not None else 'N/A'
+
+
+def _describe_request_exception(e, url):
+    """(message, log level, retryable) for an exception raised while sending the request."""
+    if isinstance(e, requests.exceptions.SSLError):
+        return f"خطأ SSL عند الاتصال بـ {url}: {str(e)}", logging.ERROR, True
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return f"انتهت مهلة الاتصال بالخادم ({url}): {str(e)}", logging.WARNING, True
+    if isinstance(e, requests.exceptions.ReadTimeout):
+        return f"انتهت مهلة القراءة من الخادم ({url}): {str(e)}", logging.WARNING, True
+    if isinstance(e, requests.exceptions.Timeout): # هذا يشمل ConnectTimeout و ReadTimeout بشكل عام
+        return f"انتهت مهلة الطلب لـ {url}: {str(e)}", logging.WARNING, True
+    if isinstance(e, requests.exceptions.ConnectionError):
+        return f"خطأ في الاتصال بالخادم ({url}): {str(e)}", logging.ERROR, True
+    return f"خطأ عام في الطلب لـ {url}: {str(e)}", logging.ERROR, False
+
 
 class AnemAPIClient:
     def __init__(self, initial_backoff_general, initial_backoff_429, request_timeout):
         self.session = SESSION
+        self.governor = REQUEST_GOVERNOR # مشترك بين كل العملاء: سقف الطلبات والتهدئة بعد 429
+        self.response_cache = RESPONSE_CACHE # مشترك بين كل العملاء: استجابات GET الحديثة
+        self.request_coalescer = REQUEST_COALESCER # مشترك بين كل العملاء: طلبات GET المتطابقة المتزامنة
+        self.adaptive_timeouts = ADAPTIVE_TIMEOUTS # مشترك بين كل العملاء: المهلة حسب زمن الاستجابة المرصود
         self.base_url = BASE_API_URL
         self.initial_backoff_general = initial_backoff_general
         self.initial_backoff_429 = initial_backoff_429
         self.request_timeout = request_timeout
+        self._request_headers_by_key = {}
+
+
+    def _request_headers(self, method, extra_headers):
+        """
+        Headers sent on top of the session headers (requests merges the two), built once
+        per method / extra headers instead of copying the session headers on every call.
+        """
+        key = (method, tuple(extra_headers.items()) if extra_headers else ())
+        headers = self._request_headers_by_key.get(key)
+        if headers is None:
+            headers = dict(extra_headers) if extra_headers else {}
+            if method == 'POST':
+                headers['Content-Type'] = 'application/json'
+            self._request_headers_by_key[key] = headers
+        return headers
+
+    def _classify_response(self, response, endpoint, url, log_prefix, attempt_label, is_site_check, stream_handler=None):
+        """
+        Single classification step for a received response.
+        Returns (outcome, result, error_message): with _OUTCOME_DONE the caller returns
+        (result, error_message); with _OUTCOME_RETRY / _OUTCOME_RETRY_429 error_message is
+        the error to remember before the next attempt. A successful response is handed
+        to stream_handler (if given) instead of being decoded as JSON.
+        """
+        status_code = response.status_code
+        if status_code == 429:
+            return _OUTCOME_RETRY_429, None, "طلبات كثيرة جدًا (429)"
+
+        if status_code >= 400:
+            try:
+                response.raise_for_status()
+                http_error_text = f"{status_code}"
+            except requests.exceptions.HTTPError as e:
+                http_error_text = str(e)
+            error_message = f"خطأ HTTP {status_code} من الخادم لـ {url}: {http_error_text}"
+            if is_site_check:
+                return _OUTCOME_DONE, False, error_message
+            excerpt = _response_excerpt(response)
+            logger.error(f"{log_prefix} ({attempt_label}): {error_message}. الاستجابة: {excerpt}")
 
-
-    def _make_request(self, method, endpoint, params=None, data=None, extra_headers=None, is_site_check=False):
+            if endpoint == _RDV_CREATE_ENDPOINT:
+                try:
+                    parsed_error_json = decode_response_json(response)
+                except ValueError:
+                    http_text_error_detail = f"خطأ من الخادم ({status_code}) مع استجابة نصية."
+                    logger.warning(f"استجابة نصية غير JSON لخطأ HTTP من {url}: {excerpt}")
+                    logger.error(f"الطلب إلى {url} فشل بخطأ HTTP مع استجابة نصية. الرسالة المُعادة: {http_text_error_detail}")
+                    return _OUTCOME_DONE, {"raw_text": response.text, "http_status_code": status_code}, http_text_error_detail
+                if isinstance(parsed_error_json, dict) and parsed_error_json.get("Eligible") is False:
+                    logger.warning(f"استجابة خطأ HTTP من {url} ولكنها JSON مع Eligible:false. الاستجابة: {parsed_error_json}")
+                    return _OUTCOME_DONE, parsed_error_json, None
+                # إذا لم يكن Eligible:false، فهو خطأ حقيقي
+                http_json_error_detail = f"خطأ من الخادم ({status_code}) مع تفاصيل JSON."
+                logger.error(f"الطلب إلى {url} فشل بخطأ HTTP مع تفاصيل JSON. الرسالة المُعادة: {http_json_error_detail}")
+                return _OUTCOME_DONE, parsed_error_json, http_json_error_detail
+            return _OUTCOME_RETRY, None, error_message
+
+        if is_site_check:
+            return _OUTCOME_DONE, True, None
+
+        if stream_handler is not None:
+            try:
+                return _OUTCOME_DONE, stream_handler(response), None
+            except requests.exceptions.RequestException as e:
+                # انقطاع أثناء قراءة جسم الاستجابة: يُعاد الطلب كخطأ اتصال
+                error_message = f"انقطع الاتصال أثناء تحميل البيانات من {url}: {str(e)}"
+                logger.warning(f"{log_prefix} ({attempt_label}): {error_message}")
+                return _OUTCOME_RETRY, None, error_message
+
+        try:
+            json_response = decode_response_json(response)
+        except ValueError:
+            excerpt = _response_excerpt(response)
+            json_decode_error_msg_short = "خطأ في تحليل البيانات المستلمة من الخادم (ليست JSON)."
+            logger.error(f"خطأ في تحليل استجابة JSON من {url}. الاستجابة (أول 200 حرف): {excerpt}")
+
+            if endpoint == _RDV_CREATE_ENDPOINT and response.text:
+                logger.warning(f"استجابة نصية غير JSON من {url} ولكنها تحتوي على نص: {excerpt}")
+                if "\"Eligible\":false" in response.text.lower():
+                    message_from_text = "نعتذر منكم! لا يمكنكم حجز موعد للاستفادة من منحة البطالة لعدم استيفائكم لأحد شروط الأهلية اللازمة."
+                    constructed_response = {"Eligible": False, "message": message_from_text, "raw_text": True}
+                    logger.info(f"تم بناء استجابة Eligible:false من النص الخام لـ {url}: {constructed_response}")
+                    return _OUTCOME_DONE, constructed_response, None
+
+                # إذا لم يكن Eligible:false، أرجع خطأ تحليل مع النص الخام
+                raw_text_error_detail = "استجابة نصية غير متوقعة من الخادم."
+                logger.error(f"الطلب إلى {url} فشل بسبب استجابة نصية غير متوقعة. الرسالة المُعادة: {raw_text_error_detail}")
+                return _OUTCOME_DONE, {"raw_text": response.text, "is_non_json_success_heuristic": "Eligible" in response.text}, raw_text_error_detail
+
+            logger.error(f"الطلب إلى {url} فشل بسبب خطأ في تحليل JSON. الرسالة المُعادة: {json_decode_error_msg_short}")
+            return _OUTCOME_DONE, None, json_decode_error_msg_short
+
+        if endpoint == _RDV_CREATE_ENDPOINT and isinstance(json_response, dict) and json_response.get("Eligible") is False:
+            logger.warning(f"استجابة JSON من {url} تشير إلى Eligible:false. الاستجابة: {json_response}")
+        return _OUTCOME_DONE, json_response, None
+
+    def _make_request(self, method, endpoint, params=None, data=None, extra_headers=None, is_site_check=False, stream_handler=None):
         url = f"{self.base_url}/{endpoint}" if not is_site_check else MAIN_SITE_CHECK_URL
-
-        headers = self.session.headers.copy()
-        if extra_headers:
-            headers.update(extra_headers)
+        method = method.upper()
+        if method not in _SUPPORTED_METHODS:
+            unsupported_method_error = f"الطريقة {method} غير مدعومة لـ {url}"
+            logger.error(unsupported_method_error)
+            return None, unsupported_method_error
+
+        if method == 'GET':
+            send_request = self.session.get
+            request_kwargs = {'params': params}
+        else:
+            send_request = self.session.post
+            request_kwargs = {'json': data}
+        request_kwargs['headers'] = self._request_headers(method, extra_headers)
+        timeout_ceiling = SITE_CHECK_TIMEOUT if is_site_check else self.request_timeout
+        timeout_key = _SITE_CHECK_TIMEOUT_KEY if is_site_check else endpoint
+        adaptive_timeouts = self.adaptive_timeouts
+        request_kwargs['timeout'] = timeout_ceiling
+        request_kwargs['verify'] = False
+        if stream_handler is not None:
+            request_kwargs['stream'] = True
+
+        log_prefix = f"فحص توفر الموقع: {url}" if is_site_check else f"الطلب {method} إلى {url}"
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
         current_retry = 0
         max_retries_for_this_call = 0 if is_site_check else MAX_RETRIES
@@ -37,130 +232,55 @@ class AnemAPIClient:
 
         while current_retry <= max_retries_for_this_call:
             actual_delay_to_use = current_delay_general
-            log_prefix = f"الطلب {method.upper()} إلى {url}"
-            if is_site_check:
-                log_prefix = f"فحص توفر الموقع: {url}"
-
-            logger.debug(f"{log_prefix} (محاولة {current_retry + 1}/{max_retries_for_this_call + 1}) مع البيانات: {params or data}")
+            attempt_label = f"محاولة {current_retry + 1}"
+            if adaptive_timeouts is not None:
+                request_kwargs['timeout'] = adaptive_timeouts.timeouts(timeout_key, timeout_ceiling, current_retry,
+                                                                       last_attempt=current_retry >= max_retries_for_this_call > 0)
+            if debug_enabled:
+                logger.debug(f"{log_prefix} ({attempt_label}/{max_retries_for_this_call + 1}) مع البيانات: {params or data} (المهلة: {request_kwargs['timeout']})")
 
             try:
-                response = None
-                request_timeout_val = 5 if is_site_check else self.request_timeout
-
-                if method.upper() == 'GET':
-                    response = self.session.get(url, params=params, headers=headers, timeout=request_timeout_val, verify=False)
-                elif method.upper() == 'POST':
-                    headers['Content-Type'] = 'application/json'
-                    response = self.session.post(url, json=data, headers=headers, timeout=request_timeout_val, verify=False)
-                else:
-                    unsupported_method_error = f"الطريقة {method} غير مدعومة لـ {url}"
-                    logger.error(unsupported_method_error)
-                    return None, unsupported_method_error
-
-                logger.debug(f"استجابة الخادم لـ {url}: {response.status_code}")
-
-                if response.status_code == 429:
+                if self.governor is not None:
+                    sent_at = self.governor.acquire()
+                response = send_request(url, **request_kwargs)
+            except requests.exceptions.RequestException as e:
+                error_message, log_level, retryable = _describe_request_exception(e, url)
+                if is_site_check: return False, error_message
+                logger.log(log_level, f"{log_prefix} ({attempt_label}): {error_message}")
+                if not retryable:
+                    generic_request_error_msg = "حدث خطأ عام أثناء محاولة الاتصال بالخادم."
+                    logger.error(f"الطلب إلى {url} فشل بخطأ عام. الرسالة المُعادة: {generic_request_error_msg}")
+                    return None, generic_request_error_msg
+                last_error_message_for_request = error_message
+            else:
+                if adaptive_timeouts is not None:
+                    adaptive_timeouts.record(timeout_key, response.elapsed.total_seconds())
+                if debug_enabled:
+                    logger.debug(f"استجابة الخادم لـ {url}: {response.status_code}")
+                try:
+                    outcome, result, error_message = self._classify_response(response, endpoint, url, log_prefix, attempt_label, is_site_check, stream_handler)
+                finally:
+                    if stream_handler is not None:
+                        response.close() # إعادة الاتصال إلى المجمع حتى لو لم يُقرأ الجسم كاملاً
+                if outcome == _OUTCOME_DONE:
+                    return result, error_message
+                last_error_message_for_request = error_message
+                if outcome == _OUTCOME_RETRY_429:
                     actual_delay_to_use = current_delay_429
                     logger.warning(f"خطأ 429 (طلبات كثيرة جدًا) من الخادم لـ {url}. الانتظار {actual_delay_to_use} ثانية.")
                     if current_retry >= max_retries_for_this_call:
                         final_429_error = "طلبات كثيرة جدًا للخادم (429). يرجى الانتظار والمحاولة لاحقًا."
                         logger.error(f"تم تجاوز الحد الأقصى لإعادة المحاولة (429) لـ {url}. الرسالة المُعادة: {final_429_error}")
                         return None, final_429_error
-                    time.sleep(actual_delay_to_use)
+                    if self.governor is not None:
+                        # تهدئة مشتركة: كل الخيوط (وهذا الخيط في المحاولة التالية) تنتظر انتهاءها بدل إرسال طلبات سترفض
+                        self.governor.report_429(actual_delay_to_use, sent_at)
+                    else:
+                        time.sleep(actual_delay_to_use)
                     current_delay_429 = min(current_delay_429 * 2, MAX_BACKOFF_DELAY)
                     current_retry += 1
-                    last_error_message_for_request = "طلبات كثيرة جدًا (429)" # تحديث رسالة الخطأ الأخيرة
                     continue
 
-                actual_delay_to_use = current_delay_general # إعادة التعيين إلى التأخير العام إذا لم يكن الخطأ 429
-                response.raise_for_status()
-
-                if is_site_check:
-                    return True, None
-
-                try:
-                    json_response = response.json()
-                    if endpoint == 'RendezVous/Create' and isinstance(json_response, dict) and json_response.get("Eligible") is False:
-                        logger.warning(f"استجابة JSON من {url} تشير إلى Eligible:false. الاستجابة: {json_response}")
-                        return json_response, None
-                    return json_response, None
-                except json.JSONDecodeError:
-                    json_decode_error_msg_short = "خطأ في تحليل البيانات المستلمة من الخادم (ليست JSON)."
-                    json_decode_error_msg_full = f"خطأ في تحليل استجابة JSON من {url}. الاستجابة (أول 200 حرف): {response.text[:200] if response else 'No response object'}"
-                    logger.error(json_decode_error_msg_full)
-
-                    if endpoint == 'RendezVous/Create' and response and response.text:
-                        logger.warning(f"استجابة نصية غير JSON من {url} ولكنها تحتوي على نص: {response.text[:200]}")
-                        if "\"Eligible\":false" in response.text.lower():
-                             message_from_text = "نعتذر منكم! لا يمكنكم حجز موعد للاستفادة من منحة البطالة لعدم استيفائكم لأحد شروط الأهلية اللازمة."
-                             constructed_response = {"Eligible": False, "message": message_from_text, "raw_text": True}
-                             logger.info(f"تم بناء استجابة Eligible:false من النص الخام لـ {url}: {constructed_response}")
-                             return constructed_response, None
-
-                        # إذا لم يكن Eligible:false، أرجع خطأ تحليل مع النص الخام
-                        raw_text_error_detail = "استجابة نصية غير متوقعة من الخادم."
-                        logger.error(f"الطلب إلى {url} فشل بسبب استجابة نصية غير متوقعة. الرسالة المُعادة: {raw_text_error_detail}")
-                        return {"raw_text": response.text, "is_non_json_success_heuristic": "Eligible" in response.text}, raw_text_error_detail
-
-                    logger.error(f"الطلب إلى {url} فشل بسبب خطأ في تحليل JSON. الرسالة المُعادة: {json_decode_error_msg_short}")
-                    return None, json_decode_error_msg_short
-
-            except requests.exceptions.SSLError as e:
-                error_message = f"خطأ SSL عند الاتصال بـ {url}: {str(e)}"
-                if is_site_check: return False, error_message
-                logger.error(f"{log_prefix} (محاولة {current_retry + 1}): {error_message}")
-                last_error_message_for_request = error_message
-            except requests.exceptions.ConnectTimeout as e:
-                error_message = f"انتهت مهلة الاتصال بالخادم ({url}): {str(e)}"
-                if is_site_check: return False, error_message
-                logger.warning(f"{log_prefix} (محاولة {current_retry + 1}): {error_message}")
-                last_error_message_for_request = error_message
-            except requests.exceptions.ReadTimeout as e:
-                error_message = f"انتهت مهلة القراءة من الخادم ({url}): {str(e)}"
-                if is_site_check: return False, error_message
-                logger.warning(f"{log_prefix} (محاولة {current_retry + 1}): {error_message}")
-                last_error_message_for_request = error_message
-            except requests.exceptions.Timeout as e: # هذا يشمل ConnectTimeout و ReadTimeout بشكل عام
-                error_message = f"انتهت مهلة الطلب لـ {url}: {str(e)}"
-                if is_site_check: return False, error_message
-                logger.warning(f"{log_prefix} (محاولة {current_retry + 1}): {error_message}")
-                last_error_message_for_request = error_message
-            except requests.exceptions.ConnectionError as e:
-                error_message = f"خطأ في الاتصال بالخادم ({url}): {str(e)}"
-                if is_site_check: return False, error_message
-                logger.error(f"{log_prefix} (محاولة {current_retry + 1}): {error_message}")
-                last_error_message_for_request = error_message
-            except requests.exceptions.HTTPError as e:
-                status_code = response.status_code if response else "N/A"
-                error_message = f"خطأ HTTP {status_code} من الخادم لـ {url}: {str(e)}"
-                if is_site_check: return False, error_message
-                logger.error(f"{log_prefix} (محاولة {current_retry + 1}): {error_message}. الاستجابة: {response.text[:200] if response else 'N/A'}")
-                last_error_message_for_request = error_message
-
-                if endpoint == 'RendezVous/Create' and response is not None:
-                    try:
-                        parsed_error_json = response.json()
-                        if isinstance(parsed_error_json, dict) and parsed_error_json.get("Eligible") is False:
-                            logger.warning(f"استجابة خطأ HTTP من {url} ولكنها JSON مع Eligible:false. الاستجابة: {parsed_error_json}")
-                            return parsed_error_json, None
-
-                        # إذا لم يكن Eligible:false، فهو خطأ حقيقي
-                        http_json_error_detail = f"خطأ من الخادم ({status_code}) مع تفاصيل JSON."
-                        logger.error(f"الطلب إلى {url} فشل بخطأ HTTP مع تفاصيل JSON. الرسالة المُعادة: {http_json_error_detail}")
-                        return parsed_error_json, http_json_error_detail
-                    except json.JSONDecodeError:
-                        http_text_error_detail = f"خطأ من الخادم ({status_code}) مع استجابة نصية."
-                        logger.warning(f"استجابة نصية غير JSON لخطأ HTTP من {url}: {response.text[:200]}")
-                        logger.error(f"الطلب إلى {url} فشل بخطأ HTTP مع استجابة نصية. الرسالة المُعادة: {http_text_error_detail}")
-                        return {"raw_text": response.text, "http_status_code": status_code}, http_text_error_detail
-            except requests.exceptions.RequestException as e:
-                error_message = f"خطأ عام في الطلب لـ {url}: {str(e)}"
-                if is_site_check: return False, error_message
-                logger.error(f"{log_prefix} (محاولة {current_retry + 1}): {error_message}")
-                generic_request_error_msg = "حدث خطأ عام أثناء محاولة الاتصال بالخادم."
-                logger.error(f"الطلب إلى {url} فشل بخطأ عام. الرسالة المُعادة: {generic_request_error_msg}")
-                return None, generic_request_error_msg
-
             if current_retry >= max_retries_for_this_call:
                 final_error_message_after_retries = f"فشل الاتصال بالخادم بعد عدة محاولات. ({last_error_message_for_request.split(':')[0].strip()})"
                 logger.error(f"تم تجاوز الحد الأقصى لإعادة المحاولة لـ {url} بعد خطأ: {last_error_message_for_request}. الرسالة المُعادة: {final_error_message_after_retries}")
@@ -176,6 +296,71 @@ class AnemAPIClient:
         return None, ultimate_fallback_error
 
 
+    def keep_connection_warm(self):
+        """Keeps a pooled connection to the server open during long idle waits (see http_transport)."""
+        if POOL_STATS.idle_seconds() < HTTP_KEEP_WARM_INTERVAL_SECONDS:
+            return False
+        if self.governor is not None and not self.governor.try_acquire():
+            return False # الطلبات الفعلية أولى بالميزانية المتاحة
+        return keep_connection_warm(self.session, MAIN_SITE_CHECK_URL, HTTP_KEEP_WARM_INTERVAL_SECONDS)
+
+    @staticmethod
+    def pool_stats():
+        """Statistics of the shared connection pool (requests, connections opened/reused, waits)."""
+        return POOL_STATS.snapshot()
+
+    def governor_stats(self):
+        """Budget, queue depth and cooldown of the shared request governor (None if disabled)."""
+        return self.governor.stats() if self.governor is not None else None
+
+    def timeout_stats(self):
+        """Observed latencies and current adaptive timeouts per endpoint (None if disabled)."""
+        if self.adaptive_timeouts is None:
+            return None
+        return self.adaptive_timeouts.snapshot(self.request_timeout, {_SITE_CHECK_TIMEOUT_KEY: SITE_CHECK_TIMEOUT})
+
+    def cache_stats(self):
+        """Hit/miss counters of the shared response cache (None if disabled)."""
+        return self.response_cache.stats() if self.response_cache is not None else None
+
+    def coalescer_stats(self):
+        """Requests saved by the shared single-flight layer (None if disabled)."""
+        return self.request_coalescer.stats() if self.request_coalescer is not None else None
+
+    def _coalesced_get(self, endpoint, params, fetch=None):
+        """GET (or fetch()) sent once for all the threads asking for the same endpoint and params at the same time."""
+        if fetch is None:
+            fetch = lambda: self._make_request('GET', endpoint, params=params)
+        if self.request_coalescer is None:
+            return fetch()
+        return self.request_coalescer.do('GET', endpoint, params, fetch)
+
+    def _cached_get(self, endpoint, params, tag=None):
+        """
+        GET through the shared response cache: a successful response is reused until the
+        endpoint's TTL expires. Entries are tagged with the member's preInscriptionId
+        (tag, or the one in the response) so create_rendezvous can invalidate them.
+        On a miss the request goes through the single-flight layer.
+        """
+        cache = self.response_cache
+        if cache is None or not cache.caches(endpoint):
+            return self._coalesced_get(endpoint, params)
+        data = cache.get(endpoint, params)
+        if data is not None:
+            logger.debug(f"استجابة مخزنة مؤقتًا لـ {endpoint} ({params})")
+            return data, None
+
+        def fetch_and_store():
+            data, error = self._make_request('GET', endpoint, params=params)
+            if error is None:
+                entry_tag = tag
+                if entry_tag is None and isinstance(data, dict):
+                    entry_tag = data.get("preInscriptionId")
+                cache.put(endpoint, params, data, entry_tag)
+            return data, error
+
+        return self._coalesced_get(endpoint, params, fetch_and_store)
+
     def check_main_site_availability(self):
         logger.info(f"بدء فحص توفر الموقع الرئيسي: {MAIN_SITE_CHECK_URL}")
         # يتم التعامل مع is_site_check داخل _make_request لتعطيل إعادة المحاولة
@@ -192,18 +377,18 @@ class AnemAPIClient:
             "wassitNumber": wassit_number,
             "identityDocNumber": identity_doc_number
         }
-        return self._make_request('GET', 'validateCandidate/query', params=params)
+        return self._cached_get('validateCandidate/query', params)
 
     def get_pre_inscription_info(self, pre_inscription_id):
         params = {"Id": pre_inscription_id}
-        return self._make_request('GET', 'PreInscription/GetPreInscription', params=params)
+        return self._cached_get('PreInscription/GetPreInscription', params, tag=pre_inscription_id)
 
     def get_available_dates(self, structure_id, pre_inscription_id):
         params = {
             "StructureId": structure_id,
             "PreInscriptionId": pre_inscription_id
         }
-        return self._make_request('GET', 'RendezVous/GetAvailableDates', params=params)
+        return self._coalesced_get('RendezVous/GetAvailableDates', params)
 
     def create_rendezvous(self, pre_inscription_id, ccp, nom_ccp_fr, prenom_ccp_fr, rdv_date, demandeur_id):
         # تحويل الاسم واللقب إلى أحرف كبيرة (Majuscule)
@@ -219,7 +404,12 @@ class AnemAPIClient:
             "demandeurId": demandeur_id
         }
         headers = {'g-recaptcha-response': ''}
-        return self._make_request('POST', 'RendezVous/Create', data=payload, extra_headers=headers)
+        try:
+            return self._make_request('POST', 'RendezVous/Create', data=payload, extra_headers=headers)
+        finally:
+            # حالة العضو تغيرت (أو ربما تغيرت) على الخادم: لا تُستخدم استجاباته المخزنة بعد الآن
+            if self.response_cache is not None:
+                self.response_cache.invalidate(pre_inscription_id)
 
     def download_pdf(self, report_type, pre_inscription_id):
         endpoint = f"download/{report_type}"
@@ -229,5 +419,21 @@ class AnemAPIClient:
         # إذا كانت الاستجابة بيانات ثنائية مباشرة ولم تكن JSON، سيفشل تحليل JSON.
         # هذا يتطلب معالجة خاصة في الخيط المستدعي إذا كانت طبيعة الاستجابة يمكن أن تختلف.
         # حاليًا، الكود يفترض أن استجابة PDF الناجحة ستكون JSON مع حقل "base64Pdf".
-        return self._make_request('GET', endpoint, params=params)
+        return self._coalesced_get(endpoint, params)
+
+    def download_pdf_to_file(self, report_type, pre_inscription_id, file_path):
+        """
+        Streams download/<report_type> straight to file_path: the base64 PDF is decoded
+        block by block while the response is read, through a temporary file.
+        Returns (file_path, None) or (None, error message) like the other calls.
+        Raises pdf_download.PdfStreamError if the response holds no base64 PDF, and
+        OSError / binascii.Error if the PDF cannot be written.
+        """
+        endpoint = f"download/{report_type}"
+        params = {"PreInscriptionId": pre_inscription_id}
+
+        def write_pdf(response):
+            write_base64_pdf(response.iter_content(PDF_STREAM_CHUNK_SIZE), file_path)
+            return file_path
 
+        return self._make_request('GET', endpoint, params=params, stream_handler=write_pdf)
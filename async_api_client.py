@@ -0,0 +1,275 @@
+# async_api_client.py
+import time
+import asyncio
+import logging
+from datetime import timedelta
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import BASE_API_URL, MAIN_SITE_CHECK_URL, MAX_RETRIES, MAX_BACKOFF_DELAY, SESSION, HTTP_POOL_MAXSIZE, REQUEST_GOVERNOR, RESPONSE_CACHE, ADAPTIVE_TIMEOUTS, SITE_CHECK_TIMEOUT
+from api_client import AnemAPIClient, _SUPPORTED_METHODS, _OUTCOME_DONE, _OUTCOME_RETRY_429, _SITE_CHECK_TIMEOUT_KEY
+from response_cache import request_key
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+def _describe_aiohttp_exception(e, url):
+    """(message, log level, retryable) for an exception raised while sending the request (as in api_client)."""
+    if isinstance(e, aiohttp.ClientSSLError):
+        return f"خطأ SSL عند الاتصال بـ {url}: {str(e)}", logging.ERROR, True
+    if isinstance(e, asyncio.TimeoutError): # يشمل ServerTimeoutError (مهلة الاتصال أو القراءة)
+        return f"انتهت مهلة الطلب لـ {url}: {str(e)}", logging.WARNING, True
+    if isinstance(e, aiohttp.ClientConnectionError):
+        return f"خطأ في الاتصال بالخادم ({url}): {str(e)}", logging.ERROR, True
+    return f"خطأ عام في الطلب لـ {url}: {str(e)}", logging.ERROR, False
+
+
+def _as_requests_response(url, status, reason, headers, body, elapsed_seconds):
+    """Wraps a fully read aiohttp response so AnemAPIClient's classification can be reused as is."""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = body
+    response.elapsed = timedelta(seconds=elapsed_seconds) # حتى وصول الترويسات، كما في requests
+    return response
+
+
+class AsyncAnemAPIClient:
+    """
+    asyncio counterpart of AnemAPIClient (same methods, retries and error messages, as
+    coroutines) built on aiohttp. Backoff waits with asyncio.sleep, so one event loop can
+    serve monitoring, on-demand checks and PDF downloads without a thread per task.
+    One aiohttp session (connection pool) is shared by every call of a client; create the
+    client and call close() (or use "async with") inside the same running loop.
+    The request governor, response cache and adaptive timeouts are shared with the blocking
+    clients. Coalescing of concurrent identical GETs is per client (its event loop): the shared
+    SingleFlight (config.REQUEST_COALESCER) makes followers block a thread on the leader's
+    result, which would stall the loop, so an async call and a threaded call for the same
+    request are both sent.
+    """
+
+    # نفس بناء الترويسات وتصنيف الاستجابات في العميل المتزامن
+    _request_headers = AnemAPIClient._request_headers
+    _classify_response = AnemAPIClient._classify_response
+
+    def __init__(self, initial_backoff_general, initial_backoff_429, request_timeout):
+        if aiohttp is None:
+            raise RuntimeError("AsyncAnemAPIClient requires aiohttp (pip install aiohttp)")
+        self.base_url = BASE_API_URL
+        self.initial_backoff_general = initial_backoff_general
+        self.initial_backoff_429 = initial_backoff_429
+        self.request_timeout = request_timeout
+        self.governor = REQUEST_GOVERNOR
+        self.response_cache = RESPONSE_CACHE
+        self.adaptive_timeouts = ADAPTIVE_TIMEOUTS
+        self.coalesce_requests = True
+        self.requests_saved = 0
+        self._request_headers_by_key = {}
+        self._in_flight = {}
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=HTTP_POOL_MAXSIZE, ssl=False)
+            self._session = aiohttp.ClientSession(connector=connector, headers=dict(SESSION.headers))
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _acquire_governor(self):
+        """Waits (without blocking the loop) for the shared governor. Returns the send time for report_429."""
+        while True:
+            delay = self.governor.try_acquire_delay()
+            if delay <= 0:
+                return time.monotonic()
+            await asyncio.sleep(delay)
+
+    async def _send(self, method, url, params, data, headers, timeout):
+        """timeout is (connect, read) in seconds, as for requests."""
+        connect_timeout, read_timeout = timeout
+        request_kwargs = {'headers': headers, 'timeout': aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)}
+        if params:
+            request_kwargs['params'] = {name: str(value) for name, value in params.items() if value is not None}
+        if method == 'POST':
+            request_kwargs['json'] = data
+        started_at = time.monotonic()
+        async with self._get_session().request(method, url, **request_kwargs) as response:
+            elapsed_seconds = time.monotonic() - started_at
+            body = await response.read()
+            return _as_requests_response(str(response.url), response.status, response.reason, response.headers, body, elapsed_seconds)
+
+    async def _make_request(self, method, endpoint, params=None, data=None, extra_headers=None, is_site_check=False):
+        url = f"{self.base_url}/{endpoint}" if not is_site_check else MAIN_SITE_CHECK_URL
+        method = method.upper()
+        if method not in _SUPPORTED_METHODS:
+            unsupported_method_error = f"الطريقة {method} غير مدعومة لـ {url}"
+            logger.error(unsupported_method_error)
+            return None, unsupported_method_error
+
+        headers = self._request_headers(method, extra_headers)
+        timeout_ceiling = SITE_CHECK_TIMEOUT if is_site_check else self.request_timeout
+        timeout_key = _SITE_CHECK_TIMEOUT_KEY if is_site_check else endpoint
+        adaptive_timeouts = self.adaptive_timeouts
+        timeout = (timeout_ceiling, timeout_ceiling)
+        log_prefix = f"فحص توفر الموقع: {url}" if is_site_check else f"الطلب {method} إلى {url}"
+
+        current_retry = 0
+        max_retries_for_this_call = 0 if is_site_check else MAX_RETRIES
+        current_delay_general = self.initial_backoff_general
+        current_delay_429 = self.initial_backoff_429
+        last_error_message_for_request = "فشل غير محدد"
+
+        while current_retry <= max_retries_for_this_call:
+            actual_delay_to_use = current_delay_general
+            attempt_label = f"محاولة {current_retry + 1}"
+            if adaptive_timeouts is not None:
+                timeout = adaptive_timeouts.timeouts(timeout_key, timeout_ceiling, current_retry,
+                                                     last_attempt=current_retry >= max_retries_for_this_call > 0)
+            try:
+                if self.governor is not None:
+                    sent_at = await self._acquire_governor()
+                response = await self._send(method, url, params, data, headers, timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error_message, log_level, retryable = _describe_aiohttp_exception(e, url)
+                if is_site_check: return False, error_message
+                logger.log(log_level, f"{log_prefix} ({attempt_label}): {error_message}")
+                if not retryable:
+                    generic_request_error_msg = "حدث خطأ عام أثناء محاولة الاتصال بالخادم."
+                    logger.error(f"الطلب إلى {url} فشل بخطأ عام. الرسالة المُعادة: {generic_request_error_msg}")
+                    return None, generic_request_error_msg
+                last_error_message_for_request = error_message
+            else:
+                if adaptive_timeouts is not None:
+                    adaptive_timeouts.record(timeout_key, response.elapsed.total_seconds())
+                outcome, result, error_message = self._classify_response(response, endpoint, url, log_prefix, attempt_label, is_site_check)
+                if outcome == _OUTCOME_DONE:
+                    return result, error_message
+                last_error_message_for_request = error_message
+                if outcome == _OUTCOME_RETRY_429:
+                    actual_delay_to_use = current_delay_429
+                    logger.warning(f"خطأ 429 (طلبات كثيرة جدًا) من الخادم لـ {url}. الانتظار {actual_delay_to_use} ثانية.")
+                    if current_retry >= max_retries_for_this_call:
+                        final_429_error = "طلبات كثيرة جدًا للخادم (429). يرجى الانتظار والمحاولة لاحقًا."
+                        logger.error(f"تم تجاوز الحد الأقصى لإعادة المحاولة (429) لـ {url}. الرسالة المُعادة: {final_429_error}")
+                        return None, final_429_error
+                    if self.governor is not None:
+                        self.governor.report_429(actual_delay_to_use, sent_at)
+                    else:
+                        await asyncio.sleep(actual_delay_to_use)
+                    current_delay_429 = min(current_delay_429 * 2, MAX_BACKOFF_DELAY)
+                    current_retry += 1
+                    continue
+
+            if current_retry >= max_retries_for_this_call:
+                final_error_message_after_retries = f"فشل الاتصال بالخادم بعد عدة محاولات. ({last_error_message_for_request.split(':')[0].strip()})"
+                logger.error(f"تم تجاوز الحد الأقصى لإعادة المحاولة لـ {url} بعد خطأ: {last_error_message_for_request}. الرسالة المُعادة: {final_error_message_after_retries}")
+                return None, final_error_message_after_retries
+
+            await asyncio.sleep(actual_delay_to_use)
+            current_delay_general = min(current_delay_general * 2, MAX_BACKOFF_DELAY)
+            current_retry += 1
+
+        ultimate_fallback_error = "فشل الاتصال بالخادم بعد جميع المحاولات."
+        logger.error(f"الطلب إلى {url} فشل بعد جميع المحاولات (fallback). الرسالة المُعادة: {ultimate_fallback_error}")
+        return None, ultimate_fallback_error
+
+    async def _coalesced_get(self, endpoint, params, fetch=None):
+        """Concurrent identical GETs of this client's loop share one request (asyncio version of SingleFlight)."""
+        if fetch is None:
+            fetch = lambda: self._make_request('GET', endpoint, params=params)
+        if not self.coalesce_requests:
+            return await fetch()
+        key = request_key(endpoint, params)
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.requests_saved += 1
+        else:
+            in_flight = self._in_flight[key] = asyncio.ensure_future(fetch())
+            in_flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: إلغاء أحد المنتظرين لا يلغي الطلب المشترك
+        return await asyncio.shield(in_flight)
+
+    async def _cached_get(self, endpoint, params, tag=None):
+        cache = self.response_cache
+        if cache is None or not cache.caches(endpoint):
+            return await self._coalesced_get(endpoint, params)
+        data = cache.get(endpoint, params)
+        if data is not None:
+            return data, None
+
+        async def fetch_and_store():
+            data, error = await self._make_request('GET', endpoint, params=params)
+            if error is None:
+                entry_tag = tag
+                if entry_tag is None and isinstance(data, dict):
+                    entry_tag = data.get("preInscriptionId")
+                cache.put(endpoint, params, data, entry_tag)
+            return data, error
+
+        return await self._coalesced_get(endpoint, params, fetch_and_store)
+
+    async def check_main_site_availability(self):
+        logger.info(f"بدء فحص توفر الموقع الرئيسي: {MAIN_SITE_CHECK_URL}")
+        available, error_msg = await self._make_request('GET', '', is_site_check=True)
+        if error_msg:
+            logger.warning(f"فحص توفر الموقع فشل: {error_msg}")
+            return False, error_msg
+        return available, None
+
+    async def validate_candidate(self, wassit_number, identity_doc_number):
+        params = {
+            "wassitNumber": wassit_number,
+            "identityDocNumber": identity_doc_number
+        }
+        return await self._cached_get('validateCandidate/query', params)
+
+    async def get_pre_inscription_info(self, pre_inscription_id):
+        params = {"Id": pre_inscription_id}
+        return await self._cached_get('PreInscription/GetPreInscription', params, tag=pre_inscription_id)
+
+    async def get_available_dates(self, structure_id, pre_inscription_id):
+        params = {
+            "StructureId": structure_id,
+            "PreInscriptionId": pre_inscription_id
+        }
+        return await self._coalesced_get('RendezVous/GetAvailableDates', params)
+
+    async def create_rendezvous(self, pre_inscription_id, ccp, nom_ccp_fr, prenom_ccp_fr, rdv_date, demandeur_id):
+        payload = {
+            "preInscriptionId": pre_inscription_id,
+            "ccp": ccp,
+            "nomCcp": nom_ccp_fr.upper() if nom_ccp_fr else "",
+            "prenomCcp": prenom_ccp_fr.upper() if prenom_ccp_fr else "",
+            "rdvdate": rdv_date,
+            "demandeurId": demandeur_id
+        }
+        headers = {'g-recaptcha-response': ''}
+        try:
+            return await self._make_request('POST', 'RendezVous/Create', data=payload, extra_headers=headers)
+        finally:
+            if self.response_cache is not None:
+                self.response_cache.invalidate(pre_inscription_id)
+
+    async def download_pdf(self, report_type, pre_inscription_id):
+        endpoint = f"download/{report_type}"
+        params = {"PreInscriptionId": pre_inscription_id}
+        return await self._coalesced_get(endpoint, params)
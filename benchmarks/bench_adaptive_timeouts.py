@@ -0,0 +1,114 @@
+# benchmarks/bench_adaptive_timeouts.py
+"""
+Fixed request timeout against AdaptiveTimeouts (config.ADAPTIVE_TIMEOUTS), on the HAR
+replay server, with the time scale shrunk ~10x (ceiling 3s instead of the 30s setting,
+minimum read timeout 0.4s instead of 4s):
+
+1. Dead sockets: a share of the requests hang far longer than the ceiling. The fixed
+   timeout waits the full ceiling for each of them; the adaptive one gives up after
+   p99 x multiplier and retries.
+2. Slow but healthy server: after a warm-up at normal latency the server becomes 5x
+   slower than the adaptive timeout. The retries (doubled timeouts, the ceiling on the
+   last attempt) must get the calls through and raise the timeout for the next ones.
+
+Run from the repository root:
+    python benchmarks/bench_adaptive_timeouts.py
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from har_replay_server import HarReplayServer
+from api_client import AnemAPIClient
+from http_transport import AdaptiveTimeouts
+from config import ADAPTIVE_TIMEOUT_MULTIPLIER, ADAPTIVE_TIMEOUT_WINDOW, ADAPTIVE_TIMEOUT_MIN_SAMPLES
+
+CEILING_SECONDS = 3.0
+READ_TIMEOUT_MIN = 0.4
+CONNECT_TIMEOUT_MIN = 0.2
+CONNECT_TIMEOUT_MAX = 1.0
+LATENCY_MS = 40
+LATENCY_JITTER_MS = 40
+STALL_RATE = 0.1
+CALLS = 100
+SLOW_LATENCY_MS = 1500
+
+
+def _make_client(server, adaptive):
+    client = AnemAPIClient(initial_backoff_general=0.05, initial_backoff_429=0.05, request_timeout=CEILING_SECONDS)
+    client.base_url = server.base_url
+    client.governor = None
+    client.response_cache = None
+    client.request_coalescer = None
+    client.adaptive_timeouts = None
+    if adaptive:
+        client.adaptive_timeouts = AdaptiveTimeouts(ADAPTIVE_TIMEOUT_MULTIPLIER, READ_TIMEOUT_MIN, CONNECT_TIMEOUT_MIN,
+                                                    CONNECT_TIMEOUT_MAX, ADAPTIVE_TIMEOUT_WINDOW, ADAPTIVE_TIMEOUT_MIN_SAMPLES)
+    return client
+
+
+def _calls(client, server, count):
+    """(seconds per call, failed calls)."""
+    wassit_no, nin = server.candidates[0]
+    failed = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        data, error = client.validate_candidate(wassit_no, nin)
+        if error is not None:
+            failed += 1
+    return (time.perf_counter() - start) / count, failed
+
+
+def _warm_up(client, server):
+    """Fills the latency window without hung requests. Returns the time per call."""
+    stall_rate = server.stall_rate
+    server.stall_rate = 0.0
+    per_call, _ = _calls(client, server, ADAPTIVE_TIMEOUT_MIN_SAMPLES)
+    server.stall_rate = stall_rate
+    return per_call
+
+
+def _dead_sockets():
+    print(f"1. {STALL_RATE:.0%} of the requests hang | latency {LATENCY_MS}+{LATENCY_JITTER_MS}ms | ceiling {CEILING_SECONDS}s")
+    with HarReplayServer(latency_ms=LATENCY_MS, latency_jitter_ms=LATENCY_JITTER_MS, stall_rate=STALL_RATE,
+                         stall_seconds=CEILING_SECONDS * 10) as server:
+        for adaptive in (False, True):
+            client = _make_client(server, adaptive)
+            healthy_per_call = _warm_up(client, server)
+            server.reset_stats()
+            per_call, failed = _calls(client, server, CALLS)
+            hung = server.stats['stalled']
+            lost_per_hang = (per_call - healthy_per_call) * CALLS / hung if hung else 0.0
+            timeouts = client.adaptive_timeouts.timeouts("validateCandidate/query", CEILING_SECONDS) if adaptive else (CEILING_SECONDS, CEILING_SECONDS)
+            print(f"    {'adaptive' if adaptive else 'fixed':<8}: {per_call * 1000:>6.0f}ms per call, {failed} failed, "
+                  f"{hung} hung requests, ~{lost_per_hang:.2f}s lost per hung request "
+                  f"(connect/read timeout {timeouts[0]:.2f}s / {timeouts[1]:.2f}s)")
+
+
+def _slow_server():
+    print(f"2. server slows down from {LATENCY_MS}ms to {SLOW_LATENCY_MS}ms after the warm-up")
+    with HarReplayServer(latency_ms=LATENCY_MS, latency_jitter_ms=LATENCY_JITTER_MS) as server:
+        client = _make_client(server, True)
+        _warm_up(client, server)
+        before = client.adaptive_timeouts.timeouts("validateCandidate/query", CEILING_SECONDS)[1]
+        server.latency_ms = SLOW_LATENCY_MS
+        for batch in range(3):
+            per_call, failed = _calls(client, server, 5)
+            after = client.adaptive_timeouts.timeouts("validateCandidate/query", CEILING_SECONDS)[1]
+            print(f"    calls {batch * 5 + 1}-{batch * 5 + 5}: {per_call * 1000:>6.0f}ms per call, {failed} failed, "
+                  f"read timeout {before:.2f}s -> {after:.2f}s")
+            before = after
+
+
+def main():
+    # انتهاء المهلة متوقع هنا
+    logging.basicConfig(level=logging.CRITICAL)
+    _dead_sockets()
+    _slow_server()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_api_client_overhead.py
+"""
+Per-call overhead of AnemAPIClient._make_request against the local HAR replay
+server: the client's session is wrapped so the time spent inside session.get/post
+(network round trip) is subtracted from each client call. What is left is the
+client's own work (headers, logging, dispatch, classification, response.json()).
+
+Run from the repository root:
+    python benchmarks/bench_api_client_overhead.py
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from har_replay_server import HarReplayServer
+from api_client import AnemAPIClient
+from config import SESSION
+
+CALLS = 2000
+WARMUP_CALLS = 50
+
+
+class _TimedSession:
+    """Forwards get/post to the real session and adds up the time spent inside them."""
+
+    def __init__(self, session):
+        self._session = session
+        self.headers = session.headers
+        self.elapsed = 0.0
+
+    def get(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._session.get(*args, **kwargs)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def post(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._session.post(*args, **kwargs)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+
+def _client_overhead(timed_session, func, calls):
+    """(round trip per call, client overhead per call) in seconds."""
+    for _ in range(WARMUP_CALLS):
+        func()
+    timed_session.elapsed = 0.0
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    total = time.perf_counter() - start
+    return timed_session.elapsed / calls, (total - timed_session.elapsed) / calls
+
+
+def main():
+    # نفس مستوى السجل في التطبيق (INFO)، بدون كتابة فعلية
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    with HarReplayServer() as server:
+        client = AnemAPIClient(initial_backoff_general=0.01, initial_backoff_429=0.01, request_timeout=10)
+        client.base_url = server.base_url
+        client.governor = None # يقيس عمل العميل فقط، بدون سقف الطلبات
+        client.response_cache = None # ولا ذاكرة الاستجابات المؤقتة (نفس الطلب يتكرر)
+        timed_session = _TimedSession(SESSION)
+        client.session = timed_session
+        wassit_no, nin = server.candidates[0]
+        pre_inscription_id = "0611c8ef-2037-4ad9-b48a-442865b85f4e"
+        structure_id = "f83af7fe-4b35-4bb5-92fa-25f11e7936f8"
+
+        cases = [
+            ("validateCandidate/query", lambda: client.validate_candidate(wassit_no, nin)),
+            ("PreInscription/GetPreInscription", lambda: client.get_pre_inscription_info(pre_inscription_id)),
+            ("RendezVous/GetAvailableDates", lambda: client.get_available_dates(structure_id, pre_inscription_id)),
+            ("RendezVous/Create (POST)", lambda: client.create_rendezvous(pre_inscription_id, "001430811219", "x", "y", "2025-07-07", "D")),
+        ]
+
+        print(f"{'endpoint':<34} | {'round trip':>10} | {'client overhead':>15}")
+        print("-" * 66)
+        for name, client_call in cases:
+            round_trip, overhead = _client_overhead(timed_session, client_call, CALLS)
+            print(f"{name:<34} | {round_trip * 1e6:>8.0f}us | {overhead * 1e6:>13.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_async_client.py
+"""
+The same per-member work (validateCandidate, GetPreInscription, GetAvailableDates) for
+N concurrent members, with injected 429 / 500 answers so that backoff happens:
+
+- "threads": one thread per member, each with its own blocking AnemAPIClient
+  (what the app does with one QThread per task).
+- "asyncio": one event loop and one AsyncAnemAPIClient, one task per member.
+
+Both sides share one governor without a ceiling (a 429 pauses every member) and the
+response cache is off, so they send the same requests. Reports wall time, the number
+of client threads alive at the peak (the replay server's own threads are not counted)
+and the requests seen.
+
+Needs the optional aiohttp package (pip install aiohttp); without it the benchmark is skipped.
+
+Run from the repository root:
+    python benchmarks/bench_async_client.py
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from har_replay_server import HarReplayServer
+from api_client import AnemAPIClient
+from async_api_client import AsyncAnemAPIClient, aiohttp
+from rate_governor import RequestGovernor
+
+LATENCY_MS = 60
+RATE_429 = 0.05
+ERROR_RATE = 0.05
+BACKOFF_SECONDS = 0.2
+MEMBER_COUNTS = (10, 50, 200)
+PRE_INSCRIPTION_ID = "0611c8ef-2037-4ad9-b48a-442865b85f4e"
+STRUCTURE_ID = "f83af7fe-4b35-4bb5-92fa-25f11e7936f8"
+
+
+def _configure(client, base_url, governor):
+    client.base_url = base_url
+    client.governor = governor
+    client.response_cache = None
+    return client
+
+
+def _client_thread_count():
+    return sum(1 for thread in threading.enumerate() if "process_request_thread" not in thread.name)
+
+
+def _run_threads(server, member_count):
+    peak_threads = 0
+    governor = RequestGovernor(None)
+
+    def member_work(wassit_no, nin):
+        client = _configure(AnemAPIClient(BACKOFF_SECONDS, BACKOFF_SECONDS, 10), server.base_url, governor)
+        client.request_coalescer = None
+        client.validate_candidate(wassit_no, nin)
+        client.get_pre_inscription_info(PRE_INSCRIPTION_ID)
+        client.get_available_dates(STRUCTURE_ID, PRE_INSCRIPTION_ID)
+
+    threads = [threading.Thread(target=member_work, args=server.candidates[i % len(server.candidates)]) for i in range(member_count)]
+    for thread in threads:
+        thread.start()
+        peak_threads = max(peak_threads, _client_thread_count())
+    for thread in threads:
+        thread.join()
+    return peak_threads
+
+
+async def _run_asyncio(server, member_count):
+    async with _configure(AsyncAnemAPIClient(BACKOFF_SECONDS, BACKOFF_SECONDS, 10), server.base_url, RequestGovernor(None)) as client:
+        client.coalesce_requests = False
+
+        async def member_work(wassit_no, nin):
+            await client.validate_candidate(wassit_no, nin)
+            await client.get_pre_inscription_info(PRE_INSCRIPTION_ID)
+            await client.get_available_dates(STRUCTURE_ID, PRE_INSCRIPTION_ID)
+
+        await asyncio.gather(*(member_work(*server.candidates[i % len(server.candidates)]) for i in range(member_count)))
+        return _client_thread_count()
+
+
+def main():
+    if aiohttp is None:
+        print("skipped: aiohttp is not installed (pip install aiohttp)")
+        return
+    # رسائل 429/500 المحقونة متوقعة هنا
+    logging.basicConfig(level=logging.CRITICAL)
+    with HarReplayServer(latency_ms=LATENCY_MS, rate_429=RATE_429, error_rate=ERROR_RATE) as server:
+        print(f"latency {LATENCY_MS}ms | 429: {RATE_429:.0%} | 500: {ERROR_RATE:.0%} | backoff {BACKOFF_SECONDS}s")
+        print(f"{'members':>7} | {'client':<8} | {'total':>7} | {'peak threads':>12} | {'requests':>8}")
+        print("-" * 56)
+        for member_count in MEMBER_COUNTS:
+            for name, run in (("threads", lambda: _run_threads(server, member_count)),
+                              ("asyncio", lambda: asyncio.run(_run_asyncio(server, member_count)))):
+                server.reset_stats()
+                start = time.perf_counter()
+                peak_threads = run()
+                total = time.perf_counter() - start
+                requests_seen = sum(count for key, count in server.stats.items() if key not in ("site_check", "connections"))
+                print(f"{member_count:>7} | {name:<8} | {total:>6.2f}s | {peak_threads:>12} | {requests_seen:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_connection_pool.py
+"""
+Connection reuse of the shared session against the HAR replay server (which adds a
+simulated handshake to every new connection and closes idle keep-alive connections):
+
+1. Concurrent threads: requests' default HTTPAdapter against the PooledHTTPAdapter
+   mounted on config.SESSION (connections opened by the server, pool waits, total time).
+2. First request after an idle period longer than the server's keep-alive timeout,
+   with and without keep_connection_warm() pings during the wait.
+
+Run from the repository root:
+    python benchmarks/bench_connection_pool.py
+"""
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from har_replay_server import HarReplayServer
+from api_client import AnemAPIClient
+from http_transport import POOL_STATS, mount_pooled_adapter, keep_connection_warm
+from config import SESSION, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK
+
+HANDSHAKE_MS = 40
+LATENCY_MS = 20
+IDLE_TIMEOUT_SECONDS = 2.0
+THREAD_COUNTS = (4, 10, 20)
+CALLS_PER_THREAD = 10
+
+
+def _make_client(server, session):
+    client = AnemAPIClient(initial_backoff_general=0.01, initial_backoff_429=0.01, request_timeout=10)
+    client.base_url = server.base_url
+    client.session = session
+    client.governor = None # يقيس إعادة استخدام الاتصالات فقط، بدون سقف الطلبات
+    client.response_cache = None # ولا ذاكرة الاستجابات المؤقتة (نفس الطلب يتكرر)
+    client.request_coalescer = None # ولا دمج الطلبات المتطابقة المتزامنة
+    return client
+
+
+def _default_session():
+    session = requests.Session()
+    session.headers.update(SESSION.headers)
+    return session
+
+
+def _pooled_session():
+    session = _default_session()
+    mount_pooled_adapter(session, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK)
+    return session
+
+
+def _run_threads(client, wassit_no, nin, thread_count):
+    def worker():
+        for _ in range(CALLS_PER_THREAD):
+            client.validate_candidate(wassit_no, nin)
+    threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def _concurrency(server):
+    wassit_no, nin = server.candidates[0]
+    print(f"{'threads':>7} | {'adapter':<26} | {'total':>8} | {'connections':>11} | {'pool waits':>10}")
+    print("-" * 76)
+    for thread_count in THREAD_COUNTS:
+        for name, make_session in (("requests default", _default_session),
+                                   (f"pooled (max {HTTP_POOL_MAXSIZE}, block)", _pooled_session)):
+            session = make_session()
+            client = _make_client(server, session)
+            server.reset_stats()
+            POOL_STATS.reset()
+            total = _run_threads(client, wassit_no, nin, thread_count)
+            print(f"{thread_count:>7} | {name:<26} | {total * 1000:>6.0f}ms | {server.stats['connections']:>11} | {POOL_STATS.waits:>10}")
+            session.close()
+
+
+def _after_idle(server):
+    wassit_no, nin = server.candidates[0]
+    print()
+    print(f"first request after {IDLE_TIMEOUT_SECONDS * 1.5:.0f}s idle (server closes idle connections after {IDLE_TIMEOUT_SECONDS:.0f}s)")
+    for keep_warm in (False, True):
+        session = _pooled_session()
+        client = _make_client(server, session)
+        client.validate_candidate(wassit_no, nin)
+        server.reset_stats()
+        idle_end = time.monotonic() + IDLE_TIMEOUT_SECONDS * 1.5
+        while time.monotonic() < idle_end:
+            time.sleep(0.25)
+            if keep_warm:
+                keep_connection_warm(session, server.site_url, IDLE_TIMEOUT_SECONDS / 2)
+        start = time.perf_counter()
+        client.validate_candidate(wassit_no, nin)
+        elapsed = time.perf_counter() - start
+        print(f"    keep-warm {'on ' if keep_warm else 'off'}: {elapsed * 1000:>6.1f}ms, new connections: {server.stats['connections']}")
+        session.close()
+
+
+def main():
+    with HarReplayServer(latency_ms=LATENCY_MS, handshake_ms=HANDSHAKE_MS, idle_timeout=IDLE_TIMEOUT_SECONDS) as server:
+        _concurrency(server)
+        _after_idle(server)
+
+
+if __name__ == "__main__":
+    main()
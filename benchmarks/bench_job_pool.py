@@ -0,0 +1,128 @@
+# benchmarks/bench_job_pool.py
+"""
+Bulk add of members (one initial fetch each), then one "check now" clicked by the user
+while the fetches are still going, with one thread per request (as main_app did before)
+and with JobPool (config.MEMBER_JOB_WORKERS workers, the fetches queued at background
+priority, the check at user priority).
+
+Jobs are simulated: each one sends REQUESTS_PER_JOB requests through a shared
+RequestGovernor (the same rate ceiling as the app, scaled up 50x) and waits the
+simulated server latency for each. No network.
+
+Reports the peak number of live threads, the time to finish the bulk add, the latency
+of the user's check (from the click to the end of the check) and the pool's stats
+(queue depth right after the bulk add, wait in the queue per kind).
+
+Run from the repository root:
+    python benchmarks/bench_job_pool.py
+"""
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication
+
+from rate_governor import RequestGovernor
+from job_pool import JobPool, JOB_PRIORITY_USER, JOB_PRIORITY_BACKGROUND
+from config import API_MAX_REQUESTS_PER_SECOND, API_REQUEST_BURST, MEMBER_JOB_WORKERS
+
+MEMBERS_ADDED = 200
+REQUESTS_PER_JOB = 2
+LATENCY_SECONDS = 0.02
+RATE_SCALE = 50
+USER_CLICK_AFTER_SECONDS = 0.5
+
+
+class _SimulatedJob:
+    def __init__(self, kind, governor):
+        self.kind = kind
+        self.governor = governor
+        self.is_running = True
+        self.finished_at = None
+
+    def run(self):
+        for _ in range(REQUESTS_PER_JOB):
+            if not self.is_running: return
+            self.governor.acquire()
+            time.sleep(LATENCY_SECONDS)
+        self.finished_at = time.perf_counter()
+
+    def stop(self):
+        self.is_running = False
+
+
+class _PeakThreads:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def _sample(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, threading.active_count())
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+
+def _thread_per_request(governor):
+    jobs = [_SimulatedJob("initial_fetch", governor) for _ in range(MEMBERS_ADDED)]
+    threads = [threading.Thread(target=job.run) for job in jobs]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(USER_CLICK_AFTER_SECONDS)
+    user_job = _SimulatedJob("instant_check", governor)
+    clicked_at = time.perf_counter()
+    user_thread = threading.Thread(target=user_job.run)
+    user_thread.start()
+    for thread in threads + [user_thread]:
+        thread.join()
+    return max(job.finished_at for job in jobs) - start, user_job.finished_at - clicked_at, None
+
+
+def _job_pool(governor):
+    pool = JobPool(MEMBER_JOB_WORKERS)
+    jobs = [_SimulatedJob("initial_fetch", governor) for _ in range(MEMBERS_ADDED)]
+    start = time.perf_counter()
+    for i, job in enumerate(jobs):
+        pool.submit(job, JOB_PRIORITY_BACKGROUND, key=("initial_fetch", i))
+    queued_after_add = pool.stats()["queued"]
+    time.sleep(USER_CLICK_AFTER_SECONDS)
+    user_job = _SimulatedJob("instant_check", governor)
+    clicked_at = time.perf_counter()
+    pool.submit(user_job, JOB_PRIORITY_USER, key=("instant_check", 0))
+    while any(job.finished_at is None for job in jobs) or user_job.finished_at is None:
+        time.sleep(0.01)
+    elapsed = max(job.finished_at for job in jobs) - start
+    stats = pool.stats()
+    pool.shutdown(timeout=1)
+    QCoreApplication.processEvents() # تحرير المهام المنتهية في خيط الواجهة
+    stats["queued_after_add"] = queued_after_add
+    return elapsed, user_job.finished_at - clicked_at, stats
+
+
+def main():
+    app = QCoreApplication(sys.argv[:1])
+    rate = API_MAX_REQUESTS_PER_SECOND * RATE_SCALE
+    print(f"{MEMBERS_ADDED} members added x {REQUESTS_PER_JOB} requests | governor {rate:.0f} req/s | latency {LATENCY_SECONDS * 1000:.0f}ms | "
+          f"check clicked after {USER_CLICK_AFTER_SECONDS}s | {MEMBER_JOB_WORKERS} workers")
+    print(f"{'':<20} | {'peak threads':>12} | {'bulk add':>8} | {'user check latency':>18}")
+    print("-" * 68)
+    for name, run in (("thread per request", _thread_per_request), ("job pool", _job_pool)):
+        peak_threads = _PeakThreads()
+        elapsed, user_latency, stats = run(RequestGovernor(rate, API_REQUEST_BURST))
+        print(f"{name:<20} | {peak_threads.close():>12} | {elapsed:>7.2f}s | {user_latency * 1000:>16.0f}ms")
+        if stats:
+            print(f"    {stats}")
+    del app
+
+
+if __name__ == "__main__":
+    main()
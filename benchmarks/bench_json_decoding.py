@@ -0,0 +1,75 @@
+# benchmarks/bench_json_decoding.py
+"""
+Decode time and peak allocations per endpoint for the JSON decoders available to
+api_client (orjson / ujson / json on the raw bytes), against what response.json()
+did before (decode the body to text, then json.loads), on the responses recorded in
+har_reference/ (the largest recording of each endpoint, e.g. the ~400 KB base64 PDFs).
+
+Run from the repository root:
+    python benchmarks/bench_json_decoding.py
+"""
+import os
+import sys
+import json
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from har_replay_server import load_har_responses
+from api_client import JSON_DECODERS
+
+TARGET_SECONDS_PER_CASE = 0.3
+
+
+def _text_then_json(body):
+    return json.loads(body.decode('utf-8'))
+
+
+def _largest_body_per_endpoint(responses):
+    bodies = {}
+    for (method, endpoint, key), recorded in responses.items():
+        if key is None or not recorded.content_type.startswith("application/json") or not recorded.body:
+            continue
+        if len(recorded.body) > len(bodies.get(endpoint, b"")):
+            bodies[endpoint] = recorded.body
+    return bodies
+
+
+def _time_per_call(decode, body):
+    decode(body)
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            decode(body)
+        elapsed = time.perf_counter() - start
+        if elapsed >= TARGET_SECONDS_PER_CASE or calls >= 1_000_000:
+            return elapsed / calls
+        calls *= 4
+
+
+def _peak_allocation(decode, body):
+    tracemalloc.start()
+    result = decode(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main():
+    responses, _ = load_har_responses()
+    decoders = [("response.json()", _text_then_json)] + [(name, loads) for name, loads in JSON_DECODERS.items()]
+
+    print(f"{'endpoint':<34} | {'size':>8} | {'decoder':<16} | {'time':>10} | {'peak alloc':>10}")
+    print("-" * 92)
+    for endpoint, body in sorted(_largest_body_per_endpoint(responses).items(), key=lambda item: len(item[1])):
+        for decoder_name, decode in decoders:
+            per_call = _time_per_call(decode, body)
+            peak = _peak_allocation(decode, body)
+            print(f"{endpoint:<34} | {len(body) / 1024:>6.1f}KB | {decoder_name:<16} | {per_call * 1e6:>8.1f}us | {peak / 1024:>8.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
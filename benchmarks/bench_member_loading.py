@@ -0,0 +1,85 @@
+# benchmarks/bench_member_loading.py
+"""
+Time to first batch, total load time and peak memory when reading
+members_data.json with json.load against the streaming loader
+(buffered reads and mmap), at 10k and 100k members.
+
+Run from the repository root:
+    python benchmarks/bench_member_loading.py
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from member import Member
+from member_storage import iter_json_array_items, _batched
+
+ROSTER_SIZES = (10000, 100000)
+BATCH_SIZE = 500
+STATUSES = ["جديد", "تم التحقق", "لا توجد مواعيد", "تم الحجز", "مكتمل", "فشل التحقق"]
+
+
+def _write_data_file(path, count):
+    member_dicts = []
+    for i in range(count):
+        member = Member(f"{i:018d}", f"{i:012d}", f"{i:012d}", f"0{i:09d}")
+        member.status = STATUSES[i % len(STATUSES)]
+        member.nom_ar = "اسم"
+        member.prenom_ar = "لقب"
+        member.last_activity_detail = member.full_last_activity_detail = "تم التحقق من البيانات بنجاح."
+        member_dicts.append(member.to_dict())
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(member_dicts, f, ensure_ascii=False, indent=4)
+
+
+def _load_whole(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data_list = json.load(f)
+    yield [Member.from_dict(data) for data in data_list]
+
+
+def _load_streaming(path, use_mmap):
+    for batch in _batched(iter_json_array_items(path, use_mmap=use_mmap), BATCH_SIZE):
+        yield [Member.from_dict(data) for data in batch]
+
+
+def _measure(batches):
+    """(time to first batch, total time, peak traced memory) keeping every member alive like the app does."""
+    members = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_batch_time = None
+    for batch in batches:
+        members.extend(batch)
+        if first_batch_time is None:
+            first_batch_time = time.perf_counter() - start
+    total_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_batch_time, total_time, peak
+
+
+def main():
+    print(f"{'members':>8} | {'loader':>12} | {'first rows':>10} | {'total':>9} | {'peak memory':>11}")
+    print("-" * 64)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in ROSTER_SIZES:
+            path = os.path.join(tmp_dir, f"members_{count}.json")
+            _write_data_file(path, count)
+            loaders = (
+                ("json.load", lambda: _load_whole(path)),
+                ("stream", lambda: _load_streaming(path, False)),
+                ("stream+mmap", lambda: _load_streaming(path, True)),
+            )
+            for name, make_batches in loaders:
+                first_batch_time, total_time, peak = _measure(make_batches())
+                print(f"{count:>8} | {name:>12} | {first_batch_time * 1000:>8.1f}ms | {total_time * 1000:>7.1f}ms | {peak / 1024 / 1024:>7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_member_registry.py
+"""
+Compares member lookups done with list.index() (the old AnemApp approach)
+against MemberRegistry, for growing roster sizes.
+A "refresh" looks up every member once; a "signal" is one lookup for a
+member near the end of the list, as done for each thread update.
+
+Run from the repository root:
+    python benchmarks/bench_member_registry.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from member import Member
+from member_registry import MemberRegistry
+
+ROSTER_SIZES = (500, 1000, 2000, 4000, 8000)
+SIGNALS_PER_RUN = 2000
+
+
+def _make_members(count):
+    return [Member(f"{i:018d}", f"{i:012d}", f"{i:012d}") for i in range(count)]
+
+
+def _full_refresh_with_list_index(members_list):
+    for member in members_list:
+        members_list.index(member)
+
+
+def _full_refresh_with_registry(registry, members_list):
+    for member in members_list:
+        registry.index_of(member)
+
+
+def _signals_with_list_index(members_list, indices):
+    for idx in indices:
+        members_list.index(members_list[idx])
+
+
+def _signals_with_registry(registry, members_list, indices):
+    for idx in indices:
+        registry.index_of(members_list[idx])
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'members':>8} | {'refresh list.index':>20} | {'refresh registry':>18} | {'signal list.index':>19} | {'signal registry':>17}")
+    print("-" * 96)
+    for count in ROSTER_SIZES:
+        members_list = _make_members(count)
+        registry = MemberRegistry(members_list)
+        # أسوأ حالة للبحث الخطي: تحديثات لأعضاء في نهاية القائمة
+        signal_indices = [count - 1 - (i % 50) for i in range(SIGNALS_PER_RUN)]
+
+        refresh_old = _timed(_full_refresh_with_list_index, members_list)
+        refresh_new = _timed(_full_refresh_with_registry, registry, members_list)
+        signal_old = _timed(_signals_with_list_index, members_list, signal_indices)
+        signal_new = _timed(_signals_with_registry, registry, members_list, signal_indices)
+
+        print(f"{count:>8} | "
+              f"{refresh_old / count * 1e6:>14.2f} us/row | "
+              f"{refresh_new / count * 1e6:>12.2f} us/row | "
+              f"{signal_old / SIGNALS_PER_RUN * 1e6:>13.2f} us/sig | "
+              f"{signal_new / SIGNALS_PER_RUN * 1e6:>11.2f} us/sig")
+
+
+if __name__ == "__main__":
+    main()
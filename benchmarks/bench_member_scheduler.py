@@ -0,0 +1,140 @@
+# benchmarks/bench_member_scheduler.py
+"""
+Monitoring of a mixed list of members on a simulated clock (no network), with the old
+round-robin cycle and with MemberScheduler:
+
+- bookable members (NO_SLOTS): the only checks that can lead to a booking;
+- members that are done (COMPLETED, PDFs on disk) or beneficiaries (terminal);
+- members stuck after validation (INVALID_INPUT) or waiting for PDFs (PDF_DOWNLOAD_FAILED).
+
+Every real check costs the member delay (5-10s, as in the default settings); skipping a
+terminal member costs 0.1s; a pass ends with the monitoring interval (1 min). No member
+changes state. The first hour (the first pass over every member, the backoff growing) is
+not counted; reports checks per hour over the next two hours for each group and the
+longest gap between two checks of the same bookable member.
+
+Run from the repository root:
+    python benchmarks/bench_member_scheduler.py
+"""
+import os
+import sys
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from member import Member
+from member_status import MemberStatus
+from member_scheduler import MemberScheduler
+from config import MONITORING_MAX_BACKOFF_MINUTES
+
+MEMBER_COUNTS = {
+    MemberStatus.NO_SLOTS: 20,
+    MemberStatus.COMPLETED: 40,
+    MemberStatus.BENEFICIARY: 10,
+    MemberStatus.INVALID_INPUT: 20,
+    MemberStatus.PDF_DOWNLOAD_FAILED: 10,
+}
+MIN_MEMBER_DELAY = 5
+MAX_MEMBER_DELAY = 10
+SKIP_SECONDS = 0.1
+INTERVAL_SECONDS = 60
+WARM_UP_SECONDS = 3600
+MEASURED_HOURS = 2
+SIMULATED_SECONDS = WARM_UP_SECONDS + MEASURED_HOURS * 3600
+
+
+def _make_members(pdf_dir):
+    pdf_path = os.path.join(pdf_dir, "honneur.pdf")
+    open(pdf_path, "wb").close()
+    members = []
+    for status, count in MEMBER_COUNTS.items():
+        for _ in range(count):
+            i = len(members)
+            member = Member(f"{i:018d}", f"{i:012d}", f"{i:010d}", f"0{i:09d}")
+            member.status = status
+            if status is MemberStatus.COMPLETED:
+                member.pdf_honneur_path = pdf_path
+            members.append(member)
+    return members
+
+
+class _Recorder:
+    def __init__(self):
+        self.checks = {status: 0 for status in MEMBER_COUNTS}
+        self.last_check = {}
+        self.max_gap = 0.0
+
+    def check(self, member, now):
+        if now < WARM_UP_SECONDS:
+            return
+        self.checks[member.status] += 1
+        if member.status.bookable:
+            self.max_gap = max(self.max_gap, now - self.last_check.get(id(member), WARM_UP_SECONDS))
+            self.last_check[id(member)] = now
+
+
+def _round_robin(members, rng):
+    recorder = _Recorder()
+    now = 0.0
+    while now < SIMULATED_SECONDS:
+        for member in members:
+            if now >= SIMULATED_SECONDS:
+                break
+            if member.status.is_terminal:
+                now += SKIP_SECONDS
+                continue
+            recorder.check(member, now)
+            now += rng.uniform(MIN_MEMBER_DELAY, MAX_MEMBER_DELAY)
+        now += INTERVAL_SECONDS
+    return recorder
+
+
+def _scheduled(members, rng):
+    recorder = _Recorder()
+    clock = [0.0]
+    scheduler = MemberScheduler(INTERVAL_SECONDS, MONITORING_MAX_BACKOFF_MINUTES * 60, 5, clock=lambda: clock[0])
+    while clock[0] < SIMULATED_SECONDS:
+        scheduler.sync(members)
+        member, wait_seconds = scheduler.next_due()
+        if member is None:
+            clock[0] += INTERVAL_SECONDS
+            continue
+        if wait_seconds > 0:
+            clock[0] += min(wait_seconds, INTERVAL_SECONDS)
+            continue
+        scheduler.take(member)
+        if member.status.is_terminal:
+            scheduler.reschedule(member)
+            continue
+        recorder.check(member, clock[0])
+        scheduler.reschedule(member)
+        clock[0] += rng.uniform(MIN_MEMBER_DELAY, MAX_MEMBER_DELAY)
+    return recorder, scheduler.stats()
+
+
+def main():
+    pdf_dir = tempfile.mkdtemp(prefix="anem_scheduler_bench_")
+    try:
+        members = _make_members(pdf_dir)
+        print(f"{len(members)} members | member delay {MIN_MEMBER_DELAY}-{MAX_MEMBER_DELAY}s | interval {INTERVAL_SECONDS}s | {MEASURED_HOURS}h measured after {WARM_UP_SECONDS // 60}min")
+        print("  " + ", ".join(f"{status.name}: {count}" for status, count in MEMBER_COUNTS.items()))
+        round_robin = _round_robin(members, random.Random(1))
+        scheduled, scheduler_stats = _scheduled(members, random.Random(1))
+        print(f"{'checks per hour':<22} | {'round-robin':>11} | {'scheduler':>9}")
+        print("-" * 48)
+        for status in MEMBER_COUNTS:
+            print(f"{status.name:<22} | {round_robin.checks[status] / MEASURED_HOURS:>11.0f} | {scheduled.checks[status] / MEASURED_HOURS:>9.0f}")
+        total = lambda recorder: sum(recorder.checks.values())
+        print(f"{'total':<22} | {total(round_robin) / MEASURED_HOURS:>11.0f} | {total(scheduled) / MEASURED_HOURS:>9.0f}")
+        print(f"{'useful share':<22} | {round_robin.checks[MemberStatus.NO_SLOTS] / total(round_robin):>11.0%} | "
+              f"{scheduled.checks[MemberStatus.NO_SLOTS] / total(scheduled):>9.0%}")
+        print(f"{'max bookable gap':<22} | {round_robin.max_gap / 60:>9.1f}min | {scheduled.max_gap / 60:>7.1f}min")
+        print(f"scheduler: {scheduler_stats}")
+    finally:
+        shutil.rmtree(pdf_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_member_slots.py
+"""
+Memory footprint and (de)serialisation throughput of the slotted Member
+against a replica of the previous __dict__-based class, at 100k members.
+
+Run from the repository root:
+    python benchmarks/bench_member_slots.py
+"""
+import os
+import sys
+import json
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from member import Member, MEMBER_FIELDS, MEMBER_FIELD_NAMES
+
+MEMBER_COUNT = 100000
+STATUSES = ["جديد", "تم التحقق", "لا توجد مواعيد", "تم الحجز", "مكتمل", "فشل التحقق"]
+
+
+class DictMember:
+    """Same fields as Member, stored in a per-instance __dict__ (the layout before __slots__)."""
+
+    def __init__(self, nin, wassit_no, ccp, phone_number=""):
+        for name, default in MEMBER_FIELDS:
+            setattr(self, name, default)
+        self.nin = nin
+        self.wassit_no = wassit_no
+        self.ccp = ccp
+        self.phone_number = phone_number
+        self.allocation_details = {}
+        self.is_processing = False
+        self.member_id = None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in MEMBER_FIELD_NAMES}
+
+
+def _fill(member, i):
+    member.status = STATUSES[i % len(STATUSES)]
+    member.nom_ar = "اسم"
+    member.prenom_ar = "لقب"
+    member.last_activity_detail = member.full_last_activity_detail = "تم التحقق من البيانات بنجاح."
+    return member
+
+
+def _build(member_cls):
+    return [_fill(member_cls(f"{i:018d}", f"{i:012d}", f"{i:012d}", f"0{i:09d}"), i) for i in range(MEMBER_COUNT)]
+
+
+def _measure_memory(member_cls):
+    tracemalloc.start()
+    members = _build(member_cls)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, members
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    legacy_bytes, legacy_members = _measure_memory(DictMember)
+    del legacy_members
+    slotted_bytes, members = _measure_memory(Member)
+    print(f"{MEMBER_COUNT} members")
+    print(f"  memory  __dict__ : {legacy_bytes / 1024 / 1024:8.1f} MiB")
+    print(f"  memory  __slots__: {slotted_bytes / 1024 / 1024:8.1f} MiB ({100 * (1 - slotted_bytes / legacy_bytes):.0f}% less)")
+
+    to_dict_time, dicts = _timed(lambda: [m.to_dict() for m in members])
+    to_tuple_time, tuples = _timed(lambda: [m.to_tuple() for m in members])
+    from_dict_time, _ = _timed(lambda: [Member.from_dict(d) for d in dicts])
+    from_tuple_time, _ = _timed(lambda: [Member.from_tuple(t) for t in tuples])
+    dumps_dicts_time, dicts_text = _timed(lambda: json.dumps(dicts, ensure_ascii=False))
+    dumps_tuples_time, tuples_text = _timed(lambda: json.dumps(tuples, ensure_ascii=False))
+
+    print(f"  to_dict    : {to_dict_time * 1000:8.1f}ms    to_tuple   : {to_tuple_time * 1000:8.1f}ms")
+    print(f"  from_dict  : {from_dict_time * 1000:8.1f}ms    from_tuple : {from_tuple_time * 1000:8.1f}ms")
+    print(f"  json dicts : {dumps_dicts_time * 1000:8.1f}ms ({len(dicts_text) / 1024 / 1024:.1f} MiB)    "
+          f"json tuples: {dumps_tuples_time * 1000:8.1f}ms ({len(tuples_text) / 1024 / 1024:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
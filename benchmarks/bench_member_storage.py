@@ -0,0 +1,85 @@
+# benchmarks/bench_member_storage.py
+"""
+Load / save / filter timings of JsonMemberStorage, BinaryMemberStorage and
+SQLiteMemberStorage at 1k, 10k and 50k members. Files are written to a temporary directory.
+
+Run from the repository root:
+    python benchmarks/bench_member_storage.py
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from member import Member
+from member_storage import JsonMemberStorage, BinaryMemberStorage, SQLiteMemberStorage
+
+ROSTER_SIZES = (1000, 10000, 50000)
+CHANGED_FRACTION = 0.01 # نسبة الأعضاء الذين تتغير حالتهم بين حفظين
+STATUSES = ["جديد", "تم التحقق", "لا توجد مواعيد", "تم الحجز", "مكتمل", "فشل التحقق"]
+
+
+def _make_member_dicts(count):
+    member_dicts = []
+    for i in range(count):
+        member = Member(f"{i:018d}", f"{i:012d}", f"{i:012d}", f"0{i:09d}")
+        member.status = STATUSES[i % len(STATUSES)]
+        member.nom_ar = "اسم"
+        member.prenom_ar = "لقب"
+        member.already_has_rdv = i % 7 == 0
+        if member.already_has_rdv:
+            member.rdv_date = "2026-01-15"
+        member.set_activity_detail("تم التحقق من البيانات بنجاح.")
+        member_dicts.append(member.to_dict())
+    return member_dicts
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def _python_scan(member_dicts, status):
+    return [d['nin'] for d in member_dicts if d['status'] == status]
+
+
+def main():
+    print(f"{'members':>8} | {'backend':>7} | {'save all':>9} | {'save 1%':>9} | {'load':>9} | {'filter status':>13} | {'filter rdv':>10}")
+    print("-" * 84)
+    for count in ROSTER_SIZES:
+        member_dicts = _make_member_dicts(count)
+        changed_count = max(1, int(count * CHANGED_FRACTION))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, "members_data.json")
+            json_storage = JsonMemberStorage(json_path, json_path + ".tmp", json_path + ".bak")
+            binary_path = os.path.join(tmp_dir, "members_data.bin")
+            binary_storage = BinaryMemberStorage(binary_path, binary_path + ".tmp", binary_path + ".bak")
+            sqlite_storage = SQLiteMemberStorage(os.path.join(tmp_dir, "members_data.sqlite3"))
+
+            for storage in (json_storage, binary_storage, sqlite_storage):
+                save_all_time, _ = _timed(storage.save_member_dicts, member_dicts)
+                for d in member_dicts[:changed_count]:
+                    d['status'] = "تم الحجز"
+                save_changed_time, _ = _timed(storage.save_member_dicts, member_dicts)
+                for d in member_dicts[:changed_count]:
+                    d['status'] = "جديد"
+                load_time, _ = _timed(storage.load_member_dicts)
+
+                if storage.supports_queries:
+                    status_time, _ = _timed(storage.query_nins, "status", "مكتمل")
+                    rdv_time, _ = _timed(storage.query_nins, "has_rdv", True)
+                else:
+                    status_time, _ = _timed(_python_scan, member_dicts, "مكتمل")
+                    rdv_time, _ = _timed(lambda: [d['nin'] for d in member_dicts if d['already_has_rdv']])
+
+                print(f"{count:>8} | {storage.name:>7} | {save_all_time * 1000:>7.1f}ms | {save_changed_time * 1000:>7.1f}ms | "
+                      f"{load_time * 1000:>7.1f}ms | {status_time * 1000:>11.2f}ms | {rdv_time * 1000:>8.2f}ms")
+            sqlite_storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_monitoring_replay.py
+"""
+End-to-end timing of the MonitoringThread processing steps (validation, name fetch,
+dates + booking, PDF download) against the local HAR replay server, so changes to the
+API client and the threads can be measured offline and reproducibly.
+
+The roster cycles through the candidates recorded in har_reference/. PDFs are written
+under a temporary HOME that is removed at the end.
+
+Run from the repository root:
+    python benchmarks/bench_monitoring_replay.py
+    python benchmarks/bench_monitoring_replay.py --members 200 --latency-ms 80 --rate-429 0.05 --error-rate 0.02
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# قبل استيراد config و threads: مجلدات التطبيق والشهادات تُنشأ داخل مجلد مؤقت
+_TEMP_HOME = tempfile.mkdtemp(prefix="anem_replay_bench_")
+os.environ["HOME"] = _TEMP_HOME
+os.environ["XDG_DATA_HOME"] = os.path.join(_TEMP_HOME, ".local", "share")
+os.environ["XDG_DOCUMENTS_DIR"] = os.path.join(_TEMP_HOME, "Documents")
+
+from PyQt5.QtCore import QCoreApplication
+
+from har_replay_server import HarReplayServer
+from member import Member
+from threads import MonitoringThread
+from member_pipeline import MemberPipeline
+from rate_governor import RequestGovernor
+from config import API_REQUEST_BURST, DEFAULT_SETTINGS, SETTING_BACKOFF_GENERAL, SETTING_BACKOFF_429, SETTING_REQUEST_TIMEOUT
+
+BENCH_SETTINGS = {
+    SETTING_BACKOFF_GENERAL: 0.05, # تأخير إعادة المحاولة قصير: نقيس كلفة المعالجة لا الانتظار
+    SETTING_BACKOFF_429: 0.05,
+    SETTING_REQUEST_TIMEOUT: 10,
+}
+
+
+def _make_members(candidates, count):
+    members = []
+    for i in range(count):
+        wassit_no, nin = candidates[i % len(candidates)]
+        members.append(Member(nin, wassit_no, f"{i:012d}", f"0{i:09d}"))
+    return members
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests-per-second", type=float, default=None,
+                        help="ceiling of the request governor (default: none, only the 429 cooldown)")
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv[:1])
+    try:
+        with HarReplayServer(latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+                             rate_429=args.rate_429, error_rate=args.error_rate, seed=args.seed) as server:
+            settings = dict(DEFAULT_SETTINGS, **BENCH_SETTINGS)
+            members = _make_members(server.candidates, args.members)
+            monitor = MonitoringThread(members_list_ref=members, settings=settings)
+            monitor.api_client.base_url = server.base_url
+            monitor.api_client.governor = RequestGovernor(args.requests_per_second, API_REQUEST_BURST)
+            monitor.api_client.response_cache = None # القائمة تكرر نفس المترشحين: كل عضو يُفحص على الخادم
+            # نفس خيارات SingleMemberCheckJob: كل عضو جديد يمر بكل المراحل
+            pipeline = MemberPipeline(monitor.processing, lambda: True, pdf_only_shortcut=False, stop_states_skip_pdf=True, pdf_for_beneficiary=True)
+
+            member_times = []
+            start = time.perf_counter()
+            for idx, member in enumerate(members):
+                member_start = time.perf_counter()
+                pipeline.run(idx, member, "bench")
+                member_times.append(time.perf_counter() - member_start)
+            total_time = time.perf_counter() - start
+
+            member_times.sort()
+            request_count = sum(count for name, count in server.stats.items() if name not in ("site_check", "connections"))
+            print(f"members: {len(members)} | latency: {args.latency_ms:.0f}+{args.latency_jitter_ms:.0f}ms | "
+                  f"429: {args.rate_429:.0%} | errors: {args.error_rate:.0%} | seed: {args.seed}")
+            print(f"total: {total_time:.2f}s | per member: p50 {_percentile(member_times, 0.5) * 1000:.0f}ms, "
+                  f"p95 {_percentile(member_times, 0.95) * 1000:.0f}ms, max {member_times[-1] * 1000:.0f}ms | "
+                  f"requests: {request_count} ({request_count / total_time:.1f}/s)")
+            print("pipeline stages:")
+            for stage, stage_stats in pipeline.stage_stats().items():
+                print(f"    {stage:<36} {stage_stats}")
+            print("requests by endpoint:")
+            for name, count in sorted(server.stats.items()):
+                print(f"    {name:<36} {count:>6}")
+            print("final statuses:")
+            for status, count in Counter(member.status for member in members).most_common():
+                print(f"    {status.name:<36} {count:>6}")
+    finally:
+        del app
+        shutil.rmtree(_TEMP_HOME, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
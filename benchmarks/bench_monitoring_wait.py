@@ -0,0 +1,124 @@
+# benchmarks/bench_monitoring_wait.py
+"""
+The waits of MonitoringThread (between members, until the next due member), with the old
+1-second sleep loop (kept here as a copy) and with the current _wait_with_countdown on a
+threading.Event:
+
+- stop latency: stop_monitoring() is called at a random point of a 10s wait;
+- settings latency: the interval is changed at a random point of a 10s wait; the old
+  loop only sees it when the wait is over;
+- countdown signals sent to the GUI thread during a 3s wait (the old loop: one per
+  second plus the final clear);
+- accuracy of a fractional member delay (the old loop truncated it to whole seconds and
+  slept the rest without watching for a stop).
+
+No network: keep-warm is off.
+
+Run from the repository root:
+    python benchmarks/bench_monitoring_wait.py
+"""
+import os
+import sys
+import time
+import random
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication, Qt
+
+from member import Member
+from threads import MonitoringThread
+from config import DEFAULT_SETTINGS
+
+ROUNDS = 5
+WAIT_SECONDS = 10
+FRACTIONAL_DELAY = 1.6
+
+
+def _old_wait(monitor, total_seconds, countdown_prefix=""):
+    """The loop MonitoringThread used before (without keep-warm)."""
+    for i in range(total_seconds, 0, -1):
+        if not monitor.is_running: break
+        minutes, seconds = divmod(i, 60)
+        hours, minutes = divmod(minutes, 60)
+        monitor.countdown_deadline_signal.emit(f"{countdown_prefix}{hours:02d}:{minutes:02d}:{seconds:02d}", 0.0)
+        time.sleep(1)
+    if monitor.is_running:
+        monitor.countdown_deadline_signal.emit("", 0.0)
+
+
+def _old_member_delay(monitor, member_delay):
+    _old_wait(monitor, int(member_delay))
+    if monitor.is_running:
+        time.sleep(member_delay - int(member_delay))
+
+
+def _new_wait(monitor, total_seconds):
+    monitor._wait_with_countdown(total_seconds, "الفحص التالي بعد: ")
+
+
+def _make_monitor(signals):
+    monitor = MonitoringThread(members_list_ref=[Member("109910263005740008", "100000000001", "0000000001", "0500000000")],
+                               settings=dict(DEFAULT_SETTINGS))
+    monitor.countdown_deadline_signal.connect(lambda *args: signals.append(args), Qt.DirectConnection)
+    return monitor
+
+
+def _interrupted_wait(wait, interrupt, rng):
+    """Seconds between the interruption and the end of the wait."""
+    signals = []
+    monitor = _make_monitor(signals)
+    waiter = threading.Thread(target=wait, args=(monitor, WAIT_SECONDS))
+    waiter.start()
+    time.sleep(rng.uniform(0.2, 1.2))
+    interrupted_at = time.perf_counter()
+    interrupt(monitor)
+    if interrupt is _change_settings:
+        # الحلقة القديمة لا ترى التغيير: القياس حتى نهاية الانتظار
+        waiter.join(WAIT_SECONDS + 2)
+    else:
+        waiter.join()
+    latency = time.perf_counter() - interrupted_at
+    monitor.stop_monitoring()
+    waiter.join()
+    return latency
+
+
+def _change_settings(monitor):
+    settings = dict(monitor.settings)
+    monitor.update_thread_settings(settings)
+
+
+def _signals_per_wait(wait):
+    signals = []
+    wait(_make_monitor(signals), 3)
+    return len(signals)
+
+
+def _delay_error(member_delay):
+    monitor = _make_monitor([])
+    start = time.perf_counter()
+    member_delay(monitor)
+    return time.perf_counter() - start - FRACTIONAL_DELAY
+
+
+def main():
+    app = QCoreApplication(sys.argv[:1])
+    rng = random.Random(1)
+    print(f"{'':<30} | {'1s sleep loop':>13} | {'event wait':>10}")
+    print("-" * 60)
+    stop = [(sum(_interrupted_wait(wait, MonitoringThread.stop_monitoring, rng) for _ in range(ROUNDS)) / ROUNDS) for wait in (_old_wait, _new_wait)]
+    print(f"{'stop latency (avg)':<30} | {stop[0] * 1000:>11.0f}ms | {stop[1] * 1000:>8.1f}ms")
+    settings = [_interrupted_wait(wait, _change_settings, rng) for wait in (_old_wait, _new_wait)]
+    print(f"{'settings change latency':<30} | {settings[0]:>12.1f}s | {settings[1] * 1000:>8.1f}ms")
+    counts = [_signals_per_wait(wait) for wait in (_old_wait, _new_wait)]
+    print(f"{'GUI signals per 3s wait':<30} | {counts[0]:>13} | {counts[1]:>10}")
+    errors = [_delay_error(lambda monitor: _old_member_delay(monitor, FRACTIONAL_DELAY)),
+              _delay_error(lambda monitor: monitor._wait_with_countdown(FRACTIONAL_DELAY))]
+    print(f"{f'error on a {FRACTIONAL_DELAY}s member delay':<30} | {errors[0] * 1000:>11.1f}ms | {errors[1] * 1000:>8.1f}ms")
+    del app
+
+
+if __name__ == "__main__":
+    main()
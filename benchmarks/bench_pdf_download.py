@@ -0,0 +1,85 @@
+# benchmarks/bench_pdf_download.py
+"""
+Time and peak Python memory per certificate for the two PDF download paths against
+the HAR replay server: the old one (download_pdf -> JSON -> base64.b64decode -> write)
+and the streaming one (download_pdf_to_file). The replayed PDFs are ~300 KB; --scale
+repeats the PDF bytes to simulate bigger certificates.
+
+Run from the repository root:
+    python benchmarks/bench_pdf_download.py
+    python benchmarks/bench_pdf_download.py --scale 20
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from har_replay_server import HarReplayServer, RecordedResponse
+from api_client import AnemAPIClient
+
+REPORT_TYPE = "HonneurEngagementReport"
+PRE_INSCRIPTION_ID = "0611c8ef-2037-4ad9-b48a-442865b85f4e"
+ROUNDS = 5
+
+
+def _old_download(client, file_path):
+    response_data, api_err = client.download_pdf(REPORT_TYPE, PRE_INSCRIPTION_ID)
+    pdf_b64 = response_data if isinstance(response_data, str) else response_data.get("base64Pdf")
+    pdf_content = base64.b64decode(pdf_b64)
+    with open(file_path, 'wb') as f:
+        f.write(pdf_content)
+    return file_path
+
+
+def _streaming_download(client, file_path):
+    downloaded_path, api_err = client.download_pdf_to_file(REPORT_TYPE, PRE_INSCRIPTION_ID, file_path)
+    return downloaded_path
+
+
+def _measure(download, client, file_path):
+    download(client, file_path) # إحماء (الاتصال)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        download(client, file_path)
+    per_call = (time.perf_counter() - start) / ROUNDS
+    tracemalloc.start()
+    download(client, file_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return per_call, peak, os.path.getsize(file_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF download: whole-response vs streaming.")
+    parser.add_argument("--scale", type=int, default=1, help="repeat the recorded PDF bytes this many times")
+    args = parser.parse_args()
+
+    with HarReplayServer() as server, tempfile.TemporaryDirectory() as tmp_dir:
+        key = ("GET", f"download/{REPORT_TYPE}", None)
+        recorded = server.responses[key]
+        if args.scale > 1:
+            pdf_b64 = base64.b64encode(base64.b64decode(json.loads(recorded.body)) * args.scale).decode('ascii')
+            recorded = RecordedResponse(recorded.status, recorded.content_type, json.dumps(pdf_b64).encode('ascii'))
+            server.responses = {k: v for k, v in server.responses.items() if k[:2] != key[:2]}
+            server.responses[key] = recorded
+
+        client = AnemAPIClient(initial_backoff_general=0.01, initial_backoff_429=0.01, request_timeout=30)
+        client.base_url = server.base_url
+        client.governor = None # يقيس مسار التحميل فقط، بدون سقف الطلبات
+
+        print(f"response: {len(recorded.body) / 1024:.0f} KB of JSON")
+        print(f"{'path':<24} | {'time':>9} | {'peak memory':>11} | {'PDF size':>9}")
+        print("-" * 64)
+        for name, download in (("whole response", _old_download), ("streaming", _streaming_download)):
+            per_call, peak, size = _measure(download, client, os.path.join(tmp_dir, f"{name}.pdf"))
+            print(f"{name:<24} | {per_call * 1000:>7.1f}ms | {peak / 1024:>9.0f}KB | {size / 1024:>7.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
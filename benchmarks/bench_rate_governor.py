@@ -0,0 +1,86 @@
+# benchmarks/bench_rate_governor.py
+"""
+Several worker threads (monitoring, PDF downloads, initial info...), each with its own
+AnemAPIClient, against the HAR replay server with a server-side rate limit:
+
+- "per-call backoff": no shared governor; each call backs off on its own 429s only.
+- "shared cooldown": shared RequestGovernor without a ceiling; a 429 pauses every thread.
+- "shared ceiling": shared RequestGovernor a little under the server's limit.
+
+Reports the requests the server saw, how many it rejected (429), the calls that
+succeeded / gave up, and the useful throughput (successful calls per second).
+
+Run from the repository root:
+    python benchmarks/bench_rate_governor.py
+"""
+import os
+import sys
+import time
+import logging
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from har_replay_server import HarReplayServer
+from api_client import AnemAPIClient
+from rate_governor import RequestGovernor
+
+SERVER_RATE_LIMIT_RPS = 20
+SERVER_RATE_LIMIT_BURST = 5
+LATENCY_MS = 10
+THREAD_COUNT = 8
+CALLS_PER_THREAD = 30
+BACKOFF_429_SECONDS = 0.25 # مقياس مصغّر لـ 60 ثانية في التطبيق
+GOVERNOR_BURST = 4
+
+
+def _run(server, governor):
+    wassit_no, nin = server.candidates[0]
+    results = {"ok": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def worker():
+        client = AnemAPIClient(initial_backoff_general=0.05, initial_backoff_429=BACKOFF_429_SECONDS, request_timeout=10)
+        client.base_url = server.base_url
+        client.governor = governor
+        client.response_cache = None # نفس الطلب يتكرر: يجب أن يصل إلى الخادم
+        client.request_coalescer = None
+        for _ in range(CALLS_PER_THREAD):
+            data, error = client.validate_candidate(wassit_no, nin)
+            with lock:
+                results["ok" if error is None else "failed"] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(THREAD_COUNT)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, results
+
+
+def main():
+    # رسائل التحذير الخاصة بـ 429 متوقعة هنا
+    logging.basicConfig(level=logging.CRITICAL)
+    scenarios = [
+        ("per-call backoff", lambda: None),
+        ("shared cooldown", lambda: RequestGovernor(None, GOVERNOR_BURST)),
+        (f"shared ceiling {SERVER_RATE_LIMIT_RPS * 0.9:.0f}/s", lambda: RequestGovernor(SERVER_RATE_LIMIT_RPS * 0.9, GOVERNOR_BURST)),
+    ]
+    with HarReplayServer(latency_ms=LATENCY_MS, rate_limit_rps=SERVER_RATE_LIMIT_RPS, rate_limit_burst=SERVER_RATE_LIMIT_BURST) as server:
+        print(f"{THREAD_COUNT} threads x {CALLS_PER_THREAD} calls | server limit {SERVER_RATE_LIMIT_RPS}/s (burst {SERVER_RATE_LIMIT_BURST})")
+        print(f"{'scenario':<22} | {'total':>7} | {'sent':>5} | {'429':>5} | {'ok':>4} | {'failed':>6} | {'ok/s':>5}")
+        print("-" * 72)
+        for name, make_governor in scenarios:
+            server.reset_stats()
+            governor = make_governor()
+            total, results = _run(server, governor)
+            rejected = server.stats["rate_limited_429"]
+            sent = rejected + sum(count for key, count in server.stats.items() if key.startswith("validateCandidate"))
+            print(f"{name:<22} | {total:>6.2f}s | {sent:>5} | {rejected:>5} | {results['ok']:>4} | {results['failed']:>6} | {results['ok'] / total:>5.1f}")
+            if governor is not None:
+                print(f"    governor: {governor.stats()}")
+
+
+if __name__ == "__main__":
+    main()
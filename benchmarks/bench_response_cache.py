@@ -0,0 +1,82 @@
+# benchmarks/bench_response_cache.py
+"""
+Requests sent when members are added: FetchInitialInfoJob followed by the automatic
+SingleMemberCheckJob (main_app._trigger_auto_check_after_add), with and without the
+shared response cache (config.RESPONSE_CACHE), against the HAR replay server.
+The jobs' run() methods are called directly, one member after the other.
+
+Run from the repository root:
+    python benchmarks/bench_response_cache.py
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# قبل استيراد config و threads: مجلدات التطبيق والشهادات تُنشأ داخل مجلد مؤقت
+_TEMP_HOME = tempfile.mkdtemp(prefix="anem_cache_bench_")
+os.environ["HOME"] = _TEMP_HOME
+os.environ["XDG_DATA_HOME"] = os.path.join(_TEMP_HOME, ".local", "share")
+os.environ["XDG_DOCUMENTS_DIR"] = os.path.join(_TEMP_HOME, "Documents")
+
+from PyQt5.QtCore import QCoreApplication
+
+from har_replay_server import HarReplayServer
+from member import Member
+from api_client import AnemAPIClient
+from threads import FetchInitialInfoJob, SingleMemberCheckJob
+from config import (DEFAULT_SETTINGS, SETTING_BACKOFF_GENERAL, SETTING_BACKOFF_429, SETTING_REQUEST_TIMEOUT,
+                    API_CACHE_TTL_SECONDS, REQUEST_GOVERNOR, RESPONSE_CACHE)
+import api_client as api_client_module
+
+LATENCY_MS = 80
+BENCH_SETTINGS = {
+    SETTING_BACKOFF_GENERAL: 0.05,
+    SETTING_BACKOFF_429: 0.05,
+    SETTING_REQUEST_TIMEOUT: 10,
+}
+
+
+def _add_members(server, settings):
+    """(requests sent, seconds spent in the automatic checks)."""
+    check_seconds = 0.0
+    server.reset_stats()
+    for i, (wassit_no, nin) in enumerate(server.candidates):
+        member = Member(nin, wassit_no, f"{i:012d}", f"0{i:09d}")
+        client = AnemAPIClient(settings[SETTING_BACKOFF_GENERAL], settings[SETTING_BACKOFF_429], settings[SETTING_REQUEST_TIMEOUT])
+        FetchInitialInfoJob(member, i, client, settings).run()
+        start = time.perf_counter()
+        SingleMemberCheckJob(member, i, client, settings).run()
+        check_seconds += time.perf_counter() - start
+    sent = sum(count for name, count in server.stats.items() if name not in ("site_check", "connections"))
+    return sent, check_seconds
+
+
+def main():
+    app = QCoreApplication(sys.argv[:1])
+    try:
+        with HarReplayServer(latency_ms=LATENCY_MS) as server:
+            # خيوط الفحص تنشئ عملاءها بنفسها: يُوجه العنوان الافتراضي إلى خادم الإعادة
+            api_client_module.BASE_API_URL = server.base_url
+            REQUEST_GOVERNOR.set_rate(None)
+            settings = dict(DEFAULT_SETTINGS, **BENCH_SETTINGS)
+
+            print(f"{len(server.candidates)} members added | latency {LATENCY_MS}ms")
+            print(f"{'cache':<6} | {'requests':>8} | {'auto checks':>11} | cache stats")
+            print("-" * 80)
+            for enabled in (False, True):
+                RESPONSE_CACHE.ttl_by_endpoint = dict(API_CACHE_TTL_SECONDS) if enabled else {}
+                RESPONSE_CACHE.invalidate()
+                RESPONSE_CACHE.hits = RESPONSE_CACHE.misses = 0
+                sent, check_seconds = _add_members(server, settings)
+                print(f"{'on' if enabled else 'off':<6} | {sent:>8} | {check_seconds:>10.2f}s | {RESPONSE_CACHE.stats() if enabled else '-'}")
+    finally:
+        del app
+        shutil.rmtree(_TEMP_HOME, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_single_check_setup.py
+"""
+Setup cost of one "check now" (SingleMemberCheckJob) before its first request:
+
+- "MonitoringThread per check": what the instant check used to build to reach the
+  processing stages (a QThread, a new AnemAPIClient through _apply_settings and three
+  signal connections).
+- "processing service": what it builds now (MemberProcessingService + MemberPipeline).
+- "SingleMemberCheckJob": the whole job object, service included.
+
+No network: the checks themselves are not run.
+
+Run from the repository root:
+    python benchmarks/bench_single_check_setup.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication
+
+from member import Member
+from api_client import AnemAPIClient
+from member_pipeline import MemberPipeline
+from member_processing import MemberProcessingService
+from threads import MonitoringThread, SingleMemberCheckJob
+from config import DEFAULT_SETTINGS, SETTING_BACKOFF_GENERAL, SETTING_BACKOFF_429, SETTING_REQUEST_TIMEOUT
+
+ITERATIONS = 2000
+
+
+def _time_per_call(setup):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        setup()
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def main():
+    app = QCoreApplication(sys.argv[:1])
+    settings = dict(DEFAULT_SETTINGS)
+    member = Member("109910263005740008", "100000000001", "0000000001", "0500000000")
+    api_client = AnemAPIClient(settings[SETTING_BACKOFF_GENERAL], settings[SETTING_BACKOFF_429], settings[SETTING_REQUEST_TIMEOUT])
+    check_job = SingleMemberCheckJob(member, 0, api_client, settings)
+
+    def old_setup():
+        provider = MonitoringThread(members_list_ref=[member], settings=settings)
+        provider.update_member_gui_signal.connect(check_job.update_member_gui_signal)
+        provider.new_data_fetched_signal.connect(check_job.new_data_fetched_signal)
+        provider.global_log_signal.connect(check_job.global_log_signal)
+
+    def new_setup():
+        MemberPipeline(MemberProcessingService(check_job), lambda: check_job.is_running,
+                       pdf_only_shortcut=False, stop_states_skip_pdf=True, pdf_for_beneficiary=True)
+
+    def job_setup():
+        SingleMemberCheckJob(member, 0, api_client, settings)
+
+    print(f"setup per instant check ({ITERATIONS} iterations)")
+    for name, setup in (("MonitoringThread per check", old_setup), ("processing service", new_setup),
+                        ("SingleMemberCheckJob", job_setup)):
+        print(f"    {name:<28} {_time_per_call(setup) * 1e6:>9.1f}us")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_single_flight.py
+"""
+Identical API calls started at the same moment by several threads (e.g. the monitoring
+thread and a manual "check now" on the same member), with and without the shared
+single-flight layer (config.REQUEST_COALESCER), against the HAR replay server.
+The response cache is off so every round reaches the server, and the request governor
+has no ceiling so only coalescing is measured.
+
+Run from the repository root:
+    python benchmarks/bench_single_flight.py
+"""
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from har_replay_server import HarReplayServer
+from api_client import AnemAPIClient
+from response_cache import SingleFlight
+from rate_governor import RequestGovernor
+
+LATENCY_MS = 80
+ROUNDS = 10
+THREAD_COUNTS = (2, 4, 8)
+
+
+def _run_round(server, coalescer, thread_count):
+    wassit_no, nin = server.candidates[0]
+    barrier = threading.Barrier(thread_count)
+    governor = RequestGovernor(None)
+    errors = []
+
+    def worker():
+        client = AnemAPIClient(initial_backoff_general=0.05, initial_backoff_429=0.05, request_timeout=10)
+        client.base_url = server.base_url
+        client.governor = governor
+        client.response_cache = None
+        client.request_coalescer = coalescer
+        barrier.wait()
+        data, error = client.validate_candidate(wassit_no, nin)
+        if error is not None:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def main():
+    with HarReplayServer(latency_ms=LATENCY_MS) as server:
+        print(f"{ROUNDS} rounds of identical validateCandidate calls | latency {LATENCY_MS}ms")
+        print(f"{'threads':>7} | {'single-flight':<13} | {'requests':>8} | {'saved':>5} | {'per round':>9}")
+        print("-" * 56)
+        for thread_count in THREAD_COUNTS:
+            for enabled in (False, True):
+                coalescer = SingleFlight() if enabled else None
+                server.reset_stats()
+                start = time.perf_counter()
+                for _ in range(ROUNDS):
+                    errors = _run_round(server, coalescer, thread_count)
+                    assert not errors, errors
+                per_round = (time.perf_counter() - start) / ROUNDS
+                sent = sum(count for name, count in server.stats.items() if name.startswith("validateCandidate"))
+                saved = coalescer.stats()["requests_saved"] if coalescer is not None else 0
+                print(f"{thread_count:>7} | {'on' if enabled else 'off':<13} | {sent:>8} | {saved:>5} | {per_round * 1000:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
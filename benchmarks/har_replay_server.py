@@ -0,0 +1,327 @@
+# benchmarks/har_replay_server.py
+"""
+Local HTTP server that replays the API responses recorded in har_reference/
+(validateCandidate/query, PreInscription/GetPreInscription, RendezVous/GetAvailableDates,
+RendezVous/Create, download/*), with optional latency, 429 and error injection.
+
+Responses are matched on the identifying request parameter (wassitNumber +
+identityDocNumber, Id, PreInscriptionId, or preInscriptionId in the POST body);
+an unknown value gets the first recording of that endpoint, so any roster can be replayed.
+
+Used by the benchmarks (AnemAPIClient.base_url = server.base_url), or standalone:
+    python benchmarks/har_replay_server.py --port 8765 --latency-ms 80 --rate-429 0.05
+"""
+import os
+import sys
+import glob
+import json
+import time
+import base64
+import random
+import argparse
+import threading
+from collections import Counter
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+HAR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "har_reference")
+API_PREFIX = "/AllocationChomage/api/"
+
+# المعامل (أو المعاملات) الذي يميز طلبات كل نقطة نهاية
+_QUERY_KEYS = {
+    "validateCandidate/query": ("wassitNumber", "identityDocNumber"),
+    "PreInscription/GetPreInscription": ("Id",),
+    "RendezVous/GetAvailableDates": ("PreInscriptionId",),
+}
+_DOWNLOAD_QUERY_KEYS = ("PreInscriptionId",)
+_BODY_KEYS = {
+    "RendezVous/Create": ("preInscriptionId",),
+}
+
+
+def _request_key(method, endpoint, query, body):
+    if method == "POST":
+        names = _BODY_KEYS.get(endpoint, ())
+        try:
+            values = json.loads(body) if body else {}
+        except ValueError:
+            values = {}
+        if not isinstance(values, dict):
+            values = {}
+        return tuple(str(values.get(name, "")) for name in names)
+    names = _QUERY_KEYS.get(endpoint) or (_DOWNLOAD_QUERY_KEYS if endpoint.startswith("download/") else ())
+    return tuple(query.get(name, [""])[0] for name in names)
+
+
+class RecordedResponse:
+    __slots__ = ('status', 'content_type', 'body')
+
+    def __init__(self, status, content_type, body):
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+
+
+def load_har_responses(har_paths=None):
+    """
+    Reads the HAR files and returns (responses, candidates):
+    responses maps (method, endpoint, key) to a RecordedResponse, with key None
+    for the default of an endpoint; candidates is the list of recorded
+    (wassitNumber, identityDocNumber) pairs.
+    """
+    if har_paths is None:
+        har_paths = sorted(glob.glob(os.path.join(HAR_DIR, "*.txt")))
+    responses = {}
+    candidates = []
+    for path in har_paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get("log", {}).get("entries", [])
+        except (OSError, ValueError) as e:
+            print(f"تخطي ملف HAR غير صالح {path}: {e}", file=sys.stderr)
+            continue
+        for entry in entries:
+            request = entry.get("request", {})
+            method = request.get("method", "GET")
+            url = urlsplit(request.get("url", ""))
+            if method not in ("GET", "POST") or not url.path.startswith(API_PREFIX):
+                continue
+            endpoint = url.path[len(API_PREFIX):]
+            body_text = (request.get("postData") or {}).get("text", "")
+            key = _request_key(method, endpoint, parse_qs(url.query), body_text)
+
+            response = entry.get("response", {})
+            content = response.get("content", {})
+            text = content.get("text") or ""
+            body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode('utf-8')
+            mime_type = content.get("mimeType") or "application/json"
+            content_type = f"{mime_type}; charset=utf-8" if mime_type == "application/json" else mime_type
+            recorded = RecordedResponse(response.get("status", 200), content_type, body)
+
+            responses.setdefault((method, endpoint, key), recorded)
+            responses.setdefault((method, endpoint, None), recorded)
+            if endpoint == "validateCandidate/query" and key not in candidates:
+                candidates.append(key)
+    return responses, candidates
+
+
+class HarReplayServer:
+    """
+    Threaded replay server. latency_ms (+ up to latency_jitter_ms) is added to every
+    API response; rate_429 and error_rate are the probabilities of answering 429 or 500
+    instead. The random source is seeded, so a run can be reproduced.
+    handshake_ms delays the first response of every new connection (stands in for the
+    TCP+TLS setup of the real server); idle_timeout closes keep-alive connections that
+    stay idle that many seconds, like the real server does between monitoring cycles.
+    rate_limit_rps answers 429 to API requests above that rate (token bucket of
+    rate_limit_burst requests), like the real server's rate limiter.
+    stall_rate is the probability that an API request hangs stall_seconds before being
+    answered (a dead socket, from the client's point of view).
+    """
+
+    def __init__(self, har_paths=None, host="127.0.0.1", port=0, latency_ms=0.0, latency_jitter_ms=0.0,
+                 rate_429=0.0, error_rate=0.0, seed=0, handshake_ms=0.0, idle_timeout=None,
+                 rate_limit_rps=None, rate_limit_burst=1, stall_rate=0.0, stall_seconds=60.0):
+        self.responses, self.candidates = load_har_responses(har_paths)
+        self.handshake_ms = handshake_ms
+        self.idle_timeout = idle_timeout
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.rate_429 = rate_429
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.rate_limit_rps = rate_limit_rps
+        self.rate_limit_burst = rate_limit_burst
+        self._rate_limit_tokens = float(rate_limit_burst)
+        self._rate_limit_refill = time.monotonic()
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def host(self):
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}{API_PREFIX.rstrip('/')}"
+
+    @property
+    def site_url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="HarReplayServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _draw_fault(self):
+        """Returns (delay seconds, injected status or None) for one request."""
+        with self._lock:
+            delay = (self.latency_ms + self._random.uniform(0, self.latency_jitter_ms)) / 1000.0
+            if self.stall_rate and self._random.random() < self.stall_rate:
+                self.stats["stalled"] += 1
+                delay += self.stall_seconds
+            roll = self._random.random()
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def _over_rate_limit(self):
+        if not self.rate_limit_rps:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._rate_limit_tokens = min(self.rate_limit_burst, self._rate_limit_tokens + (now - self._rate_limit_refill) * self.rate_limit_rps)
+            self._rate_limit_refill = now
+            if self._rate_limit_tokens < 1:
+                return True
+            self._rate_limit_tokens -= 1
+            return False
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _handle(self, handler, method):
+        url = urlsplit(handler.path)
+        body = b""
+        if method == "POST":
+            body = handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+
+        if url.path == "/":
+            self._count("site_check")
+            return 200, "text/html; charset=utf-8", b"<html></html>"
+        if not url.path.startswith(API_PREFIX):
+            self._count("not_found")
+            return 404, "text/plain", b"Not Found"
+
+        endpoint = url.path[len(API_PREFIX):]
+        if self._over_rate_limit():
+            self._count("rate_limited_429")
+            return 429, "text/plain", b"Too Many Requests"
+        delay, injected_status = self._draw_fault()
+        if delay > 0:
+            time.sleep(delay)
+        if injected_status == 429:
+            self._count("injected_429")
+            return 429, "text/plain", b"Too Many Requests"
+        if injected_status == 500:
+            self._count("injected_500")
+            return 500, "text/plain", b"Internal Server Error"
+
+        key = _request_key(method, endpoint, parse_qs(url.query), body.decode('utf-8', 'replace'))
+        recorded = self.responses.get((method, endpoint, key)) or self.responses.get((method, endpoint, None))
+        if recorded is None:
+            self._count("not_found")
+            return 404, "text/plain", b"Not Found"
+        self._count(endpoint)
+        return recorded.status, recorded.content_type, recorded.body
+
+    def _make_handler(self):
+        server = self
+
+        class _ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # keep-alive، كما في الخادم الحقيقي
+            disable_nagle_algorithm = True # الترويسة والجسم يُرسلان منفصلين: بدون هذا يضيف Nagle ~40ms لكل طلب
+            timeout = server.idle_timeout
+
+            def setup(self):
+                super().setup()
+                server._count("connections")
+                self._handshake_pending = server.handshake_ms > 0
+
+            def _reply(self, method, send_body=True):
+                if self._handshake_pending:
+                    self._handshake_pending = False
+                    time.sleep(server.handshake_ms / 1000.0)
+                status, content_type, body = server._handle(self, method)
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    if send_body:
+                        self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # العميل أغلق الاتصال (انتهت مهلته) قبل الرد
+                    self.close_connection = True
+
+            def do_HEAD(self):
+                self._reply("GET", send_body=False)
+
+            def do_GET(self):
+                self._reply("GET")
+
+            def do_POST(self):
+                self._reply("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return _ReplayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays the recorded API responses of har_reference/.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--handshake-ms", type=float, default=0.0)
+    parser.add_argument("--idle-timeout", type=float, default=None)
+    parser.add_argument("--rate-limit-rps", type=float, default=None)
+    parser.add_argument("--rate-limit-burst", type=int, default=1)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=60.0)
+    args = parser.parse_args()
+
+    server = HarReplayServer(host=args.host, port=args.port, latency_ms=args.latency_ms,
+                             latency_jitter_ms=args.latency_jitter_ms, rate_429=args.rate_429,
+                             error_rate=args.error_rate, seed=args.seed, handshake_ms=args.handshake_ms,
+                             idle_timeout=args.idle_timeout, rate_limit_rps=args.rate_limit_rps,
+                             rate_limit_burst=args.rate_limit_burst, stall_rate=args.stall_rate,
+                             stall_seconds=args.stall_seconds)
+    print(f"{len(server.responses)} recorded responses, {len(server.candidates)} candidates")
+    print(f"Serving {server.base_url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(dict(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,10 @@ import logging
 import os # تمت الإضافة
 from PyQt5.QtCore import QStandardPaths # تمت الإضافة
 
+from http_transport import mount_pooled_adapter, AdaptiveTimeouts
+from rate_governor import RequestGovernor
+from response_cache import ResponseCache, SingleFlight
+
 # --- Application Specific Name for AppData folder ---
 APP_NAME_FOR_DATA_DIR = "AnemAppUserData" # يمكنك تغيير هذا إذا أردت
 
@@ -45,6 +49,8 @@ APP_DATA_DIR = get_app_data_dir() # الحصول على المسار مرة وا
 # --- File Names and Paths (Updated to use APP_DATA_DIR) ---
 LOG_FILE = os.path.join(APP_DATA_DIR, "anem_app.log")
 DATA_FILE = os.path.join(APP_DATA_DIR, "members_data.json")
+MEMBERS_DB_FILE = os.path.join(APP_DATA_DIR, "members_data.sqlite3")
+MEMBERS_SNAPSHOT_FILE = os.path.join(APP_DATA_DIR, "members_data.bin")
 SETTINGS_FILE = os.path.join(APP_DATA_DIR, "app_settings.json")
 ACTIVATION_STATUS_FILE = os.path.join(APP_DATA_DIR, "activation_status.json")
 DEVICE_ID_FILE = os.path.join(APP_DATA_DIR, "device_id.dat") # ملف جديد لـ device_id
@@ -52,6 +58,9 @@ DEVICE_ID_FILE = os.path.join(APP_DATA_DIR, "device_id.dat") # ملف جديد 
 # --- Temporary and Backup File Names (Updated to use APP_DATA_DIR) ---
 DATA_FILE_TMP = DATA_FILE + ".tmp"
 DATA_FILE_BAK = DATA_FILE + ".bak"
+MEMBERS_SNAPSHOT_FILE_TMP = MEMBERS_SNAPSHOT_FILE + ".tmp"
+MEMBERS_SNAPSHOT_FILE_BAK = MEMBERS_SNAPSHOT_FILE + ".bak"
+MEMBERS_JOURNAL_FILE = DATA_FILE + ".journal" # سجل إلحاقي لتغييرات الأعضاء منذ آخر حفظ كامل
 SETTINGS_FILE_TMP = SETTINGS_FILE + ".tmp"
 SETTINGS_FILE_BAK = SETTINGS_FILE + ".bak"
 
@@ -63,8 +72,41 @@ FIREBASE_SERVICE_ACCOUNT_KEY_FILE = "firebase_service_account_key.json" # يبق
 BASE_API_URL = "https://ac-controle.anem.dz/AllocationChomage/api"
 MAIN_SITE_CHECK_URL = "https://ac-controle.anem.dz/"
 
+# --- HTTP Connection Pool (shared by all threads through SESSION) ---
+HTTP_POOL_CONNECTIONS = 4 # عدد المضيفين الذين يُحتفظ لهم بمجمع اتصالات
+HTTP_POOL_MAXSIZE = 10 # أقصى عدد اتصالات مفتوحة لكل مضيف (المراقبة + خيوط الفحص والتحميل المتزامنة)
+HTTP_POOL_BLOCK = True # عند امتلاء المجمع ينتظر الخيط اتصالاً حرًا بدل فتح اتصال مؤقت جديد
+HTTP_KEEP_WARM_INTERVAL_SECONDS = 45 # بين دورات المراقبة: طلب HEAD خفيف إذا بقي الاتصال خاملاً هذه المدة
+
+# --- Adaptive Request Timeouts (the request_timeout setting is the upper bound) ---
+ADAPTIVE_TIMEOUT_MULTIPLIER = 3 # المهلة = p99 لزمن الاستجابة المرصود × هذا المعامل
+ADAPTIVE_TIMEOUT_WINDOW = 200 # عدد آخر الاستجابات المحفوظة لكل نقطة نهاية
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 20 # قبل هذا العدد من العينات تُستخدم المهلة القصوى
+ADAPTIVE_READ_TIMEOUT_MIN = 4 # ثوانٍ
+ADAPTIVE_CONNECT_TIMEOUT_MIN = 2 # ثوانٍ
+ADAPTIVE_CONNECT_TIMEOUT_MAX = 10 # ثوانٍ
+SITE_CHECK_TIMEOUT = 5 # المهلة القصوى لفحص توفر الموقع
+
+# --- Request Governor (shared by all threads through REQUEST_GOVERNOR) ---
+API_MAX_REQUESTS_PER_SECOND = 2.0 # سقف عام لعدد الطلبات في الثانية لكل الخيوط مجتمعة (None = بدون سقف)
+API_REQUEST_BURST = 4 # عدد الطلبات التي يمكن إرسالها دفعة واحدة بعد فترة هدوء
+
+# --- Response Cache (idempotent GET endpoints, shared by all threads through RESPONSE_CACHE) ---
+# مدة صلاحية الاستجابة المخزنة لكل نقطة نهاية بالثواني (النقاط غير المذكورة لا تُخزن، مثل المواعيد المتاحة)
+API_CACHE_TTL_SECONDS = {
+    "validateCandidate/query": 20,
+    "PreInscription/GetPreInscription": 120,
+}
+API_CACHE_MAX_ENTRIES = 512
+
 # --- Session Object (shared across API clients if needed) ---
 SESSION = requests.Session()
+mount_pooled_adapter(SESSION, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK)
+REQUEST_GOVERNOR = RequestGovernor(API_MAX_REQUESTS_PER_SECOND, API_REQUEST_BURST)
+RESPONSE_CACHE = ResponseCache(API_CACHE_TTL_SECONDS, API_CACHE_MAX_ENTRIES)
+ADAPTIVE_TIMEOUTS = AdaptiveTimeouts(ADAPTIVE_TIMEOUT_MULTIPLIER, ADAPTIVE_READ_TIMEOUT_MIN, ADAPTIVE_CONNECT_TIMEOUT_MIN,
+                                     ADAPTIVE_CONNECT_TIMEOUT_MAX, ADAPTIVE_TIMEOUT_WINDOW, ADAPTIVE_TIMEOUT_MIN_SAMPLES)
+REQUEST_COALESCER = SingleFlight() # الطلبات المتطابقة المتزامنة من عدة خيوط تُرسل مرة واحدة
 SESSION.headers.update({
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36',
     'Accept': 'application/json, text/plain, */*',
@@ -100,6 +142,22 @@ DEFAULT_SETTINGS = {
 MAX_RETRIES = 3
 MAX_BACKOFF_DELAY = 120
 
+# --- Members Data Persistence ---
+MEMBERS_STORAGE_BACKEND = "sqlite" # "sqlite" أو "binary" أو "json" (يتم ترحيل ملف JSON القديم تلقائيًا عند أول تشغيل)
+MEMBERS_SAVE_DEBOUNCE_SECONDS = 5 # أقصى مدة تتراكم فيها التغييرات قبل كتابتها إلى ملف البيانات
+MEMBERS_JOURNAL_COMPACT_BYTES = 256 * 1024 # حجم السجل الذي يُدمج بعده في ملف البيانات
+MEMBERS_JOURNAL_COMPACT_CHECK_SECONDS = 30
+MEMBERS_LOAD_BATCH_SIZE = 500 # عدد الأعضاء المضافين إلى الجدول في كل دفعة أثناء التحميل التدريجي
+MEMBERS_LOAD_CHUNK_BYTES = 256 * 1024 # حجم كل قطعة تُقرأ من ملف JSON أثناء التحميل التدريجي
+MEMBERS_LOAD_USE_MMAP = False # قراءة ملف JSON عبر mmap بدل القراءة المتتالية
+
+# --- Monitoring Scheduler (MonitoringThread) ---
+# الأعضاء القابلون للحجز يُفحصون كل فترة مراقبة؛ أعضاء PDF فقط أو العالقون في حالة خطأ يتباعد فحصهم أسيًا حتى هذا الحد
+MONITORING_MAX_BACKOFF_MINUTES = 60
+
+# --- On-demand Member Jobs (JobPool: initial fetch, instant check, PDF download) ---
+MEMBER_JOB_WORKERS = 4 # أقصى عدد من المهام المنفذة في نفس الوقت؛ الباقي ينتظر في الطابور حسب الأولوية
+
 # --- Other Application Constants ---
 MAX_ERROR_DISPLAY_LENGTH = 70
 APP_ID_FALLBACK = 'anem-booking-app-pyqt14-refactored-v2' # تم تغيير الـ fallback قليلاً للتمييز
@@ -303,7 +303,7 @@ class EditMemberDialog(QDialog):
         }
 
 class SettingsDialog(QDialog):
-    def __init__(self, current_settings, parent=None):
+    def __init__(self, current_settings, parent=None, timeout_stats=None):
         super().__init__(parent)
         self.setWindowTitle("إعدادات التطبيق")
         self.setModal(True)
@@ -356,8 +356,13 @@ class SettingsDialog(QDialog):
         layout.addRow("الفاصل الزمني لدورة المراقبة:", self.monitoring_interval_spin)
         layout.addRow("تأخير أولي لخطأ 429 (طلبات كثيرة):", self.backoff_429_spin)
         layout.addRow("تأخير أولي للأخطاء العامة:", self.backoff_general_spin)
-        layout.addRow("مهلة الطلب للواجهة البرمجية (API):", self.request_timeout_spin)
+        layout.addRow("المهلة القصوى لطلب الواجهة البرمجية (API):", self.request_timeout_spin)
 
+        # المهلة الفعلية تُحسب من زمن الاستجابة المرصود (AnemAPIClient.timeout_stats)، للعرض فقط
+        self.adaptive_timeouts_label = QLabel(self._format_timeout_stats(timeout_stats), self)
+        self.adaptive_timeouts_label.setWordWrap(True)
+        self.adaptive_timeouts_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        layout.addRow("المهلة الحالية حسب زمن الاستجابة:", self.adaptive_timeouts_label)
 
         self.buttons = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel, Qt.Horizontal, self)
         self.buttons.button(QDialogButtonBox.Save).setText("حفظ الإعدادات")
@@ -366,6 +371,16 @@ class SettingsDialog(QDialog):
         self.buttons.rejected.connect(self.reject)
         layout.addRow(self.buttons)
 
+    @staticmethod
+    def _format_timeout_stats(timeout_stats):
+        if not timeout_stats:
+            return "لا توجد قياسات بعد (تُستخدم المهلة القصوى)."
+        lines = []
+        for endpoint, stats in timeout_stats.items():
+            lines.append(f"{endpoint}: p99 {stats['p99']:.2f} ث ({stats['samples']} عينة) ← "
+                         f"الاتصال {stats['connect_timeout']:.1f} ث، القراءة {stats['read_timeout']:.1f} ث")
+        return "\n".join(lines)
+
     def get_settings(self):
         from config import ( 
             SETTING_MIN_MEMBER_DELAY, SETTING_MAX_MEMBER_DELAY,
@@ -0,0 +1,233 @@
+# http_transport.py
+"""
+HTTP transport shared by every AnemAPIClient (config.SESSION): a sized, instrumented
+HTTPAdapter connection pool, process-wide pool statistics, a keep-alive ping that
+keeps one connection warm while the monitoring thread waits between cycles, and
+request timeouts derived from the observed latencies (config.ADAPTIVE_TIMEOUTS).
+"""
+import time
+import logging
+import threading
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Thread-safe counters of the shared connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0 # اتصالات TCP (+TLS) جديدة، بما فيها إعادة الاتصال بعد انقطاع اتصال خامل
+            self.waits = 0 # طلبات انتظرت تحرر اتصال لأن المجمع ممتلئ
+            self.wait_seconds = 0.0
+            self.last_request_time = 0.0
+            self.connect_seconds = deque(maxlen=100) # مدة آخر عمليات فتح الاتصال (TCP+TLS)
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+            self.last_request_time = time.monotonic()
+
+    def record_connect(self, seconds):
+        with self._lock:
+            self.connections_opened += 1
+            self.connect_seconds.append(seconds)
+
+    def recent_connect_seconds(self):
+        with self._lock:
+            return list(self.connect_seconds)
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+
+    def idle_seconds(self):
+        with self._lock:
+            last_request_time = self.last_request_time
+        return time.monotonic() - last_request_time if last_request_time else float('inf')
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": max(0, self.requests - self.connections_opened),
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+POOL_STATS = PoolStats()
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.monotonic()
+        super().connect()
+        POOL_STATS.record_connect(time.monotonic() - start)
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.monotonic()
+        super().connect()
+        POOL_STATS.record_connect(time.monotonic() - start)
+
+
+class _WaitTimingMixin:
+    def _get_conn(self, timeout=None):
+        pool = self.pool
+        if self.block and pool is not None and pool.empty():
+            start = time.monotonic()
+            try:
+                return super()._get_conn(timeout)
+            finally:
+                POOL_STATS.record_wait(time.monotonic() - start)
+        return super()._get_conn(timeout)
+
+
+class _CountingHTTPConnectionPool(_WaitTimingMixin, HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(_WaitTimingMixin, HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools count opened connections and waits in POOL_STATS."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        POOL_STATS.record_request()
+        return super().send(request, *args, **kwargs)
+
+
+def mount_pooled_adapter(session, pool_connections, pool_maxsize, pool_block):
+    """
+    Mounts a PooledHTTPAdapter on session for http:// and https://.
+    pool_maxsize is the number of connections kept per host (one per worker thread that
+    may run at the same time); with pool_block, extra threads wait for a free connection
+    instead of opening throwaway ones.
+    """
+    adapter = PooledHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
+
+
+def keep_connection_warm(session, url, idle_seconds, timeout=5):
+    """
+    Sends a HEAD request to url if the pool has been idle for at least idle_seconds, so
+    the next real request reuses an open connection instead of paying a new TCP+TLS
+    handshake. Errors are only logged. Returns True if a ping was sent successfully.
+    """
+    if POOL_STATS.idle_seconds() < idle_seconds:
+        return False
+    try:
+        session.head(url, timeout=timeout, verify=False, allow_redirects=False).close()
+        return True
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"فشل طلب إبقاء الاتصال نشطًا إلى {url}: {e}")
+        return False
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class AdaptiveTimeouts:
+    """
+    Per-endpoint latency windows (time until the response headers) from which each attempt
+    gets a (connect, read) timeout: p99 x multiplier, clamped between the minimums and the
+    caller's ceiling (the request_timeout setting, or 5s for the site check). The connect
+    timeout comes from the connection setup times measured by the pool. Until an endpoint
+    has min_samples samples the ceiling is used. Each retry doubles the timeouts and the
+    last attempt gets the ceiling, so a slower but healthy server still answers, and its
+    latency (recorded like any other) raises the timeouts of the next requests. Timed-out
+    attempts are not recorded: a dead socket must not raise the timeouts.
+    """
+
+    def __init__(self, multiplier, read_timeout_min, connect_timeout_min, connect_timeout_max, window=200, min_samples=20):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._timeout_cache = {} # endpoint -> المهلة المحسوبة، تُعاد حسابها عند وصول عينة جديدة
+        self.multiplier = multiplier
+        self.read_timeout_min = read_timeout_min
+        self.connect_timeout_min = connect_timeout_min
+        self.connect_timeout_max = connect_timeout_max
+        self.window = window
+        self.min_samples = min_samples
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._timeout_cache.pop(endpoint, None)
+
+    def _read_timeout_base(self, endpoint):
+        """p99 x multiplier (not clamped), or None if there are not enough samples yet."""
+        with self._lock:
+            if endpoint in self._timeout_cache:
+                return self._timeout_cache[endpoint]
+            samples = self._samples.get(endpoint)
+            base = None
+            if samples is not None and len(samples) >= self.min_samples:
+                base = _percentile(sorted(samples), 0.99) * self.multiplier
+            self._timeout_cache[endpoint] = base
+            return base
+
+    def _connect_timeout_base(self):
+        samples = POOL_STATS.recent_connect_seconds()
+        if len(samples) < self.min_samples:
+            return None
+        return max(self.connect_timeout_min, _percentile(sorted(samples), 0.99) * self.multiplier)
+
+    def timeouts(self, endpoint, ceiling, attempt=0, last_attempt=False):
+        """(connect, read) timeouts in seconds for attempt number attempt (0 = first) of a request to endpoint."""
+        connect_ceiling = min(ceiling, self.connect_timeout_max)
+        if last_attempt:
+            return connect_ceiling, ceiling
+        escalation = 2 ** attempt
+        read_base = self._read_timeout_base(endpoint)
+        read_timeout = ceiling if read_base is None else min(ceiling, max(self.read_timeout_min, read_base) * escalation)
+        connect_base = self._connect_timeout_base()
+        connect_timeout = connect_ceiling if connect_base is None else min(connect_ceiling, connect_base * escalation)
+        return connect_timeout, read_timeout
+
+    def snapshot(self, ceiling, ceiling_by_endpoint=None):
+        """{endpoint: {samples, p50, p99, connect/read timeout of a first attempt}} for the logs and the settings dialog."""
+        ceiling_by_endpoint = ceiling_by_endpoint or {}
+        with self._lock:
+            windows = {endpoint: sorted(samples) for endpoint, samples in self._samples.items()}
+        result = {}
+        for endpoint, samples in sorted(windows.items()):
+            connect_timeout, read_timeout = self.timeouts(endpoint, ceiling_by_endpoint.get(endpoint, ceiling))
+            result[endpoint] = {
+                "samples": len(samples),
+                "p50": round(_percentile(samples, 0.5), 3),
+                "p99": round(_percentile(samples, 0.99), 3),
+                "connect_timeout": round(connect_timeout, 1),
+                "read_timeout": round(read_timeout, 1),
+            }
+        return result
@@ -0,0 +1,234 @@
+# job_pool.py
+import time
+import heapq
+import logging
+import itertools
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+JOB_PRIORITY_USER = 0 # طلب مباشر من المستخدم: فحص فوري، تحميل الشهادات
+JOB_PRIORITY_AUTO = 1 # الفحص التلقائي بعد إضافة عضو
+JOB_PRIORITY_BACKGROUND = 2 # جلب المعلومات الأولية
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+
+
+class JobHandle:
+    """A submitted job; also its cancellation token (cancel())."""
+    __slots__ = ('job', 'kind', 'key', 'priority', 'state', 'cancelled', 'submitted_at', 'started_at', 'finished_at', '_pool')
+
+    def __init__(self, pool, job, key, priority):
+        self._pool = pool
+        self.job = job
+        self.kind = getattr(job, 'kind', type(job).__name__)
+        self.key = key
+        self.priority = priority
+        self.state = JOB_QUEUED
+        self.cancelled = False
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    def cancel(self):
+        """A queued job never runs; a running one is asked to stop (job.stop())."""
+        return self._pool._cancel(self)
+
+    def __repr__(self):
+        return f"JobHandle({self.kind}, key={self.key!r}, priority={self.priority}, state={self.state}, cancelled={self.cancelled})"
+
+
+class JobPool(QObject):
+    """
+    Bounded worker pool for the on-demand member operations (initial fetch, instant check,
+    PDF download) instead of one QThread per request. Jobs are objects with run() and
+    stop() (QObjects whose signals reach the GUI thread queued), taken from a priority
+    queue (lowest priority value first, then submission order) by up to max_workers
+    worker threads, started on demand.
+
+    A key (e.g. (kind, member)) allows one queued or running job per key: a second submit
+    returns None and only raises the queued job's priority. A cancelled job frees its key
+    at once. job_finished_signal reaches the GUI thread after the signals the job emitted
+    and after its key was freed; the pool drops the job there, so nothing keeps finished
+    jobs alive.
+    """
+    job_finished_signal = pyqtSignal(object) # JobHandle
+
+    def __init__(self, max_workers, parent=None):
+        super().__init__(parent)
+        self.max_workers = max(1, max_workers)
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._active = {} # key -> JobHandle (في الانتظار أو قيد التنفيذ)
+        self._workers = []
+        self._idle_workers = 0
+        self._queued = 0
+        self._running = set()
+        self._finishing = set()
+        self._shutdown = False
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.duplicates = 0
+        self._kind_stats = {} # kind -> [jobs, wait seconds, run seconds, max wait seconds]
+        self.job_finished_signal.connect(self._release)
+
+    def submit(self, job, priority=JOB_PRIORITY_USER, key=None):
+        """Queues a job. Returns its JobHandle, or None if the pool is shut down or key is already queued/running."""
+        with self._cond:
+            if self._shutdown:
+                return None
+            if key is not None and key in self._active:
+                existing = self._active[key]
+                self.duplicates += 1
+                if existing.state is JOB_QUEUED and priority < existing.priority:
+                    existing.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), existing))
+                return None
+            handle = JobHandle(self, job, key, priority)
+            heapq.heappush(self._heap, (priority, next(self._seq), handle))
+            if key is not None:
+                self._active[key] = handle
+            self._queued += 1
+            self.submitted += 1
+            if self._queued > self._idle_workers and len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=f"JobPoolWorker-{len(self._workers) + 1}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            else:
+                self._cond.notify()
+        logger.debug(f"مجمع المهام: إضافة {handle} (في الانتظار: {self._queued})")
+        return handle
+
+    def is_active(self, key):
+        """True if a job with this key is queued or running (and not cancelled)."""
+        with self._cond:
+            return key in self._active
+
+    def cancel(self, key):
+        """Cancels the queued or running job with this key. Returns True if there was one."""
+        with self._cond:
+            handle = self._active.get(key)
+        return handle.cancel() if handle is not None else False
+
+    def _cancel(self, handle):
+        with self._cond:
+            if handle.cancelled or handle.state in (JOB_DONE, JOB_CANCELLED):
+                return False
+            handle.cancelled = True
+            self.cancelled += 1
+            if handle.key is not None and self._active.get(handle.key) is handle:
+                del self._active[handle.key]
+            if handle.state is JOB_QUEUED:
+                handle.state = JOB_CANCELLED # يُحذف من الطابور عند الوصول إليه
+                self._queued -= 1
+                return True
+        stop = getattr(handle.job, 'stop', None)
+        if stop is not None:
+            stop()
+        return True
+
+    def _next_job(self):
+        """Blocks until a job is due (returned as running) or the pool shuts down (None). Caller holds the lock."""
+        while True:
+            while self._heap:
+                _, _, handle = heapq.heappop(self._heap)
+                if handle.state is JOB_QUEUED:
+                    handle.state = JOB_RUNNING
+                    handle.started_at = time.monotonic()
+                    self._queued -= 1
+                    self._running.add(handle)
+                    return handle
+            if self._shutdown:
+                return None
+            self._idle_workers += 1
+            try:
+                self._cond.wait()
+            finally:
+                self._idle_workers -= 1
+
+    def _work(self):
+        while True:
+            with self._cond:
+                handle = self._next_job()
+            if handle is None:
+                return
+            failed = False
+            try:
+                handle.job.run()
+            except Exception as e:
+                failed = True
+                logger.exception(f"مجمع المهام: خطأ غير متوقع في المهمة {handle}: {e}")
+            finally:
+                self._finish(handle, failed)
+            handle = None # لا يُبقي العامل الخامل آخر مهمة حية
+
+    def _finish(self, handle, failed):
+        with self._cond:
+            handle.finished_at = time.monotonic()
+            handle.state = JOB_DONE
+            self._running.discard(handle)
+            if handle.key is not None and self._active.get(handle.key) is handle:
+                del self._active[handle.key]
+            if failed:
+                self.failed += 1
+            elif not handle.cancelled:
+                self.completed += 1
+            wait_seconds = handle.started_at - handle.submitted_at
+            kind_stats = self._kind_stats.setdefault(handle.kind, [0, 0.0, 0.0, 0.0])
+            kind_stats[0] += 1
+            kind_stats[1] += wait_seconds
+            kind_stats[2] += handle.finished_at - handle.started_at
+            kind_stats[3] = max(kind_stats[3], wait_seconds)
+            self._finishing.add(handle)
+        logger.debug(f"مجمع المهام: انتهت {handle} (انتظار {wait_seconds:.2f} ث، تنفيذ {handle.finished_at - handle.started_at:.2f} ث)")
+        self.job_finished_signal.emit(handle)
+
+    def _release(self, handle):
+        with self._cond:
+            self._finishing.discard(handle)
+            drained = not self._queued and not self._running
+        if drained:
+            logger.info(f"مجمع المهام: اكتملت جميع المهام. {self.stats()}")
+
+    def shutdown(self, timeout=None):
+        """Cancels every queued and running job and waits up to timeout seconds for the workers. Returns True if they all ended."""
+        with self._cond:
+            self._shutdown = True
+            handles = [item[2] for item in self._heap] + list(self._running)
+        for handle in handles:
+            handle.cancel()
+        with self._cond:
+            self._heap = []
+            self._cond.notify_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(worker.is_alive() for worker in self._workers)
+
+    def stats(self):
+        """Queue depth, counters and per kind: jobs, average/max wait in the queue and average run time."""
+        with self._cond:
+            return {
+                "workers": len(self._workers),
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": len(self._running),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "duplicates": self.duplicates,
+                "kinds": {
+                    kind: {"jobs": jobs, "avg_wait_seconds": round(wait / jobs, 3), "max_wait_seconds": round(max_wait, 3),
+                           "avg_run_seconds": round(run / jobs, 3)}
+                    for kind, (jobs, wait, run, max_wait) in self._kind_stats.items()
+                },
+            }
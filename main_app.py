@@ -4,6 +4,7 @@ import json
 import os
 import logging
 import random
+import math
 import time
 import datetime # noqa
 import shutil
@@ -11,14 +12,14 @@ import re # For stripping HTML from titles
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QLabel, QPushButton, QTableView,
     QMessageBox, QHeaderView, QStatusBar, QFrame, QAction, QStyle,
     QMenu, QLineEdit, QComboBox, QAbstractItemView, QDesktopWidget, QDialog,
     QListWidget, QListWidgetItem, QDialogButtonBox, QTextBrowser,
-    QSizePolicy, QToolButton 
+    QSizePolicy, QToolButton, QFileDialog
 )
-from PyQt5.QtCore import QTimer, Qt, QDateTime, QLocale, QStandardPaths, QUrl, pyqtSignal, QThread, QSize, QRegularExpression
-from PyQt5.QtGui import QIcon, QColor, QPalette, QDesktopServices, QFontDatabase, QFont, QTextDocument
+from PyQt5.QtCore import QEvent, QTimer, Qt, QDateTime, QLocale, QStandardPaths, QUrl, pyqtSignal, QThread, QSize, QRegularExpression
+from PyQt5.QtGui import QIcon, QDesktopServices, QFontDatabase, QFont, QTextDocument
 
 from firebase_service import FirebaseService
 from gui_components import (
@@ -29,11 +30,16 @@ from gui_components import (
 
 from api_client import AnemAPIClient
 from member import Member
-from threads import FetchInitialInfoThread, MonitoringThread, SingleMemberCheckThread, DownloadAllPdfsThread
+from member_status import MemberStatus
+from member_registry import MemberRegistry
+from members_table_model import MembersTableModel, MembersFilterProxyModel
+from persistence_service import MembersPersistenceService
+from member_journal import MemberJournal
+from member_storage import create_member_storage, export_members_json, MemberStorageError
+from threads import FetchInitialInfoJob, MonitoringThread, SingleMemberCheckJob, DownloadAllPdfsJob
+from job_pool import JobPool, JOB_PRIORITY_USER, JOB_PRIORITY_AUTO, JOB_PRIORITY_BACKGROUND
 from config import (
-    DATA_FILE,
     SETTINGS_FILE,
-    DATA_FILE_TMP, DATA_FILE_BAK,
     SETTINGS_FILE_TMP, SETTINGS_FILE_BAK,
     STYLESHEET_FILE, 
     DEFAULT_SETTINGS, SETTING_MIN_MEMBER_DELAY, SETTING_MAX_MEMBER_DELAY,
@@ -44,10 +50,11 @@ from config import (
     ACTIVATION_STATUS_FILE, 
     DEVICE_ID_FILE, 
     FIRESTORE_MESSAGES_COLLECTION, # تمت إضافته
-    FIRESTORE_USER_READ_MESSAGES_SUBCOLLECTION # تمت إضافته
+    FIRESTORE_USER_READ_MESSAGES_SUBCOLLECTION, # تمت إضافته
+    MEMBER_JOB_WORKERS
 )
 from logger_setup import setup_logging 
-from utils import QColorConstants, get_icon_name_for_status, resource_path
+from utils import get_icon_name_for_status, resource_path
 
 logger = setup_logging()
 
@@ -102,7 +109,7 @@ class ActivationProcessingThread(QThread):
         self.is_running = False
 
 class AnemApp(QMainWindow):
-    COL_ICON, COL_FULL_NAME_AR, COL_NIN, COL_WASSIT, COL_CCP, COL_PHONE_NUMBER, COL_STATUS, COL_RDV_DATE, COL_DETAILS = range(9)
+    COL_ICON, COL_FULL_NAME_AR, COL_NIN, COL_WASSIT, COL_CCP, COL_PHONE_NUMBER, COL_STATUS, COL_RDV_DATE, COL_DETAILS = range(len(MembersTableModel.HEADERS))
     subscription_updated_signal = pyqtSignal(object, str)
     new_app_messages_signal = pyqtSignal(list, str) # إشارة جديدة للرسائل
 
@@ -148,8 +155,16 @@ class AnemApp(QMainWindow):
 
         self.suppress_initial_messages = True
         self.members_list = []
-        self.filtered_members_list = []
-        self.is_filter_active = False
+        self.member_registry = MemberRegistry(self.members_list)
+        self.members_loading = False
+        self.members_model = MembersTableModel(self.member_registry, self)
+        self.members_proxy_model = MembersFilterProxyModel(self)
+        self.members_proxy_model.setSourceModel(self.members_model)
+        self.member_storage = create_member_storage()
+        self.member_journal = MemberJournal()
+        Member.journal = self.member_journal
+        self.persistence_service = MembersPersistenceService(self.member_registry, self.member_storage, member_journal=self.member_journal, parent=self)
+        self.persistence_service.save_failed_signal.connect(self._handle_members_save_failed)
 
         self.api_client = AnemAPIClient(
             initial_backoff_general=self.settings.get(SETTING_BACKOFF_GENERAL, DEFAULT_SETTINGS[SETTING_BACKOFF_GENERAL]),
@@ -157,22 +172,25 @@ class AnemApp(QMainWindow):
             request_timeout=self.settings.get(SETTING_REQUEST_TIMEOUT, DEFAULT_SETTINGS[SETTING_REQUEST_TIMEOUT])
         )
 
-        self.initial_fetch_threads = []
-        self.single_check_thread = None
-        self.active_download_all_pdfs_threads = {}
-        self.active_spinner_row_in_view = -1
+        self.member_jobs = JobPool(MEMBER_JOB_WORKERS, self) # جلب المعلومات، الفحص الفوري وتحميل الشهادات
+        self.member_jobs.job_finished_signal.connect(self._handle_member_job_finished)
+        self.active_spinner_member_index = -1
         self.spinner_char_idx = 0
         self.spinner_chars = ['◐', '◓', '◑', '◒']
         self.row_spinner_timer = QTimer(self)
         self.row_spinner_timer.timeout.connect(self.update_active_row_spinner_display)
         self.row_spinner_timer_interval = 150
+        self.countdown_prefix = ""
+        self.countdown_deadline = 0.0
+        self.countdown_timer = QTimer(self) # العد التنازلي يُحسب هنا من وقت الانتهاء الذي يرسله خيط المراقبة
+        self.countdown_timer.timeout.connect(self._render_countdown)
 
         self.monitoring_thread = MonitoringThread(self.members_list, self.settings.copy())
         self.monitoring_thread.update_member_gui_signal.connect(self.update_member_gui_in_table)
         self.monitoring_thread.new_data_fetched_signal.connect(self.update_member_name_in_table)
         self.monitoring_thread.global_log_signal.connect(self.update_status_bar_message)
         self.monitoring_thread.member_being_processed_signal.connect(self.handle_member_processing_signal)
-        self.monitoring_thread.countdown_update_signal.connect(self.update_countdown_timer_display)
+        self.monitoring_thread.countdown_deadline_signal.connect(self.update_countdown_deadline)
 
         self.subscription_updated_signal.connect(self._handle_subscription_update_from_signal)
         self.new_app_messages_signal.connect(self._handle_incoming_app_messages_on_main_thread) # ربط الإشارة الجديدة
@@ -690,6 +708,10 @@ class AnemApp(QMainWindow):
         self.settings_action.triggered.connect(self.open_settings_dialog)
         file_menu.addAction(self.settings_action)
 
+        self.export_json_action = QAction("تصدير بيانات الأعضاء (JSON)...", self)
+        self.export_json_action.triggered.connect(self.export_members_to_json)
+        file_menu.addAction(self.export_json_action)
+
         tools_menu = menubar.addMenu("أدوات")
         self.toggle_search_filter_action = QAction("إظهار/إخفاء البحث والفلترة", self)
         self.toggle_search_filter_action.setCheckable(True)
@@ -797,16 +819,12 @@ class AnemApp(QMainWindow):
         self._update_messages_button_status_bar() # تحديث الواجهة الأولية للزر
 
 
-        self.table = QTableWidget(self)
-        self.table.setColumnCount(self.COL_DETAILS + 1)
-        self.table.setHorizontalHeaderLabels([
-            "أيقونة", "الاسم الكامل", "رقم التعريف", "رقم الوسيط",
-            "الحساب البريدي", "رقم الهاتف", "الحالة", "تاريخ الموعد", "آخر تحديث/خطأ"
-        ])
+        self.table = QTableView(self)
+        self.table.setModel(self.members_proxy_model)
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Interactive)
         self.table.setAlternatingRowColors(True)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_table_context_menu)
 
@@ -821,9 +839,9 @@ class AnemApp(QMainWindow):
         header.setSectionResizeMode(self.COL_DETAILS, QHeaderView.Stretch)
 
 
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.verticalHeader().setDefaultSectionSize(30)
-        self.table.itemDoubleClicked.connect(self.edit_member_details)
+        self.table.doubleClicked.connect(self.edit_member_details)
         self.table.verticalHeader().setVisible(True) 
         main_layout.addWidget(self.table)
 
@@ -891,81 +909,59 @@ class AnemApp(QMainWindow):
 
 
     def apply_filter_and_search(self):
-        search_term = self.search_input.text().lower().strip()
+        search_term = self.search_input.text()
         filter_key = self.filter_by_combo.itemData(self.filter_by_combo.currentIndex())
         filter_value_data = self.filter_value_combo.itemData(self.filter_value_combo.currentIndex())
 
-        current_list_to_filter = list(self.members_list) 
+        matching_nins = None
+        if filter_key and filter_value_data is not None and self.member_storage.supports_queries:
+            # الفلترة حسب الحالة/الموعد/الشهادات تتم عبر فهارس قاعدة البيانات بعد حفظ التغييرات المعلقة.
+            # لا نعيد الاستعلام عند تغيير نص البحث فقط.
+            cached_filter = getattr(self, '_indexed_filter_cache', None)
+            if cached_filter and cached_filter[0] == (filter_key, filter_value_data):
+                matching_nins = cached_filter[1]
+            else:
+                self.persistence_service.flush()
+                try:
+                    matching_nins = set(self.member_storage.query_nins(filter_key, filter_value_data))
+                    self._indexed_filter_cache = ((filter_key, filter_value_data), matching_nins)
+                except MemberStorageError as e:
+                    logger.error(f"فشل استعلام الفلتر من قاعدة البيانات، سيتم الفلترة في الذاكرة: {e}")
+        else:
+            self._indexed_filter_cache = None
 
-        self.is_filter_active = bool(search_term or (filter_key and filter_value_data is not None))
+        self.members_proxy_model.set_filter(search_term, filter_key, filter_value_data, matching_nins)
 
-        if not self.is_filter_active:
-            self.filtered_members_list = list(self.members_list) 
-            self.update_table()
+        if not self.members_proxy_model.is_filter_active():
             if hasattr(self, '_last_filter_applied') and self._last_filter_applied: 
                 self.update_status_bar_message("تم عرض جميع الأعضاء.", is_general_message=True)
             self._last_filter_applied = False 
             return
 
-        temp_filtered_list = []
-
-        for member in current_list_to_filter:
-            match_search = True
-            if search_term:
-                match_search = (search_term in (member.nin or "").lower() or
-                                search_term in (member.wassit_no or "").lower() or
-                                search_term in (member.get_full_name_ar() or "").lower() or
-                                search_term in (member.nom_fr or "").lower() or
-                                search_term in (member.prenom_fr or "").lower() or
-                                search_term in (member.phone_number or "").lower() or
-                                search_term in (member.ccp or "").lower())
-
-            match_filter = True
-            if filter_key and filter_value_data is not None: 
-                if filter_key == "status":
-                    match_filter = member.status == filter_value_data
-                elif filter_key == "has_rdv":
-                    match_filter = member.already_has_rdv == filter_value_data
-                elif filter_key == "have_allocation":
-                    match_filter = member.have_allocation == filter_value_data
-                elif filter_key == "pdf_honneur":
-                    match_filter = bool(member.pdf_honneur_path) == filter_value_data
-                elif filter_key == "pdf_rdv":
-                    match_filter = bool(member.pdf_rdv_path) == filter_value_data
-
-            if match_search and match_filter:
-                temp_filtered_list.append(member)
-
-        self.filtered_members_list = temp_filtered_list
-        self.update_table() 
-        self.update_status_bar_message(f"تم تطبيق الفلتر. عدد النتائج: {len(self.filtered_members_list)}", is_general_message=True)
+        self.update_status_bar_message(f"تم تطبيق الفلتر. عدد النتائج: {self.members_proxy_model.rowCount()}", is_general_message=True)
         self._last_filter_applied = True 
 
     def show_table_context_menu(self, position):
-        selected_items = self.table.selectedItems()
-        item_at_pos = self.table.itemAt(position) 
+        selected_rows = self.table.selectionModel().selectedRows()
+        index_at_pos = self.table.indexAt(position) 
 
-        if not item_at_pos and not selected_items: 
+        if not index_at_pos.isValid() and not selected_rows: 
             return
 
         row_index_in_table = -1
-        if item_at_pos: 
-            row_index_in_table = item_at_pos.row()
-        elif selected_items: 
-            row_index_in_table = selected_items[0].row()
+        if index_at_pos.isValid(): 
+            row_index_in_table = index_at_pos.row()
+        elif selected_rows: 
+            row_index_in_table = selected_rows[0].row()
 
         if row_index_in_table < 0: return 
 
-        current_list_for_context = self.filtered_members_list if self.is_filter_active else self.members_list
-        if row_index_in_table >= len(current_list_for_context): return 
-
-        member = current_list_for_context[row_index_in_table]
-        try:
-            original_member_index = self.members_list.index(member) 
-        except ValueError:
-            logger.error(f"العضو {member.nin} من القائمة المفلترة غير موجود في القائمة الرئيسية.")
-            self._show_toast(f"خطأ: العضو {self._get_member_display_name_with_index(member, -1)} غير موجود بشكل صحيح.", type="error", title="خطأ داخلي")
+        original_member_index = self.members_proxy_model.original_index_at(row_index_in_table)
+        if original_member_index == -1:
+            logger.error(f"الصف {row_index_in_table} في الجدول لا يقابل أي عضو في القائمة الرئيسية.")
+            self._show_toast("خطأ: العضو المحدد غير موجود بشكل صحيح.", type="error", title="خطأ داخلي")
             return
+        member = self.members_list[original_member_index]
 
         menu = QMenu(self)
         member_display_name_with_index = self._get_member_display_name_with_index(member, original_member_index)
@@ -979,7 +975,7 @@ class AnemApp(QMainWindow):
         menu.addAction(check_now_action)
 
         can_download_any_pdf = bool(member.pre_inscription_id) and \
-                               member.status in ["لديه موعد مسبق", "تم الحجز", "مكتمل", "فشل تحميل PDF", "مستفيد حاليًا من المنحة"]
+                               (member.status.pdf_eligible or member.status is MemberStatus.BENEFICIARY)
 
         download_all_action = QAction(QIcon.fromTheme("document-save-all", QIcon.fromTheme("document-save")), "تحميل جميع الشهادات", self)
         download_all_action.setEnabled(can_download_any_pdf)
@@ -989,7 +985,7 @@ class AnemApp(QMainWindow):
         menu.addSeparator()
 
         edit_action = QAction(QIcon.fromTheme("document-edit"), f"تعديل بيانات {member_display_name_with_index}", self)
-        edit_action.triggered.connect(lambda: self.edit_member_details(self.table.item(row_index_in_table, 0)))
+        edit_action.triggered.connect(lambda: self.edit_member_details(self.members_proxy_model.index(row_index_in_table, 0)))
         menu.addAction(edit_action)
 
         delete_action = QAction(QIcon.fromTheme("edit-delete"), f"حذف {member_display_name_with_index}", self)
@@ -1010,7 +1006,64 @@ class AnemApp(QMainWindow):
             logger.warning(f"view_member_info: فهرس خاطئ {original_member_index}")
             self._show_toast("خطأ في عرض معلومات العضو (فهرس غير صالح).", type="error", title="خطأ")
 
-    def check_member_now(self, original_member_index):
+    def _member_job_key(self, job_kind, member):
+        return (job_kind, id(member))
+
+    def _member_has_job(self, member, *job_kinds):
+        job_kinds = job_kinds or (FetchInitialInfoJob.kind, SingleMemberCheckJob.kind, DownloadAllPdfsJob.kind)
+        return any(self.member_jobs.is_active(self._member_job_key(job_kind, member)) for job_kind in job_kinds)
+
+    def _submit_member_job(self, job, priority):
+        """Queues a job for job.member in the job pool. Returns False if one of the same kind is already queued or running."""
+        handle = self.member_jobs.submit(job, priority, key=self._member_job_key(job.kind, job.member))
+        if handle is None:
+            return False
+        logger.debug(f"مجمع المهام: {self.member_jobs.stats()}")
+        return True
+
+    def _cancel_member_jobs(self, member):
+        for job_kind in (FetchInitialInfoJob.kind, SingleMemberCheckJob.kind, DownloadAllPdfsJob.kind):
+            self.member_jobs.cancel(self._member_job_key(job_kind, member))
+
+    def _detach_removed_member(self, member):
+        """Before a member leaves the list: cancels its jobs and journals the removal."""
+        self._cancel_member_jobs(member)
+        self.member_journal.record_removal(member)
+
+    def _member_job_slot(self, job, slot, *extra_args):
+        """
+        Slot for a job signal whose first argument is the member index. A job may wait in the
+        queue for minutes, so the index it was created with is replaced by the member's
+        current index; signals of a member removed in the meantime are dropped.
+        """
+        member, job_kind = job.member, job.kind # بدون مرجع إلى المهمة نفسها: الإشارة لا تُبقيها حية
+        def forward(_queued_index, *args):
+            current_index = self.member_registry.index_of(member)
+            if current_index == -1:
+                logger.debug(f"مهمة {job_kind}: العضو {member.nin} لم يعد في القائمة. تجاهل الإشارة.")
+                return
+            slot(current_index, *args, *extra_args)
+        return forward
+
+    def _member_job_log_slot(self):
+        """Like _member_job_slot, for global_log_signal (message, is_general, member, index)."""
+        def forward(message, is_general, member_obj, _queued_index):
+            current_index = self.member_registry.index_of(member_obj) if member_obj is not None else -1
+            if member_obj is not None and current_index == -1:
+                return
+            self.update_status_bar_message(message, is_general, member_obj, current_index)
+        return forward
+
+    def _handle_member_job_finished(self, handle):
+        # مفتاح المهمة تحرر قبل هذه الإشارة: الفحص التلقائي لا يصطدم بالجلب المنتهي
+        if handle.kind == FetchInitialInfoJob.kind and not handle.cancelled:
+            current_index = self.member_registry.index_of(handle.job.member)
+            if current_index == -1:
+                logger.debug(f"انتهى جلب المعلومات الأولية لعضو محذوف ({handle.job.member.nin}). لا فحص تلقائي.")
+                return
+            self._handle_fetch_initial_info_finished(current_index)
+
+    def check_member_now(self, original_member_index, priority=JOB_PRIORITY_USER):
         if not self.activation_successful or (self.current_subscription_data and self.current_subscription_data.get("status","").upper() != "ACTIVE"):
             self._show_toast("لا يمكن إجراء الفحص. البرنامج غير مفعل أو الاشتراك غير نشط.", type="error", title="فحص فوري")
             return
@@ -1019,25 +1072,23 @@ class AnemApp(QMainWindow):
             member = self.members_list[original_member_index]
             member_display_name = self._get_member_display_name_with_index(member, original_member_index)
 
-            if member.is_processing: 
+            if member.is_processing or self._member_has_job(member, FetchInitialInfoJob.kind, DownloadAllPdfsJob.kind): 
                  self._show_toast(f"العضو '{member_display_name}' قيد المعالجة حاليًا. يرجى الانتظار.", type="warning", title="فحص فوري")
                  return
 
-            if self.single_check_thread and self.single_check_thread.isRunning():
-                self._show_toast("فحص آخر قيد التنفيذ بالفعل. يرجى الانتظار.", type="warning", title="فحص فوري")
+            check_job = SingleMemberCheckJob(member, original_member_index, self.api_client, self.settings.copy())
+            check_job.update_member_gui_signal.connect(self._member_job_slot(check_job, self.update_member_gui_in_table))
+            check_job.new_data_fetched_signal.connect(self._member_job_slot(check_job, self.update_member_name_in_table))
+            check_job.member_processing_started_signal.connect(self._member_job_slot(check_job, self.handle_member_processing_signal, True))
+            check_job.member_processing_finished_signal.connect(self._member_job_slot(check_job, self.handle_member_processing_signal, False))
+            check_job.global_log_signal.connect(self._member_job_log_slot())
+            if not self._submit_member_job(check_job, priority):
+                self._show_toast(f"فحص العضو '{member_display_name}' قيد التنفيذ أو في الانتظار بالفعل.", type="warning", title="فحص فوري")
                 return
 
             logger.info(f"طلب فحص فوري للعضو: {member_display_name}")
             self.update_status_bar_message(f"بدء الفحص الفوري للعضو: {member_display_name}...", is_general_message=False)
             self._show_toast(f"بدء الفحص الفوري للعضو: {member_display_name}", type="info", title="فحص فوري")
-
-            self.single_check_thread = SingleMemberCheckThread(member, original_member_index, self.api_client, self.settings.copy())
-            self.single_check_thread.update_member_gui_signal.connect(self.update_member_gui_in_table)
-            self.single_check_thread.new_data_fetched_signal.connect(self.update_member_name_in_table)
-            self.single_check_thread.member_processing_started_signal.connect(lambda idx: self.handle_member_processing_signal(idx, True))
-            self.single_check_thread.member_processing_finished_signal.connect(lambda idx: self.handle_member_processing_signal(idx, False))
-            self.single_check_thread.global_log_signal.connect(self.update_status_bar_message)
-            self.single_check_thread.start()
         else:
             logger.warning(f"check_member_now: فهرس خاطئ {original_member_index}")
             self._show_toast("خطأ في بدء الفحص الفوري (فهرس غير صالح).", type="error", title="خطأ")
@@ -1054,11 +1105,7 @@ class AnemApp(QMainWindow):
         member = self.members_list[original_member_index]
         member_display_name = self._get_member_display_name_with_index(member, original_member_index)
 
-        if member.is_processing and self.active_download_all_pdfs_threads.get(original_member_index): 
-            self._show_toast(f"تحميل شهادات العضو '{member_display_name}' قيد التنفيذ بالفعل.", type="warning", title="تحميل الشهادات")
-            return
-
-        if self.active_download_all_pdfs_threads.get(original_member_index) and self.active_download_all_pdfs_threads[original_member_index].isRunning():
+        if self._member_has_job(member, DownloadAllPdfsJob.kind): 
             self._show_toast(f"تحميل شهادات العضو '{member_display_name}' قيد التنفيذ بالفعل.", type="warning", title="تحميل الشهادات")
             return
 
@@ -1066,23 +1113,19 @@ class AnemApp(QMainWindow):
             self._show_toast(f"ID التسجيل المسبق مفقود للعضو {member_display_name}. لا يمكن تحميل الشهادات.", type="error", title="تحميل الشهادات")
             return
 
+        all_pdfs_job = DownloadAllPdfsJob(member, original_member_index, self.api_client)
+        all_pdfs_job.all_pdfs_download_finished_signal.connect(self._member_job_slot(all_pdfs_job, self.handle_all_pdfs_download_finished))
+        all_pdfs_job.individual_pdf_status_signal.connect(self._member_job_slot(all_pdfs_job, self.handle_individual_pdf_status))
+        all_pdfs_job.member_processing_started_signal.connect(self._member_job_slot(all_pdfs_job, self.handle_member_processing_signal, True))
+        all_pdfs_job.member_processing_finished_signal.connect(self._member_job_slot(all_pdfs_job, self._handle_download_all_pdfs_finished))
+        all_pdfs_job.global_log_signal.connect(self._member_job_log_slot())
+        self._submit_member_job(all_pdfs_job, JOB_PRIORITY_USER)
+
         logger.info(f"طلب تحميل جميع الشهادات للعضو: {member_display_name}")
         self.update_status_bar_message(f"بدء تحميل جميع الشهادات لـ {member_display_name}...", is_general_message=False)
         self._show_toast(f"بدء تحميل جميع الشهادات لـ {member_display_name}", type="info", title="تحميل الشهادات")
 
-        all_pdfs_thread = DownloadAllPdfsThread(member, original_member_index, self.api_client)
-        all_pdfs_thread.all_pdfs_download_finished_signal.connect(self.handle_all_pdfs_download_finished)
-        all_pdfs_thread.individual_pdf_status_signal.connect(self.handle_individual_pdf_status)
-        all_pdfs_thread.member_processing_started_signal.connect(lambda idx: self.handle_member_processing_signal(idx, True))
-        all_pdfs_thread.member_processing_finished_signal.connect(lambda idx, ri=original_member_index: self._clear_active_download_thread(ri))
-        all_pdfs_thread.global_log_signal.connect(self.update_status_bar_message)
-
-        self.active_download_all_pdfs_threads[original_member_index] = all_pdfs_thread
-        all_pdfs_thread.start()
-
-    def _clear_active_download_thread(self, original_member_index):
-        if original_member_index in self.active_download_all_pdfs_threads:
-            del self.active_download_all_pdfs_threads[original_member_index]
+    def _handle_download_all_pdfs_finished(self, original_member_index):
         self.handle_member_processing_signal(original_member_index, False) 
         if 0 <= original_member_index < len(self.members_list):
             member = self.members_list[original_member_index]
@@ -1133,12 +1176,12 @@ class AnemApp(QMainWindow):
         if rdv_path: member.pdf_rdv_path = rdv_path
 
         if all_success:
-            if member.status != "مستفيد حاليًا من المنحة": 
+            if member.status != MemberStatus.BENEFICIARY: 
                 if (member.pdf_honneur_path and member.pdf_rdv_path) or \
-                   (member.pdf_honneur_path and not (member.already_has_rdv or member.rdv_id or member.status == "تم الحجز")):
-                    member.status = "مكتمل"
+                   (member.pdf_honneur_path and not (member.already_has_rdv or member.rdv_id or member.status == MemberStatus.BOOKED)):
+                    member.status = MemberStatus.COMPLETED
                 elif member.pdf_honneur_path or member.pdf_rdv_path : 
-                     member.status = "تم الحجز" 
+                     member.status = MemberStatus.BOOKED 
 
             member.set_activity_detail(overall_status_msg)
             final_toast_msg = f"{overall_status_msg}"
@@ -1170,8 +1213,8 @@ class AnemApp(QMainWindow):
                         logger.error(f"فشل فتح مجلد الملفات: {e_open}")
                         self._show_toast(f"فشل فتح مجلد الملفات: {e_open}", type="warning", title="خطأ فتح مجلد")
         else:
-            if "فشل تحميل PDF" not in member.status and member.status != "مستفيد حاليًا من المنحة": 
-                member.status = "فشل تحميل PDF"
+            if member.status is not MemberStatus.PDF_DOWNLOAD_FAILED and member.status is not MemberStatus.BENEFICIARY: 
+                member.status = MemberStatus.PDF_DOWNLOAD_FAILED
 
             final_detail_msg = overall_status_msg
             if first_error_msg and first_error_msg not in final_detail_msg: 
@@ -1189,6 +1232,9 @@ class AnemApp(QMainWindow):
         if not (0 <= original_member_index < len(self.members_list)):
             self._show_toast("فهرس عضو غير صالح للحذف.", type="error", title="خطأ")
             return
+        if self.members_loading:
+            self._show_toast("يرجى الانتظار حتى يكتمل تحميل بيانات الأعضاء.", type="warning", title="حذف عضو")
+            return
 
         member_to_remove = self.members_list[original_member_index]
         member_display_name = self._get_member_display_name_with_index(member_to_remove, original_member_index)
@@ -1198,21 +1244,14 @@ class AnemApp(QMainWindow):
         if confirm_delete == QMessageBox.No:
             return
 
-        self.members_list.pop(original_member_index) 
-
-        if self.is_filter_active: 
-            self.apply_filter_and_search()
-        else: 
-            self.update_table()
+        self._detach_removed_member(member_to_remove)
+        self.members_model.remove_member_at(original_member_index)
 
         logger.info(f"تم حذف العضو: {member_display_name}")
         self.update_status_bar_message(f"تم حذف العضو: {member_display_name}", is_general_message=True)
         self._show_toast(f"تم حذف العضو: {member_display_name}", type="info", title="حذف عضو")
         self.save_members_data() 
 
-        if self.monitoring_thread and self.monitoring_thread.current_member_index_to_process >= len(self.members_list):
-            self.monitoring_thread.current_member_index_to_process = 0 
-
 
     def load_app_settings(self):
         loaded_settings = None
@@ -1290,7 +1329,7 @@ class AnemApp(QMainWindow):
                     logger.error(f"فشل في حذف الملف المؤقت للإعدادات {tmp_path} بعد خطأ في الحفظ: {e_del_tmp}")
 
     def open_settings_dialog(self):
-        dialog = SettingsDialog(self.settings.copy(), self) 
+        dialog = SettingsDialog(self.settings.copy(), self, timeout_stats=self.api_client.timeout_stats())
         if dialog.exec_() == SettingsDialog.Accepted:
             new_settings = dialog.get_settings()
             self.settings.update(new_settings) 
@@ -1394,44 +1433,28 @@ class AnemApp(QMainWindow):
 
 
     def update_active_row_spinner_display(self):
-        if self.active_spinner_row_in_view == -1 or not (0 <= self.active_spinner_row_in_view < self.table.rowCount()):
+        if self.active_spinner_member_index == -1:
             return 
 
-        current_list_displayed = self.filtered_members_list if self.is_filter_active else self.members_list
-
-        if self.active_spinner_row_in_view >= len(current_list_displayed):
+        if not (0 <= self.active_spinner_member_index < len(self.members_list)):
             self.row_spinner_timer.stop()
-            self.active_spinner_row_in_view = -1
+            self.active_spinner_member_index = -1
+            self.members_model.clear_spinner()
             return
 
-        member = current_list_displayed[self.active_spinner_row_in_view]
-        try:
-            original_member_index = self.members_list.index(member) 
-        except ValueError: 
-            self.row_spinner_timer.stop()
-            self.active_spinner_row_in_view = -1
-            return
+        original_member_index = self.active_spinner_member_index
+        member = self.members_list[original_member_index]
 
         if not member.is_processing:
-            is_still_pdf_downloading = self.active_download_all_pdfs_threads.get(original_member_index) and \
-                                       self.active_download_all_pdfs_threads[original_member_index].isRunning()
-            is_still_single_checking = self.single_check_thread and \
-                                       self.single_check_thread.isRunning() and \
-                                       self.single_check_thread.index == original_member_index
-
-            if not is_still_pdf_downloading and not is_still_single_checking: 
+            if not self._member_has_job(member, DownloadAllPdfsJob.kind, SingleMemberCheckJob.kind): 
                 self.row_spinner_timer.stop()
-                self.active_spinner_row_in_view = -1 
+                self.active_spinner_member_index = -1 
+                self.members_model.clear_spinner()
             self.update_member_gui_in_table(original_member_index, member.status, member.last_activity_detail, get_icon_name_for_status(member.status))
             return
 
         self.spinner_char_idx = (self.spinner_char_idx + 1) % len(self.spinner_chars)
-        char = self.spinner_chars[self.spinner_char_idx]
-
-        icon_item_in_table = self.table.item(self.active_spinner_row_in_view, self.COL_ICON)
-        if icon_item_in_table:
-            icon_item_in_table.setText(char) 
-            icon_item_in_table.setIcon(QIcon()) 
+        self.members_model.set_spinner(original_member_index, self.spinner_chars[self.spinner_char_idx])
 
 
     def handle_member_processing_signal(self, original_member_index, is_processing_now):
@@ -1442,33 +1465,16 @@ class AnemApp(QMainWindow):
         member = self.members_list[original_member_index]
         member.is_processing = is_processing_now 
 
-        row_in_table_to_update = -1
-        current_list_displayed = self.filtered_members_list if self.is_filter_active else self.members_list
-        try:
-            row_in_table_to_update = current_list_displayed.index(member)
-        except ValueError: 
-            return
-
-        if not (0 <= row_in_table_to_update < self.table.rowCount()):
-             logger.warning(f"HMP Signal: فهرس الجدول المحسوب {row_in_table_to_update} خارج الحدود لـ {self.table.rowCount()} صفوف.")
-             return
-
         member_display_name = self._get_member_display_name_with_index(member, original_member_index)
         if is_processing_now:
-            self.active_spinner_row_in_view = row_in_table_to_update 
+            self.active_spinner_member_index = original_member_index 
             self.spinner_char_idx = 0 
+            self.members_model.set_spinner(original_member_index, self.spinner_chars[self.spinner_char_idx])
 
-            self.table.selectRow(row_in_table_to_update)
-            first_column_item = self.table.item(row_in_table_to_update, 0) 
-            if first_column_item:
-                self.table.scrollToItem(first_column_item, QAbstractItemView.EnsureVisible)
-
-            icon_item = self.table.item(row_in_table_to_update, self.COL_ICON)
-            if icon_item:
-                icon_item.setText(self.spinner_chars[self.spinner_char_idx]) 
-                icon_item.setIcon(QIcon()) 
-
-            self.highlight_processing_row(row_in_table_to_update, force_processing_display=True) 
+            row_in_table_to_update = self.members_proxy_model.view_row_of(original_member_index)
+            if row_in_table_to_update != -1:
+                self.table.selectRow(row_in_table_to_update)
+                self.table.scrollTo(self.members_proxy_model.index(row_in_table_to_update, 0), QAbstractItemView.EnsureVisible)
 
             if not self.row_spinner_timer.isActive(): 
                 self.row_spinner_timer.start(self.row_spinner_timer_interval)
@@ -1476,75 +1482,13 @@ class AnemApp(QMainWindow):
             self.update_status_bar_message(f"جاري معالجة العضو: {member_display_name}...", is_general_message=False)
 
         else: 
-            is_still_pdf_downloading = self.active_download_all_pdfs_threads.get(original_member_index) and \
-                                       self.active_download_all_pdfs_threads[original_member_index].isRunning()
-            is_still_single_checking = self.single_check_thread and \
-                                       self.single_check_thread.isRunning() and \
-                                       self.single_check_thread.index == original_member_index
-
-            if not is_still_pdf_downloading and not is_still_single_checking: 
-                if self.active_spinner_row_in_view == row_in_table_to_update: 
+            if not self._member_has_job(member, DownloadAllPdfsJob.kind, SingleMemberCheckJob.kind): 
+                if self.active_spinner_member_index == original_member_index: 
                     self.row_spinner_timer.stop()
-                    self.active_spinner_row_in_view = -1 
-                    icon_item = self.table.item(row_in_table_to_update, self.COL_ICON)
-                    if icon_item:
-                        icon_item.setText("") 
-
-            self.highlight_processing_row(row_in_table_to_update, force_processing_display=False) 
-
-
-    def highlight_processing_row(self, row_index_in_table, force_processing_display=None):
-        if not (0 <= row_index_in_table < self.table.rowCount()):
-            return 
-
-        current_list_displayed = self.filtered_members_list if self.is_filter_active else self.members_list
-        if row_index_in_table >= len(current_list_displayed): 
-            return
+                    self.active_spinner_member_index = -1 
+                    self.members_model.clear_spinner()
 
-        member = current_list_displayed[row_index_in_table]
-        is_processing_flag = force_processing_display if force_processing_display is not None else member.is_processing
-
-        item_for_selection_check = self.table.item(row_index_in_table, 0) 
-        is_row_selected_by_user_or_code = False
-        if item_for_selection_check:
-            is_row_selected_by_user_or_code = item_for_selection_check.isSelected() 
-
-        default_bg_color = self.table.palette().color(QPalette.Base)
-        alternate_bg_color = QColor(self.table.palette().color(QPalette.AlternateBase)) if self.table.alternatingRowColors() else default_bg_color
-        processing_bg_color = QColorConstants.PROCESSING_ROW_DARK_THEME
-        selection_bg_color_from_qss = QColor("#00A2E8") 
-
-        for col in range(self.table.columnCount()):
-            item = self.table.item(row_index_in_table, col)
-            if item:
-                if is_processing_flag: 
-                    item.setBackground(processing_bg_color)
-                    item.setForeground(Qt.white)
-                elif is_row_selected_by_user_or_code: 
-                    if item.background() != selection_bg_color_from_qss: 
-                         item.setBackground(selection_bg_color_from_qss)
-                    if item.foreground().color() != Qt.white: 
-                         item.setForeground(Qt.white)
-                else: 
-                    status_text_for_color = member.status
-                    specific_color = None
-                    if status_text_for_color == "مستفيد حاليًا من المنحة": specific_color = QColorConstants.BENEFITING_GREEN_DARK_THEME
-                    elif status_text_for_color == "بيانات الإدخال خاطئة": specific_color = QColorConstants.PINK_DARK_THEME
-                    elif status_text_for_color == "لديه موعد مسبق": specific_color = QColorConstants.LIGHT_BLUE_DARK_THEME
-                    elif status_text_for_color == "غير مؤهل للحجز": specific_color = QColorConstants.ORANGE_RED_DARK_THEME
-                    elif status_text_for_color == "مكتمل": specific_color = QColorConstants.LIGHT_GREEN_DARK_THEME
-                    elif "فشل" in status_text_for_color or "غير مؤهل" in status_text_for_color or "خطأ" in status_text_for_color:
-                        specific_color = QColorConstants.LIGHT_PINK_DARK_THEME
-                    elif "يتطلب تسجيل مسبق" in status_text_for_color: specific_color = QColorConstants.LIGHT_YELLOW_DARK_THEME
-
-                    if specific_color:
-                        item.setBackground(specific_color)
-                    else: 
-                        if self.table.alternatingRowColors() and row_index_in_table % 2 != 0 :
-                            item.setBackground(alternate_bg_color)
-                        else:
-                            item.setBackground(default_bg_color)
-                    item.setForeground(self.table.palette().color(QPalette.Text)) 
+            self.members_model.refresh_member(original_member_index) 
 
 
     def add_member(self):
@@ -1552,6 +1496,10 @@ class AnemApp(QMainWindow):
             self._show_toast("لا يمكن إضافة أعضاء. البرنامج غير مفعل أو الاشتراك غير نشط.", type="error", title="إضافة عضو")
             return
 
+        if self.members_loading:
+            self._show_toast("يرجى الانتظار حتى يكتمل تحميل بيانات الأعضاء.", type="warning", title="إضافة عضو")
+            return
+
         dialog = AddMemberDialog(self)
         if dialog.exec_() == AddMemberDialog.Accepted:
             data = dialog.get_data()
@@ -1574,33 +1522,24 @@ class AnemApp(QMainWindow):
                     return
 
             member = Member(data["nin"], data["wassit_no"], data["ccp"], data["phone_number"])
-            self.members_list.append(member)
-
-            if self.is_filter_active: 
-                self.apply_filter_and_search()
-            else: 
-                self.update_table()
+            current_original_index = self.members_model.append_member(member)
+            self.member_journal.record_member(member) # سجل كامل: يستعيده السجل إن انقطع البرنامج قبل اللقطة
+            self.save_members_data()
 
-            current_original_index = self.members_list.index(member) 
             member_display_name_add = self._get_member_display_name_with_index(member, current_original_index)
             logger.info(f"تمت إضافة العضو: {member_display_name_add}, Phone={data['phone_number']}")
             self.update_status_bar_message(f"تمت إضافة العضو: {member_display_name_add}. جاري جلب المعلومات الأولية...", is_general_message=False)
             self._show_toast(f"تمت إضافة العضو. جاري جلب المعلومات الأولية...", type="info", title=member_display_name_add)
 
-            fetch_thread = FetchInitialInfoThread(member, current_original_index, self.api_client, self.settings.copy())
-            fetch_thread.update_member_gui_signal.connect(self.update_member_gui_in_table)
-            fetch_thread.new_data_fetched_signal.connect(self.update_member_name_in_table)
-            fetch_thread.member_processing_started_signal.connect(lambda idx: self.handle_member_processing_signal(idx, True))
-            
-            fetch_thread.member_processing_finished_signal.connect(
-                lambda idx, new_member_original_idx=current_original_index: self._handle_fetch_initial_info_finished(new_member_original_idx)
-            )
-
-            self.initial_fetch_threads.append(fetch_thread)
-            fetch_thread.start()
+            fetch_job = FetchInitialInfoJob(member, current_original_index, self.api_client, self.settings.copy())
+            fetch_job.update_member_gui_signal.connect(self._member_job_slot(fetch_job, self.update_member_gui_in_table))
+            fetch_job.new_data_fetched_signal.connect(self._member_job_slot(fetch_job, self.update_member_name_in_table))
+            fetch_job.member_processing_started_signal.connect(self._member_job_slot(fetch_job, self.handle_member_processing_signal, True))
+            fetch_job.member_processing_finished_signal.connect(self._member_job_slot(fetch_job, self.handle_member_processing_signal, False))
+            self._submit_member_job(fetch_job, JOB_PRIORITY_BACKGROUND)
 
     def _handle_fetch_initial_info_finished(self, original_member_index):
-        logger.debug(f"FetchInitialInfoThread finished for member index {original_member_index}. Setting processing to False.")
+        logger.debug(f"FetchInitialInfoJob finished for member index {original_member_index}. Setting processing to False.")
         if 0 <= original_member_index < len(self.members_list):
             self.handle_member_processing_signal(original_member_index, False) 
             self._trigger_auto_check_after_add(original_member_index)
@@ -1613,44 +1552,39 @@ class AnemApp(QMainWindow):
             member = self.members_list[original_member_index]
             member_display_name = self._get_member_display_name_with_index(member, original_member_index)
             logger.info(f"اكتمل جلب المعلومات الأولية للعضو {member_display_name}. بدء الفحص التلقائي الفوري...")
+
             
-            if member.is_processing: 
+            if member.is_processing or self._member_has_job(member, DownloadAllPdfsJob.kind): 
                 logger.warning(f"_trigger_auto_check_after_add: العضو {member_display_name} لا يزال قيد المعالجة (غير متوقع). تأجيل الفحص الفوري.")
                 self._show_toast(f"العضو لا يزال قيد المعالجة (غير متوقع). سيتأخر الفحص الفوري قليلاً.", type="warning", title=member_display_name)
                 QTimer.singleShot(500, lambda: self._trigger_auto_check_after_add(original_member_index)) 
                 return
 
             self._show_toast(f"بدء الفحص التلقائي الفوري...", type="info", title=member_display_name)
-            self.check_member_now(original_member_index) 
+            self.check_member_now(original_member_index, JOB_PRIORITY_AUTO) 
         else:
             logger.warning(f"_trigger_auto_check_after_add: فهرس خاطئ {original_member_index}")
 
 
-    def edit_member_details(self, item):
+    def edit_member_details(self, view_index):
         if not self.activation_successful or (self.current_subscription_data and self.current_subscription_data.get("status","").upper() != "ACTIVE"):
             self._show_toast("لا يمكن تعديل الأعضاء. البرنامج غير مفعل أو الاشتراك غير نشط.", type="error", title="تعديل عضو")
             return
 
         row_in_table = -1
-        if not item: 
+        if not view_index or not view_index.isValid(): 
             selected_rows = self.table.selectionModel().selectedRows()
             if not selected_rows: return 
             row_in_table = selected_rows[0].row() 
         else:
-            row_in_table = item.row() 
+            row_in_table = view_index.row() 
 
-        current_list_for_edit = self.filtered_members_list if self.is_filter_active else self.members_list
-        if not (0 <= row_in_table < len(current_list_for_edit)): return 
-
-        member_to_edit_from_display = current_list_for_edit[row_in_table]
-        try:
-            original_member_index = self.members_list.index(member_to_edit_from_display) 
-            member_to_edit = self.members_list[original_member_index] 
-        except ValueError:
-            member_display_name_err = self._get_member_display_name_with_index(member_to_edit_from_display, -1)
-            logger.error(f"فشل العثور على العضو {member_display_name_err} في القائمة الرئيسية عند التعديل.")
-            self._show_toast(f"خطأ: فشل العثور على العضو {member_display_name_err} للتعديل.", type="error", title="خطأ داخلي")
+        original_member_index = self.members_proxy_model.original_index_at(row_in_table)
+        if original_member_index == -1:
+            logger.error(f"فشل العثور على العضو في الصف {row_in_table} في القائمة الرئيسية عند التعديل.")
+            self._show_toast("خطأ: فشل العثور على العضو للتعديل.", type="error", title="خطأ داخلي")
             return
+        member_to_edit = self.members_list[original_member_index]
 
         member_display_name_edit_title = self._get_member_display_name_with_index(member_to_edit, original_member_index)
         dialog = EditMemberDialog(member_to_edit, self)
@@ -1688,7 +1622,7 @@ class AnemApp(QMainWindow):
 
             if nin_changed or wassit_changed: 
                 logger.info(f"تم تغيير المعرفات الرئيسية للعضو {member_display_after_edit}. إعادة تعيين الحالة وجلب المعلومات.")
-                member_to_edit.status = "جديد" 
+                member_to_edit.status = MemberStatus.NEW 
                 member_to_edit.set_activity_detail("تم تعديل المعرفات، يتطلب إعادة التحقق.")
                 member_to_edit.nom_fr = ""
                 member_to_edit.prenom_fr = ""
@@ -1709,24 +1643,20 @@ class AnemApp(QMainWindow):
                 member_to_edit.have_allocation = False
                 member_to_edit.allocation_details = {}
 
-                if self.is_filter_active: self.apply_filter_and_search()
-                else: self.update_table_row(original_member_index, member_to_edit) 
+                self.members_model.refresh_member(original_member_index, get_icon_name_for_status(member_to_edit.status)) 
 
                 self.update_status_bar_message(f"تم تعديل بيانات العضو {member_display_after_edit}. جاري إعادة جلب المعلومات...", is_general_message=False)
                 self._show_toast(f"تم تعديل البيانات. جاري إعادة جلب المعلومات...", type="info", title=member_display_after_edit)
 
-                fetch_thread = FetchInitialInfoThread(member_to_edit, original_member_index, self.api_client, self.settings.copy())
-                fetch_thread.update_member_gui_signal.connect(self.update_member_gui_in_table)
-                fetch_thread.new_data_fetched_signal.connect(self.update_member_name_in_table)
-                fetch_thread.member_processing_started_signal.connect(lambda idx: self.handle_member_processing_signal(idx, True))
-                fetch_thread.member_processing_finished_signal.connect(
-                     lambda idx, edited_member_idx=original_member_index: self._handle_fetch_initial_info_finished(edited_member_idx) 
-                )
-                self.initial_fetch_threads.append(fetch_thread)
-                fetch_thread.start()
+                self._cancel_member_jobs(member_to_edit) # المهام الجارية تعمل على البيانات القديمة
+                fetch_job = FetchInitialInfoJob(member_to_edit, original_member_index, self.api_client, self.settings.copy())
+                fetch_job.update_member_gui_signal.connect(self._member_job_slot(fetch_job, self.update_member_gui_in_table))
+                fetch_job.new_data_fetched_signal.connect(self._member_job_slot(fetch_job, self.update_member_name_in_table))
+                fetch_job.member_processing_started_signal.connect(self._member_job_slot(fetch_job, self.handle_member_processing_signal, True))
+                fetch_job.member_processing_finished_signal.connect(self._member_job_slot(fetch_job, self.handle_member_processing_signal, False))
+                self._submit_member_job(fetch_job, JOB_PRIORITY_USER)
             else: 
-                if self.is_filter_active: self.apply_filter_and_search()
-                else: self.update_table_row(original_member_index, member_to_edit) 
+                self.members_model.refresh_member(original_member_index, get_icon_name_for_status(member_to_edit.status)) 
                 self.update_status_bar_message(f"تم تعديل بيانات العضو: {member_display_after_edit}", is_general_message=True)
                 self._show_toast(f"تم تعديل بيانات العضو.", type="success", title=member_display_after_edit)
 
@@ -1737,6 +1667,9 @@ class AnemApp(QMainWindow):
         if not self.activation_successful or (self.current_subscription_data and self.current_subscription_data.get("status","").upper() != "ACTIVE"):
             self._show_toast("لا يمكن حذف الأعضاء. البرنامج غير مفعل أو الاشتراك غير نشط.", type="error", title="حذف عضو")
             return
+        if self.members_loading:
+            self._show_toast("يرجى الانتظار حتى يكتمل تحميل بيانات الأعضاء.", type="warning", title="حذف عضو")
+            return
 
         selected_rows_in_table = self.table.selectionModel().selectedRows()
         if not selected_rows_in_table:
@@ -1745,15 +1678,9 @@ class AnemApp(QMainWindow):
 
         confirm_msg = f"هل أنت متأكد أنك تريد حذف {len(selected_rows_in_table)} عضو/أعضاء محددين؟"
         if len(selected_rows_in_table) == 1: 
-            row_in_table = selected_rows_in_table[0].row()
-            current_list_for_display = self.filtered_members_list if self.is_filter_active else self.members_list
-            if 0 <= row_in_table < len(current_list_for_display):
-                member_to_remove_display_obj = current_list_for_display[row_in_table]
-                original_idx_for_display_remove = -1
-                try:
-                    original_idx_for_display_remove = self.members_list.index(member_to_remove_display_obj)
-                except ValueError:
-                    pass 
+            original_idx_for_display_remove = self.members_proxy_model.original_index_at(selected_rows_in_table[0].row())
+            if original_idx_for_display_remove != -1:
+                member_to_remove_display_obj = self.members_list[original_idx_for_display_remove]
                 member_to_remove_display_name = self._get_member_display_name_with_index(member_to_remove_display_obj, original_idx_for_display_remove)
                 confirm_msg = f"هل أنت متأكد أنك تريد حذف العضو '{member_to_remove_display_name}'؟"
 
@@ -1762,106 +1689,28 @@ class AnemApp(QMainWindow):
         if confirm_delete == QMessageBox.No:
             return
 
-        members_to_delete_from_display = [] 
+        existing_members_to_delete = []
         for index_obj in selected_rows_in_table:
-            row_in_table = index_obj.row()
-            current_list_for_display = self.filtered_members_list if self.is_filter_active else self.members_list
-            if 0 <= row_in_table < len(current_list_for_display):
-                members_to_delete_from_display.append(current_list_for_display[row_in_table])
-
-        deleted_count = 0
-        for member_to_delete in members_to_delete_from_display:
-            if member_to_delete in self.members_list: 
-                original_idx_before_delete = self.members_list.index(member_to_delete)
+            original_idx_before_delete = self.members_proxy_model.original_index_at(index_obj.row())
+            if original_idx_before_delete != -1:
+                member_to_delete = self.members_list[original_idx_before_delete]
                 deleted_member_display_name = self._get_member_display_name_with_index(member_to_delete, original_idx_before_delete)
-                self.members_list.remove(member_to_delete) 
+                existing_members_to_delete.append(member_to_delete)
+                self._detach_removed_member(member_to_delete)
                 logger.info(f"تم حذف العضو: {deleted_member_display_name}")
-                deleted_count +=1
             else:
-                logger.warning(f"محاولة حذف عضو {member_to_delete.nin} غير موجود في القائمة الرئيسية.")
-
-        if self.is_filter_active: 
-            self.apply_filter_and_search()
-        else: 
-            self.update_table()
+                logger.warning(f"محاولة حذف صف {index_obj.row()} غير موجود في القائمة الرئيسية.")
+        deleted_count = self.members_model.remove_members(existing_members_to_delete)
 
         if deleted_count > 0:
             self.update_status_bar_message(f"تم حذف {deleted_count} عضو/أعضاء.", is_general_message=True)
             self._show_toast(f"تم حذف {deleted_count} عضو/أعضاء بنجاح.", type="info", title="حذف أعضاء")
 
         self.save_members_data() 
-        if self.monitoring_thread and self.monitoring_thread.current_member_index_to_process >= len(self.members_list):
-            self.monitoring_thread.current_member_index_to_process = 0 
 
 
     def update_table(self):
-        self.table.setRowCount(0) 
-        list_to_display = self.filtered_members_list if self.is_filter_active else self.members_list
-        for row_idx, member_obj in enumerate(list_to_display):
-            self.table.insertRow(row_idx)
-            self.update_table_row(row_idx, member_obj) 
-        if not self.is_filter_active: 
-            self.save_members_data()
-
-    def update_table_row(self, row_in_table, member):
-        item_icon = QTableWidgetItem()
-        item_icon.setTextAlignment(Qt.AlignCenter)
-        self.table.setItem(row_in_table, self.COL_ICON, item_icon) 
-
-        item_full_name_ar = QTableWidgetItem(member.get_full_name_ar())
-        item_full_name_ar.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.table.setItem(row_in_table, self.COL_FULL_NAME_AR, item_full_name_ar)
-
-        item_nin = QTableWidgetItem(member.nin)
-        item_nin.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.table.setItem(row_in_table, self.COL_NIN, item_nin)
-
-        item_wassit = QTableWidgetItem(member.wassit_no)
-        item_wassit.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.table.setItem(row_in_table, self.COL_WASSIT, item_wassit)
-
-        ccp_display = member.ccp
-        if len(member.ccp) == 12: 
-             ccp_display = f"{member.ccp[:10]} {member.ccp[10:]}"
-        item_ccp = QTableWidgetItem(ccp_display)
-        item_ccp.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.table.setItem(row_in_table, self.COL_CCP, item_ccp)
-
-        item_phone = QTableWidgetItem(member.phone_number or "") 
-        item_phone.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.table.setItem(row_in_table, self.COL_PHONE_NUMBER, item_phone)
-
-        item_status = QTableWidgetItem()
-        item_status.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.table.setItem(row_in_table, self.COL_STATUS, item_status)
-
-        rdv_date_display_text = member.rdv_date if member.rdv_date else ""
-        if member.rdv_date:
-            if member.rdv_source == "system":
-                rdv_date_display_text += " (نظام)"
-            elif member.rdv_source == "discovered":
-                rdv_date_display_text += " (مكتشف)"
-        item_rdv = QTableWidgetItem(rdv_date_display_text)
-        item_rdv.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-        self.table.setItem(row_in_table, self.COL_RDV_DATE, item_rdv)
-
-        detail_to_show = member.last_activity_detail 
-        item_details = QTableWidgetItem(detail_to_show)
-        item_details.setToolTip(member.full_last_activity_detail) 
-        item_details.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.table.setItem(row_in_table, self.COL_DETAILS, item_details)
-
-        try:
-            original_member_index = self.members_list.index(member) 
-            self.update_member_gui_in_table(original_member_index, member.status, member.last_activity_detail, get_icon_name_for_status(member.status))
-        except ValueError: 
-            status_item = self.table.item(row_in_table, self.COL_STATUS)
-            if status_item: status_item.setText(member.status)
-            icon_item = self.table.item(row_in_table, self.COL_ICON)
-            if icon_item:
-                qt_icon = self.style().standardIcon(getattr(QStyle, get_icon_name_for_status(member.status), QStyle.SP_CustomBase))
-                icon_item.setIcon(qt_icon)
-                icon_item.setText("") 
+        self.members_model.reset_members()
 
 
     def update_member_gui_in_table(self, original_member_index, status_text, detail_text, icon_name_str):
@@ -1870,56 +1719,15 @@ class AnemApp(QMainWindow):
 
         member = self.members_list[original_member_index] 
 
-        row_in_table_to_update = -1
-        current_list_displayed = self.filtered_members_list if self.is_filter_active else self.members_list
-        try:
-            row_in_table_to_update = current_list_displayed.index(member)
-        except ValueError: 
-            return
-
-        if not (0 <= row_in_table_to_update < self.table.rowCount()):
-             return 
-
-        self.table.item(row_in_table_to_update, self.COL_FULL_NAME_AR).setText(member.get_full_name_ar())
-        self.table.item(row_in_table_to_update, self.COL_NIN).setText(member.nin)
-        self.table.item(row_in_table_to_update, self.COL_WASSIT).setText(member.wassit_no)
-        ccp_display = member.ccp
-        if len(member.ccp) == 12: ccp_display = f"{member.ccp[:10]} {member.ccp[10:]}"
-        self.table.item(row_in_table_to_update, self.COL_CCP).setText(ccp_display)
-        self.table.item(row_in_table_to_update, self.COL_PHONE_NUMBER).setText(member.phone_number or "")
-
-        rdv_date_display_text = member.rdv_date if member.rdv_date else ""
-        if member.rdv_date:
-            if member.rdv_source == "system":
-                rdv_date_display_text += " (نظام)"
-            elif member.rdv_source == "discovered":
-                rdv_date_display_text += " (مكتشف)"
-        self.table.item(row_in_table_to_update, self.COL_RDV_DATE).setText(rdv_date_display_text)
-
-        detail_to_show_gui = member.last_activity_detail 
-        self.table.item(row_in_table_to_update, self.COL_DETAILS).setText(detail_to_show_gui)
-        self.table.item(row_in_table_to_update, self.COL_DETAILS).setToolTip(member.full_last_activity_detail) 
-
-        icon_item = self.table.item(row_in_table_to_update, self.COL_ICON)
-        status_text_item = self.table.item(row_in_table_to_update, self.COL_STATUS)
-        status_text_item.setText(status_text) 
-
-        if icon_item:
-            if self.active_spinner_row_in_view == row_in_table_to_update and member.is_processing:
-                icon_item.setIcon(QIcon()) 
-            else: 
-                qt_icon = self.style().standardIcon(getattr(QStyle, icon_name_str, QStyle.SP_CustomBase))
-                icon_item.setIcon(qt_icon)
-                icon_item.setText("") 
-
-        self.highlight_processing_row(row_in_table_to_update, force_processing_display=None)
+        self.members_model.refresh_member(original_member_index, icon_name_str)
 
         msg_attr_prefix = f"_toast_shown_{original_member_index}_" 
         if not self.suppress_initial_messages: 
             current_status_for_toast = status_text 
+            status_for_toast = MemberStatus.from_text(status_text)
             toast_title_for_member = self._get_member_display_name_with_index(member, original_member_index)
 
-            if "فشل" in current_status_for_toast or "خطأ" in current_status_for_toast or "غير مؤهل" in current_status_for_toast:
+            if status_for_toast.is_error:
                 error_attr = msg_attr_prefix + current_status_for_toast.replace(" ", "_") 
                 if not hasattr(self, error_attr) or not getattr(self, error_attr): 
                     self._show_toast(f"{member.full_last_activity_detail}", type="error", duration=5000, title=toast_title_for_member)
@@ -1927,7 +1735,7 @@ class AnemApp(QMainWindow):
                     for attr_suffix in ["input_error", "has_rdv", "booking_ineligible", "completed_or_benefiting", "success_generic"]:
                         if hasattr(self, msg_attr_prefix + attr_suffix):
                             delattr(self, msg_attr_prefix + attr_suffix)
-            elif current_status_for_toast == "مكتمل" or current_status_for_toast == "مستفيد حاليًا من المنحة" or current_status_for_toast == "تم الحجز":
+            elif status_for_toast.is_success:
                 success_attr = msg_attr_prefix + "success_generic" 
                 if not hasattr(self, success_attr) or not getattr(self, success_attr): 
                     self._show_toast(f"{detail_text}", type="success", duration=5000, title=toast_title_for_member)
@@ -1947,18 +1755,10 @@ class AnemApp(QMainWindow):
             member.nom_ar = nom_ar
             member.prenom_ar = prenom_ar
 
-            row_in_table_to_update = -1
-            current_list_displayed = self.filtered_members_list if self.is_filter_active else self.members_list
-            try:
-                row_in_table_to_update = current_list_displayed.index(member)
-                if 0 <= row_in_table_to_update < self.table.rowCount():
-                    full_name_item = self.table.item(row_in_table_to_update, self.COL_FULL_NAME_AR)
-                    if full_name_item:
-                        full_name_item.setText(member.get_full_name_ar()) 
-                    if not self.suppress_initial_messages: 
-                        self._show_toast(f"تم تحديث اسم العضو.", type="info", title=self._get_member_display_name_with_index(member, original_member_index))
-            except ValueError: 
-                pass 
+            self.members_model.refresh_member(original_member_index)
+            if self.members_proxy_model.view_row_of(original_member_index) != -1:
+                if not self.suppress_initial_messages: 
+                    self._show_toast(f"تم تحديث اسم العضو.", type="info", title=self._get_member_display_name_with_index(member, original_member_index))
             self.save_members_data() 
 
 
@@ -1986,12 +1786,35 @@ class AnemApp(QMainWindow):
         if hasattr(self, 'countdown_label'): 
             self.countdown_label.setText(time_remaining_str)
 
+    def update_countdown_deadline(self, prefix, deadline):
+        """Starts (deadline as a time.time() timestamp) or clears (deadline <= 0) the countdown label."""
+        if deadline <= 0:
+            self.countdown_timer.stop()
+            self.countdown_deadline = 0.0
+            self.update_countdown_timer_display("")
+            return
+        self.countdown_prefix = prefix
+        self.countdown_deadline = deadline
+        self._render_countdown()
+        self.countdown_timer.start(1000)
+
+    def _render_countdown(self):
+        remaining = max(0, math.ceil(self.countdown_deadline - time.time()))
+        minutes, seconds = divmod(remaining, 60)
+        hours, minutes = divmod(minutes, 60)
+        self.update_countdown_timer_display(f"{self.countdown_prefix}{hours:02d}:{minutes:02d}:{seconds:02d}")
+        if remaining == 0:
+            self.countdown_timer.stop()
+
 
     def start_monitoring(self):
         if not self.activation_successful or not self.current_subscription_data or self.current_subscription_data.get("status","").upper() != "ACTIVE":
             self._show_toast("لا يمكن بدء المراقبة. البرنامج غير مفعل أو الاشتراك غير نشط.", type="error", title="بدء المراقبة")
             return
 
+        if self.members_loading:
+            self._show_toast("يرجى الانتظار حتى يكتمل تحميل بيانات الأعضاء.", type="warning", title="بدء المراقبة")
+            return
         if not self.members_list:
             self._show_toast("يرجى إضافة أعضاء أولاً لبدء المراقبة.", type="warning", title="بدء المراقبة")
             return
@@ -2000,7 +1823,7 @@ class AnemApp(QMainWindow):
             self.monitoring_thread.members_list_ref = self.members_list 
             self.monitoring_thread.is_running = True
             self.monitoring_thread.is_connection_lost_mode = False 
-            self.monitoring_thread.current_member_index_to_process = 0 
+            self.monitoring_thread.member_scheduler.reset() 
             self.monitoring_thread.consecutive_network_error_trigger_count = 0 
             self.monitoring_thread.update_thread_settings(self.settings.copy()) 
             self.monitoring_thread.start()
@@ -2022,19 +1845,13 @@ class AnemApp(QMainWindow):
             self.monitoring_thread.stop_monitoring() 
             if self.row_spinner_timer.isActive():
                 self.row_spinner_timer.stop()
-                if self.active_spinner_row_in_view != -1 and self.active_spinner_row_in_view < self.table.rowCount():
-                    current_list_displayed = self.filtered_members_list if self.is_filter_active else self.members_list
-                    if self.active_spinner_row_in_view < len(current_list_displayed):
-                        member_at_spinner = current_list_displayed[self.active_spinner_row_in_view]
-                        try:
-                            original_member_index = self.members_list.index(member_at_spinner)
-                            if 0 <= original_member_index < len(self.members_list):
-                                member = self.members_list[original_member_index]
-                                member.is_processing = False 
-                                self.update_member_gui_in_table(original_member_index, member.status, member.last_activity_detail, get_icon_name_for_status(member.status))
-                        except ValueError:
-                             pass 
-                self.active_spinner_row_in_view = -1 
+                original_member_index = self.active_spinner_member_index
+                self.active_spinner_member_index = -1 
+                self.members_model.clear_spinner()
+                if 0 <= original_member_index < len(self.members_list):
+                    member = self.members_list[original_member_index]
+                    member.is_processing = False 
+                    self.update_member_gui_in_table(original_member_index, member.status, member.last_activity_detail, get_icon_name_for_status(member.status))
 
             if self.activation_successful and self.current_subscription_data and self.current_subscription_data.get("status","").upper() == "ACTIVE":
                 self._enable_app_functions() 
@@ -2044,7 +1861,7 @@ class AnemApp(QMainWindow):
 
             self.update_status_bar_message("تم إيقاف المراقبة بنجاح.", is_general_message=True)
             self._show_toast("تم إيقاف المراقبة.", type="info", title="المراقبة")
-            self.update_countdown_timer_display("") 
+            self.update_countdown_deadline("", 0.0) 
             for i in range(len(self.members_list)):
                 if self.members_list[i].is_processing:
                     self.members_list[i].is_processing = False
@@ -2055,97 +1872,118 @@ class AnemApp(QMainWindow):
 
 
     def load_members_data(self):
-        self.suppress_initial_messages = True 
-        loaded_successfully = False
-        primary_path = DATA_FILE 
-        backup_path = DATA_FILE_BAK 
+        """
+        Loads the members in batches: each batch is added to the table from its own
+        event-loop turn, so the first rows appear without waiting for the whole roster.
+        Saving is held until the last batch (a partial snapshot would drop members).
+        """
+        self.suppress_initial_messages = True
+        self.members_loading = True
+        self.persistence_service.hold()
+        self.members_list = []
+        self.member_registry.rebuild(self.members_list)
+        self.update_table()
 
-        if os.path.exists(primary_path):
-            try:
-                with open(primary_path, 'r', encoding='utf-8') as f:
-                    data_list = json.load(f)
-                    self.members_list = [Member.from_dict(data) for data in data_list]
-                    for member in self.members_list: 
-                        member.is_processing = False
-                    loaded_successfully = True
-                    logger.info(f"تم تحميل بيانات {len(self.members_list)} أعضاء من {primary_path}")
-            except json.JSONDecodeError:
-                logger.error(f"خطأ في فك تشفير JSON للملف الأساسي {primary_path}. محاولة تحميل النسخة الاحتياطية.")
-            except Exception as e:
-                logger.exception(f"خطأ غير متوقع عند تحميل البيانات من {primary_path}: {e}")
-        else:
-            logger.info(f"الملف الأساسي {primary_path} غير موجود. محاولة تحميل النسخة الاحتياطية.")
+        try:
+            stream = self.member_storage.stream_member_dicts()
+        except MemberStorageError as e:
+            logger.error(f"تعذر بدء التحميل التدريجي لبيانات الأعضاء: {e}")
+            stream = None
+        if stream is None:
+            self._load_members_data_at_once()
+            return
 
-        if not loaded_successfully and os.path.exists(backup_path): 
-            try:
-                with open(backup_path, 'r', encoding='utf-8') as f:
-                    data_list = json.load(f)
-                    self.members_list = [Member.from_dict(data) for data in data_list]
-                    for member in self.members_list: 
-                        member.is_processing = False
-                    loaded_successfully = True
-                    logger.info(f"تم تحميل بيانات {len(self.members_list)} أعضاء من الملف الاحتياطي {backup_path}")
-                    self.update_status_bar_message(f"تم استعادة البيانات من النسخة الاحتياطية.", is_general_message=True)
-                    self._show_toast(f"تم استعادة بيانات الأعضاء من نسخة احتياطية: {backup_path}", type="info", duration=5000, title="تحميل البيانات")
-                    try:
-                        shutil.copy2(backup_path, primary_path)
-                        logger.info(f"تم استعادة الملف الأساسي {primary_path} من النسخة الاحتياطية {backup_path}.")
-                    except Exception as e_copy:
-                        logger.error(f"فشل في استعادة الملف الأساسي من النسخة الاحتياطية: {e_copy}")
-            except json.JSONDecodeError:
-                logger.error(f"خطأ في فك تشفير JSON للملف الاحتياطي {backup_path}. قد يكون الملف تالفًا.")
-                self.update_status_bar_message(f"خطأ في قراءة ملف البيانات الاحتياطي {backup_path}.", is_general_message=True)
-                self._show_toast(f"خطأ في ملف البيانات الاحتياطي {backup_path}. قد يكون الملف تالفًا. تم بدء البرنامج بقائمة فارغة.", type="error", duration=6000, title="خطأ بيانات")
-            except Exception as e:
-                logger.exception(f"خطأ غير متوقع عند تحميل البيانات من الملف الاحتياطي {backup_path}: {e}")
-                self.update_status_bar_message(f"خطأ غير متوقع عند تحميل البيانات الاحتياطية: {e}", is_general_message=True)
-                self._show_toast(f"خطأ غير متوقع عند تحميل البيانات الاحتياطية: {e}", type="error", duration=6000, title="خطأ بيانات")
+        member_batches, source_path = stream
+        self.update_status_bar_message("جاري تحميل بيانات الأعضاء...", is_general_message=True)
+        self._load_next_members_batch(member_batches, source_path)
+
+    def _load_next_members_batch(self, member_batches, source_path):
+        try:
+            batch = next(member_batches, None)
+        except MemberStorageError as e:
+            # ملف تالف في منتصفه: نعيد التحميل كاملاً حتى تُستخدم النسخة الاحتياطية إن وجدت
+            logger.error(f"توقف التحميل التدريجي من {source_path} بعد {len(self.members_list)} عضو: {e}")
+            self.members_list = []
+            self.member_registry.rebuild(self.members_list)
+            self.update_table()
+            self._load_members_data_at_once()
+            return
+
+        if batch is None:
+            self._finish_members_loading()
+            return
+        self.members_model.append_members([Member.from_dict(data) for data in batch])
+        self.update_status_bar_message(f"جاري تحميل بيانات الأعضاء... ({len(self.members_list)})", is_general_message=True)
+        QTimer.singleShot(0, lambda: self._load_next_members_batch(member_batches, source_path))
 
-        if not loaded_successfully: 
+    def _load_members_data_at_once(self):
+        try:
+            data_list, source_path, from_backup = self.member_storage.load_member_dicts()
+            self.members_list = [Member.from_dict(data) for data in data_list]
+            for member in self.members_list: 
+                member.is_processing = False
+            if from_backup:
+                self.update_status_bar_message(f"تم استعادة البيانات من النسخة الاحتياطية.", is_general_message=True)
+                self._show_toast(f"تم استعادة بيانات الأعضاء من نسخة احتياطية: {source_path}", type="info", duration=5000, title="تحميل البيانات")
+            elif source_path is None:
+                logger.info(f"لم يتم العثور على بيانات أعضاء محفوظة ({self.member_storage.name}). سيبدأ البرنامج بقائمة فارغة.")
+                self.update_status_bar_message(f"ملف البيانات غير موجود أو تالف. يمكنك إضافة أعضاء جدد.", is_general_message=True)
+        except MemberStorageError as e:
+            self.members_list = []
+            self.update_status_bar_message(f"خطأ في قراءة بيانات الأعضاء: {e}", is_general_message=True)
+            self._show_toast(f"{e} تم بدء البرنامج بقائمة فارغة.", type="error", duration=6000, title="خطأ بيانات")
+        except Exception as e:
             self.members_list = []
-            logger.info(f"لم يتم العثور على ملف البيانات ({primary_path}) أو الملف الاحتياطي ({backup_path})، أو كلاهما تالف. سيبدأ البرنامج بقائمة فارغة.")
-            self.update_status_bar_message(f"ملف البيانات غير موجود أو تالف. يمكنك إضافة أعضاء جدد.", is_general_message=True)
+            logger.exception(f"خطأ غير متوقع عند تحميل بيانات الأعضاء: {e}")
+            self.update_status_bar_message(f"خطأ غير متوقع عند تحميل البيانات: {e}", is_general_message=True)
+            self._show_toast(f"خطأ غير متوقع عند تحميل البيانات: {e}", type="error", duration=6000, title="خطأ بيانات")
 
-        self.filtered_members_list = list(self.members_list) 
+        self.member_registry.rebuild(self.members_list)
         self.update_table() 
+        self._finish_members_loading()
+
+    def _finish_members_loading(self):
+        replayed_count = self.member_journal.replay(self.members_list)
+        if replayed_count:
+            self.member_registry.rebuild(self.members_list) # قد تحذف الاستعادة أعضاء أو تضيفهم
+        self.member_journal.reset_baseline(self.members_list)
+        if replayed_count:
+            logger.info(f"تمت إعادة تطبيق {replayed_count} تغيير من ملف السجل على بيانات الأعضاء.")
+            self.update_table()
+
+        self.members_loading = False
+        self.persistence_service.release()
+        if replayed_count:
+            self.save_members_data() # دمج السجل في ملف البيانات
 
         QTimer.singleShot(200, lambda: setattr(self, 'suppress_initial_messages', False))
 
 
-    def save_members_data(self):
-        primary_path = DATA_FILE 
-        tmp_path = DATA_FILE_TMP 
-        bak_path = DATA_FILE_BAK 
+    def export_members_to_json(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "تصدير بيانات الأعضاء", "members_data.json", "JSON (*.json)")
+        if not file_path:
+            return
         try:
-            data_to_save = []
-            for member in self.members_list:
-                member_dict = member.to_dict()
-                member_dict['is_processing'] = False 
-                data_to_save.append(member_dict)
-
-            with open(tmp_path, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=4)
+            exported_count = export_members_json([member.to_dict() for member in self.members_list], file_path)
+        except MemberStorageError as e:
+            self._show_toast(f"فشل تصدير بيانات الأعضاء: {e}", type="error", title="تصدير")
+            return
+        self._show_toast(f"تم تصدير بيانات {exported_count} عضو إلى {file_path}", type="success", title="تصدير")
 
-            if os.path.exists(primary_path):
-                try:
-                    shutil.copy2(primary_path, bak_path) 
-                    logger.debug(f"تم إنشاء نسخة احتياطية من {primary_path} إلى {bak_path}")
-                except Exception as e_bak:
-                    logger.error(f"فشل في إنشاء نسخة احتياطية لملف بيانات الأعضاء {primary_path}: {e_bak}")
+    def save_members_data(self):
+        # الحفظ الفعلي مؤجل ومدمج عبر خدمة الحفظ (كتابة واحدة كل بضع ثوانٍ أو عند الإغلاق)
+        self.persistence_service.request_save()
 
-            os.replace(tmp_path, primary_path) 
-            logger.info(f"تم حفظ بيانات الأعضاء بنجاح في {primary_path}")
+    def _handle_members_save_failed(self, error_message):
+        self.update_status_bar_message(f"خطأ عند حفظ البيانات: {error_message}", is_general_message=True)
+        self._show_toast(f"فشل حفظ بيانات الأعضاء: {error_message}", type="error", title="خطأ حفظ")
 
-        except Exception as e:
-            logger.exception(f"خطأ عند حفظ بيانات الأعضاء في {primary_path}: {e}")
-            self.update_status_bar_message(f"خطأ عند حفظ البيانات: {e}", is_general_message=True)
-            self._show_toast(f"فشل حفظ بيانات الأعضاء: {e}", type="error", title="خطأ حفظ")
-            if os.path.exists(tmp_path): 
-                try:
-                    os.remove(tmp_path)
-                except Exception as e_del_tmp:
-                    logger.error(f"فشل في حذف الملف المؤقت لبيانات الأعضاء {tmp_path} بعد خطأ في الحفظ: {e_del_tmp}")
 
+    def changeEvent(self, event):
+        if event.type() in (QEvent.StyleChange, QEvent.ThemeChange) and hasattr(self, 'members_model'):
+            # أيقونات QStyle القياسية تتغير مع النمط/السمة: نعيد بناءها عند الحاجة
+            self.members_model.invalidate_icons()
+        super().changeEvent(event)
 
     def closeEvent(self, event):
         logger.info("إغلاق التطبيق...")
@@ -2172,28 +2010,16 @@ class AnemApp(QMainWindow):
             if not self.monitoring_thread.wait(3000): 
                 logger.warning("خيط المراقبة لم ينتهِ في الوقت المناسب.")
 
-        self.save_members_data()
-        self.save_app_settings()
+        # المهام أولاً: لا تعدّل الأعضاء بعد اللقطة الأخيرة ولا تصل إلى تخزين مغلق
+        logger.info(f"إحصائيات مجمع المهام: {self.member_jobs.stats()}")
+        if not self.member_jobs.shutdown(timeout=2): 
+            logger.warning("بعض مهام الأعضاء لم تنتهِ في الوقت المناسب عند الإغلاق.")
 
-        for thread in self.initial_fetch_threads:
-            if thread.isRunning():
-                thread.quit() 
-                if not thread.wait(2000): 
-                    logger.warning(f"الخيط {thread} لم ينتهِ في الوقت المناسب عند الإغلاق.")
-
-        if self.single_check_thread and self.single_check_thread.isRunning():
-            self.single_check_thread.quit()
-            if not self.single_check_thread.wait(1000): 
-                 logger.warning("خيط الفحص الفردي لم ينته في الوقت المناسب.")
-
-        active_pdf_dl_threads_copy = list(self.active_download_all_pdfs_threads.values()) 
-        if active_pdf_dl_threads_copy:
-            for pdf_thread in active_pdf_dl_threads_copy:
-                if pdf_thread.isRunning():
-                    pdf_thread.stop() 
-                    if not pdf_thread.wait(2000): 
-                        logger.warning(f"خيط تحميل جميع ملفات PDF {pdf_thread} لم ينتهِ في الوقت المناسب.")
-            self.active_download_all_pdfs_threads.clear() 
+        self.persistence_service.flush()
+        self.member_journal.close()
+        self.member_storage.close()
+        logger.info(f"إحصائيات حفظ بيانات الأعضاء: {self.persistence_service.stats()}")
+        self.save_app_settings()
 
         if hasattr(self, 'datetime_timer') and self.datetime_timer.isActive(): self.datetime_timer.stop()
         if hasattr(self, 'row_spinner_timer') and self.row_spinner_timer.isActive(): self.row_spinner_timer.stop()
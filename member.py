@@ -1,7 +1,52 @@
 # member.py
+from operator import attrgetter
+
 from config import MAX_ERROR_DISPLAY_LENGTH
+from member_status import MemberStatus
+
+# جدول الحقول المحفوظة: (الاسم، القيمة الافتراضية عند غيابها من البيانات القديمة).
+# الترتيب ثابت ويحدد ترتيب القيم في to_tuple/from_tuple وترتيب المفاتيح في to_dict.
+MEMBER_FIELDS = (
+    ('nin', None),
+    ('wassit_no', None),
+    ('ccp', None),
+    ('phone_number', ""),
+    ('nom_fr', ""),
+    ('prenom_fr', ""),
+    ('nom_ar', ""),
+    ('prenom_ar', ""),
+    ('pre_inscription_id', None),
+    ('demandeur_id', None),
+    ('structure_id', None),
+    ('status', MemberStatus.NEW),
+    ('last_activity_detail', ""),
+    ('full_last_activity_detail', ""),
+    ('rdv_date', None),
+    ('rdv_id', None),
+    ('rdv_source', None),
+    ('pdf_honneur_path', None),
+    ('pdf_rdv_path', None),
+    ('has_actual_pre_inscription', False),
+    ('already_has_rdv', False),
+    ('consecutive_failures', 0),
+    ('have_allocation', False),
+    ('allocation_details', None), # القيمة الافتراضية الفعلية {} (جديد لكل عضو)
+)
+MEMBER_FIELD_NAMES = tuple(name for name, _ in MEMBER_FIELDS)
+MEMBER_FIELD_INDEX = {name: idx for idx, name in enumerate(MEMBER_FIELD_NAMES)}
+_get_member_fields = attrgetter(*MEMBER_FIELD_NAMES)
+_OPTIONAL_FIELD_DEFAULTS = tuple(
+    (name, default) for name, default in MEMBER_FIELDS
+    if name not in ('nin', 'wassit_no', 'ccp', 'full_last_activity_detail', 'last_activity_detail', 'allocation_details')
+)
+
 
 class Member:
+    # status خاصية (property) تحول النصوص المخزنة إلى MemberStatus، وقيمتها في _status
+    __slots__ = tuple('_status' if name == 'status' else name for name in MEMBER_FIELD_NAMES) + ('is_processing', 'member_id')
+
+    journal = None # MemberJournal مشترك يُسند عند بدء التطبيق (انظر set_activity_detail)
+
     def __init__(self, nin, wassit_no, ccp, phone_number=""):
         self.nin = nin
         self.wassit_no = wassit_no
@@ -14,7 +59,7 @@ class Member:
         self.pre_inscription_id = None
         self.demandeur_id = None
         self.structure_id = None
-        self.status = "جديد"  # Default status for a new member
+        self.status = MemberStatus.NEW  # Default status for a new member
         self.last_activity_detail = "" 
         self.full_last_activity_detail = "" 
         self.rdv_date = None
@@ -30,49 +75,52 @@ class Member:
         self.have_allocation = False 
         self.allocation_details = {} 
 
+        self.member_id = None # معرف ثابت أثناء التشغيل يُسند من MemberRegistry (لا يُحفظ)
+
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        # النصوص (ملفات قديمة، السجل، الإشارات) تُحوَّل مرة واحدة عند الإسناد
+        self._status = value if value.__class__ is MemberStatus else MemberStatus.from_text(value)
 
     def get_full_name_ar(self):
         return f"{self.nom_ar or ''} {self.prenom_ar or ''}".strip()
 
+    def to_tuple(self):
+        """Persisted fields as a tuple, in MEMBER_FIELD_NAMES order."""
+        return _get_member_fields(self)
+
+    @classmethod
+    def from_tuple(cls, values):
+        """Inverse of to_tuple (values must follow MEMBER_FIELD_NAMES order)."""
+        member = cls.__new__(cls)
+        for set_field, value in zip(_FIELD_SETTERS, values):
+            set_field(member, value)
+        if member.allocation_details is None:
+            member.allocation_details = {}
+        member.is_processing = False
+        member.member_id = None
+        return member
+
     def to_dict(self):
-        return {
-            'nin': self.nin,
-            'wassit_no': self.wassit_no,
-            'ccp': self.ccp,
-            'phone_number': self.phone_number,
-            'nom_fr': self.nom_fr,
-            'prenom_fr': self.prenom_fr,
-            'nom_ar': self.nom_ar,
-            'prenom_ar': self.prenom_ar,
-            'pre_inscription_id': self.pre_inscription_id,
-            'demandeur_id': self.demandeur_id,
-            'structure_id': self.structure_id,
-            'status': self.status,
-            'last_activity_detail': self.last_activity_detail,
-            'full_last_activity_detail': self.full_last_activity_detail,
-            'rdv_date': self.rdv_date,
-            'rdv_id': self.rdv_id,
-            'rdv_source': self.rdv_source, 
-            'pdf_honneur_path': self.pdf_honneur_path,
-            'pdf_rdv_path': self.pdf_rdv_path,
-            'has_actual_pre_inscription': self.has_actual_pre_inscription,
-            'already_has_rdv': self.already_has_rdv,
-            'consecutive_failures': self.consecutive_failures,
-            'have_allocation': self.have_allocation, 
-            'allocation_details': self.allocation_details 
-        }
+        return dict(zip(MEMBER_FIELD_NAMES, _get_member_fields(self)))
 
     @classmethod
     def from_dict(cls, data):
-        member = cls(data['nin'], data['wassit_no'], data['ccp'], data.get('phone_number', ""))
-        member.nom_fr = data.get('nom_fr', "")
-        member.prenom_fr = data.get('prenom_fr', "")
-        member.nom_ar = data.get('nom_ar', "")
-        member.prenom_ar = data.get('prenom_ar', "")
-        member.pre_inscription_id = data.get('pre_inscription_id')
-        member.demandeur_id = data.get('demandeur_id')
-        member.structure_id = data.get('structure_id')
-        member.status = data.get('status', "جديد")
+        """Builds a member from a dict, including dicts written by older versions (missing keys get defaults)."""
+        member = cls.__new__(cls)
+        member.nin = data['nin']
+        member.wassit_no = data['wassit_no']
+        member.ccp = data['ccp']
+        get_value = data.get
+        for set_field, name, default in _OPTIONAL_FIELD_SETTERS:
+            set_field(member, get_value(name, default))
+        if member.phone_number is None:
+            member.phone_number = ""
         member.full_last_activity_detail = data.get('full_last_activity_detail', data.get('last_activity_detail', "")) 
         member.last_activity_detail = data.get('last_activity_detail', "")
         if not member.last_activity_detail and member.full_last_activity_detail:
@@ -81,22 +129,13 @@ class Member:
             else:
                 member.last_activity_detail = member.full_last_activity_detail
         
-        member.rdv_date = data.get('rdv_date')
-        member.rdv_id = data.get('rdv_id')
-        
         # Logic for rdv_source during loading
-        member.rdv_source = data.get('rdv_source') 
         if member.rdv_date and member.rdv_source is None: # If date exists but source wasn't in JSON
             member.rdv_source = "discovered"
 
-        member.pdf_honneur_path = data.get('pdf_honneur_path')
-        member.pdf_rdv_path = data.get('pdf_rdv_path')
-        member.has_actual_pre_inscription = data.get('has_actual_pre_inscription', False)
-        member.already_has_rdv = data.get('already_has_rdv', False)
-        member.consecutive_failures = data.get('consecutive_failures', 0)
-        member.is_processing = False 
-        member.have_allocation = data.get('have_allocation', False)
         member.allocation_details = data.get('allocation_details', {})
+        member.is_processing = False 
+        member.member_id = None
         return member
 
     def set_activity_detail(self, detail_message, is_error=False):
@@ -128,3 +167,11 @@ class Member:
                      self.last_activity_detail = self.full_last_activity_detail
         else:
             self.last_activity_detail = self.full_last_activity_detail
+
+        if Member.journal is not None:
+            Member.journal.record_member(self) # يسجل الحقول التي تغيرت فقط (الحالة والتفاصيل وغيرها)
+
+
+# واصفات الـ slots مباشرة (أسرع من setattr بالاسم) لبناء الأعضاء من البيانات المحفوظة
+_FIELD_SETTERS = tuple(getattr(Member, name).__set__ for name in MEMBER_FIELD_NAMES)
+_OPTIONAL_FIELD_SETTERS = tuple((getattr(Member, name).__set__, name, default) for name, default in _OPTIONAL_FIELD_DEFAULTS)
@@ -0,0 +1,206 @@
+# member_journal.py
+import json
+import os
+import time
+import threading
+import logging
+
+from config import MEMBERS_JOURNAL_FILE
+from member import Member, MEMBER_FIELD_NAMES
+
+logger = logging.getLogger(__name__)
+
+_ALLOCATION_DETAILS_POS = MEMBER_FIELD_NAMES.index('allocation_details')
+_NIN_POS = MEMBER_FIELD_NAMES.index('nin')
+
+
+class MemberJournal:
+    """
+    Append-only journal (one JSON object per line) of per-member field changes.
+    Each record holds only the fields that changed since the member's previous
+    record, keyed by the NIN the member had at that previous record (a NIN edit is
+    itself a changed field). A member's first record holds every field ("full"), so
+    replay can re-create a member added after the snapshot; a removal is a "deleted"
+    record. The journal is replayed over the last snapshot on load and folded back
+    into the snapshot by the persistence service (compaction).
+    """
+
+    def __init__(self, journal_path=MEMBERS_JOURNAL_FILE):
+        self.journal_path = journal_path
+        self.compacting_path = journal_path + ".compacting"
+        self._lock = threading.Lock()
+        self._file = None
+        self._closed = False
+        self._last_state_by_member = {} # مفتاحه العضو نفسه: رقم التعريف قابل للتعديل
+        self._removed_members = set() # أعضاء محذوفون: مهمة ما زالت تعمل عليهم لا تعيدهم بسجل كامل
+        self.records_written = 0
+
+    @staticmethod
+    def _member_state(member):
+        state = list(member.to_tuple())
+        state[_ALLOCATION_DETAILS_POS] = dict(state[_ALLOCATION_DETAILS_POS] or {}) # نسخة حتى لا يتأثر الأساس بالتعديل في المكان
+        return state
+
+    def _append_record(self, record, nin):
+        """Writes one record line. Caller holds the lock."""
+        if self._closed:
+            # بعد الإغلاق (اللقطة الأخيرة كُتبت): مهمة لم تنتهِ في الوقت لا تعيد فتح الملف
+            logger.debug(f"تجاهل سجل للعضو {nin}: ملف السجل مغلق.")
+            return False
+        line = json.dumps(record, ensure_ascii=False)
+        try:
+            journal_file = self._open_for_append()
+            journal_file.write(line + "\n")
+            journal_file.flush()
+            self.records_written += 1
+            return True
+        except Exception as e:
+            logger.error(f"فشل في إضافة سجل للعضو {nin} إلى ملف السجل {self.journal_path}: {e}")
+            self._close_file()
+            return False
+
+    def _open_for_append(self):
+        if self._file is None or self._file.closed:
+            needs_newline = False
+            if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > 0:
+                with open(self.journal_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b"\n" # آخر سجل كُتب جزئيًا: لا نلصق السجل الجديد به
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+            if needs_newline:
+                self._file.write("\n")
+        return self._file
+
+    def _close_file(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        self._file = None
+
+    def reset_baseline(self, members):
+        """Current values of every member, used to compute the deltas of the next records."""
+        with self._lock:
+            self._last_state_by_member = {member: self._member_state(member) for member in members}
+            self._removed_members = set()
+
+    def record_member(self, member):
+        """Appends the fields of member that changed since its last record (nothing once it was removed). Safe to call from worker threads."""
+        state = self._member_state(member)
+        with self._lock:
+            if member in self._removed_members:
+                return False
+            previous_state = self._last_state_by_member.get(member)
+            if previous_state is None:
+                record = {"nin": member.nin, "ts": round(time.time(), 3), "full": True, "fields": dict(zip(MEMBER_FIELD_NAMES, state))}
+            else:
+                delta = {MEMBER_FIELD_NAMES[pos]: value for pos, value in enumerate(state) if previous_state[pos] != value}
+                if not delta:
+                    return False
+                # الاستعادة تعرف العضو برقمه السابق، والرقم الجديد (إن عُدّل) ضمن الحقول
+                record = {"nin": previous_state[_NIN_POS], "ts": round(time.time(), 3), "fields": delta}
+            self._last_state_by_member[member] = state
+            return self._append_record(record, member.nin)
+
+    def record_removal(self, member):
+        """Appends a "deleted" record for a removed member; later changes of that member are not journaled."""
+        with self._lock:
+            self._removed_members.add(member)
+            previous_state = self._last_state_by_member.pop(member, None)
+            nin = previous_state[_NIN_POS] if previous_state is not None else member.nin
+            return self._append_record({"nin": nin, "ts": round(time.time(), 3), "deleted": True}, nin)
+
+    def replay(self, members):
+        """
+        Applies the journal records (oldest first) to members, in place: members may be
+        removed ("deleted") or appended ("full" record of an unknown NIN). Returns the
+        number of records applied.
+        """
+        members_by_nin = {member.nin: member for member in members}
+        applied_count = 0
+        for path in (self.compacting_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line_number, line in enumerate(f, 1):
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            # غالبًا آخر سجل كُتب جزئيًا قبل انقطاع البرنامج
+                            logger.warning(f"تجاهل سطر تالف رقم {line_number} في ملف السجل {path}.")
+                            continue
+                        nin = record.get("nin")
+                        fields = record.get("fields") or {}
+                        member = members_by_nin.get(nin)
+                        if record.get("deleted"):
+                            if member is not None:
+                                del members_by_nin[nin]
+                                members.remove(member)
+                                applied_count += 1
+                            continue
+                        if member is None:
+                            if not record.get("full"):
+                                continue
+                            # عضو أضيف بعد آخر لقطة
+                            member = Member.from_dict(fields)
+                            members.append(member)
+                        else:
+                            for field_name, value in fields.items():
+                                if hasattr(member, field_name):
+                                    setattr(member, field_name, value)
+                            if member.nin != nin:
+                                del members_by_nin[nin]
+                        members_by_nin[member.nin] = member
+                        applied_count += 1
+            except Exception as e:
+                logger.exception(f"خطأ عند إعادة تطبيق ملف السجل {path}: {e}")
+        return applied_count
+
+    def size_bytes(self):
+        total_size = 0
+        for path in (self.compacting_path, self.journal_path):
+            try:
+                total_size += os.path.getsize(path)
+            except OSError:
+                pass
+        return total_size
+
+    def has_pending_records(self):
+        return self.size_bytes() > 0
+
+    def begin_compaction(self):
+        """
+        Moves the current journal aside (to .compacting) just before a snapshot is taken.
+        Records written from now on go to a fresh journal.
+        """
+        with self._lock:
+            self._close_file()
+            if not os.path.exists(self.journal_path):
+                return
+            try:
+                if os.path.exists(self.compacting_path):
+                    # دمج سابق لم يكتمل: نلحق السجل الحالي به للحفاظ على الترتيب
+                    with open(self.journal_path, 'r', encoding='utf-8') as src, open(self.compacting_path, 'a', encoding='utf-8') as dst:
+                        dst.write(src.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.compacting_path)
+            except Exception as e:
+                logger.error(f"فشل في تدوير ملف السجل {self.journal_path} قبل الدمج: {e}")
+
+    def finish_compaction(self):
+        """Drops the journal part already folded into the snapshot that was just written."""
+        with self._lock:
+            if os.path.exists(self.compacting_path):
+                try:
+                    os.remove(self.compacting_path)
+                except Exception as e:
+                    logger.error(f"فشل في حذف ملف السجل المدمج {self.compacting_path}: {e}")
+
+    def close(self):
+        """Closes the journal for good: records appended afterwards are dropped."""
+        with self._lock:
+            self._closed = True
+            self._close_file()
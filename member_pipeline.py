@@ -0,0 +1,120 @@
+# member_pipeline.py
+import time
+import logging
+
+from member_status import MemberStatus
+
+logger = logging.getLogger(__name__)
+
+STAGE_VALIDATION = "validation"
+STAGE_PRE_INSCRIPTION_INFO = "pre_inscription_info"
+STAGE_DATES_AND_BOOKING = "dates_and_booking"
+STAGE_PDF_DOWNLOAD = "pdf_download"
+
+
+def can_attempt_booking(member):
+    return bool(member.status.bookable and
+                member.has_actual_pre_inscription and member.pre_inscription_id and
+                member.demandeur_id and member.structure_id and
+                not member.already_has_rdv and not member.have_allocation)
+
+
+class MemberCheckResult:
+    """What one pass of the pipeline did to a member: the stages run, in order, and their outcome."""
+
+    def __init__(self):
+        self.stages = [] # (stage, success, api_error, seconds)
+        self.api_error = False
+        self.interrupted = False
+
+    def record(self, stage, success, api_error, seconds):
+        self.stages.append((stage, success, api_error, seconds))
+        if api_error:
+            self.api_error = True
+
+    def ran(self, stage):
+        return any(recorded[0] == stage for recorded in self.stages)
+
+    def __repr__(self):
+        stages = ", ".join(f"{stage}={'ok' if success else 'fail'}{'/api' if api_error else ''}" for stage, success, api_error, _ in self.stages)
+        return f"MemberCheckResult([{stages}], api_error={self.api_error}, interrupted={self.interrupted})"
+
+
+class MemberPipeline:
+    """
+    The per-member check shared by the monitoring pass and the instant check:
+    validate -> fetch the name -> available dates / booking -> PDF download.
+    The stages themselves are the process_* methods of `stages` (each returns
+    (success, api_error) and updates the member and the GUI); the pipeline only decides
+    which of them run. `is_running` is polled between stages. Unexpected exceptions are
+    left to the caller, which owns the member's error status.
+
+    pdf_only_shortcut: members in a PDF-only state skip validation (monitoring).
+    stop_states_skip_pdf: a state that stops after validation also skips the PDFs (instant check).
+    pdf_for_beneficiary: current beneficiaries get their PDFs as well (instant check).
+    """
+
+    def __init__(self, stages, is_running, pdf_only_shortcut=True, stop_states_skip_pdf=False, pdf_for_beneficiary=False):
+        self.stages = stages
+        self.is_running = is_running
+        self.pdf_only_shortcut = pdf_only_shortcut
+        self.stop_states_skip_pdf = stop_states_skip_pdf
+        self.pdf_for_beneficiary = pdf_for_beneficiary
+        self._stage_stats = {}
+
+    def _run_stage(self, result, stage, process, main_list_idx, member):
+        start = time.perf_counter()
+        success, api_error = process(main_list_idx, member)
+        seconds = time.perf_counter() - start
+        result.record(stage, success, api_error, seconds)
+        stage_stats = self._stage_stats.setdefault(stage, [0, 0, 0.0])
+        stage_stats[0] += 1
+        stage_stats[1] += 1 if api_error else 0
+        stage_stats[2] += seconds
+        return success
+
+    def _interrupted(self, result):
+        if not self.is_running():
+            result.interrupted = True
+        return result.interrupted
+
+    def run(self, main_list_idx, member, log_prefix=""):
+        result = MemberCheckResult()
+        if self._interrupted(result): return result
+
+        if self.pdf_only_shortcut and member.status.pdf_only:
+            logger.info(f"{log_prefix}: العضو {member.nin} ({member.status})، فحص PDF فقط.")
+            if member.pre_inscription_id:
+                self._run_stage(result, STAGE_PDF_DOWNLOAD, self.stages.process_pdf_download, main_list_idx, member)
+            else:
+                member.set_activity_detail(f"{log_prefix}: لا يمكن تحميل PDF، ID التسجيل مفقود.", is_error=True)
+        else:
+            validation_success = self._run_stage(result, STAGE_VALIDATION, self.stages.process_validation, main_list_idx, member)
+            if self._interrupted(result): return result
+
+            if member.status.stops_after_validation:
+                logger.info(f"{log_prefix}: الحالة بعد التحقق تمنع المتابعة: {member.status}")
+                if self.stop_states_skip_pdf:
+                    return result
+            elif validation_success:
+                if member.pre_inscription_id and not (member.nom_ar and member.prenom_ar):
+                    self._run_stage(result, STAGE_PRE_INSCRIPTION_INFO, self.stages.process_pre_inscription_info, main_list_idx, member)
+                    if self._interrupted(result): return result
+
+                if can_attempt_booking(member):
+                    self._run_stage(result, STAGE_DATES_AND_BOOKING, self.stages.process_available_dates_and_book, main_list_idx, member)
+                    if self._interrupted(result): return result
+
+        wants_pdf = member.status.pdf_eligible or (self.pdf_for_beneficiary and member.status is MemberStatus.BENEFICIARY)
+        if wants_pdf and member.pre_inscription_id and not result.ran(STAGE_PDF_DOWNLOAD):
+            if self._interrupted(result): return result
+            logger.info(f"{log_prefix}: العضو {member.nin} ({member.status}) يستدعي محاولة تحميل PDF.")
+            self._run_stage(result, STAGE_PDF_DOWNLOAD, self.stages.process_pdf_download, main_list_idx, member)
+        return result
+
+    def stage_stats(self):
+        """Per stage: runs, runs with an API error and average seconds."""
+        return {
+            stage: {"runs": runs, "api_errors": api_errors, "avg_seconds": round(seconds / runs, 3)}
+            for stage, (runs, api_errors, seconds) in self._stage_stats.items()
+        }
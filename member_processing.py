@@ -0,0 +1,602 @@
+# member_processing.py
+import os
+import json
+import logging
+from PyQt5.QtCore import QStandardPaths
+
+from member_status import MemberStatus
+from pdf_download import PdfStreamError
+from utils import get_icon_name_for_status
+
+logger = logging.getLogger(__name__)
+
+def _translate_api_error(error_string, operation_name="العملية"):
+    if not error_string:
+        return f"حدث خطأ غير محدد أثناء {operation_name}."
+
+    error_lower = str(error_string).lower()
+
+    if "timeout" in error_lower or "timed out" in error_lower:
+        if "connect" in error_lower:
+            return f"انتهت مهلة الاتصال بالخادم أثناء {operation_name}. يرجى التحقق من اتصالك بالإنترنت."
+        else:
+            return f"انتهت مهلة الاستجابة من الخادم أثناء {operation_name}. قد يكون الخادم بطيئًا أو هناك مشكلة في الشبكة."
+    elif "connectionerror" in error_lower or "could not connect" in error_lower or "failed to establish a new connection" in error_lower:
+        return f"فشل الاتصال بالخادم أثناء {operation_name}. يرجى التحقق من اتصالك بالإنترنت وحالة الخادم."
+    elif "sslerror" in error_lower or "certificate_verify_failed" in error_lower:
+        return f"حدث خطأ في شهادة الأمان (SSL) أثناء {operation_name}. قد يكون الاتصال غير آمن."
+    elif "429" in error_lower or "طلبات كثيرة جدًا" in error_lower:
+        return f"الخادم مشغول حاليًا (طلبات كثيرة جدًا) أثناء {operation_name}. يرجى المحاولة لاحقًا."
+    elif "404" in error_lower or "not found" in error_lower:
+        return f"تعذر العثور على المورد المطلوب على الخادم (404) أثناء {operation_name}."
+    elif "500" in error_lower or "internal server error" in error_lower:
+        return f"حدث خطأ داخلي في الخادم (500) أثناء {operation_name}. يرجى المحاولة لاحقًا."
+    elif "jsondecodeerror" in error_lower or "خطأ في تحليل البيانات" in error_lower:
+        return f"تم استلام استجابة غير صالحة (ليست JSON) من الخادم أثناء {operation_name}."
+    elif "eligible:false" in error_lower or "نعتذر منكم" in error_string: 
+        if "نعتذر منكم! لا يمكنكم حجز موعد" in error_string:
+            return error_string
+        if operation_name == "حجز الموعد" and "\"Eligible\":false" in error_string and "\"serviceUp\":true" in error_string :
+             return "نعتذر منكم! لا يمكنكم حجز موعد للاستفادة من منحة البطالة لعدم استيفائك لأحد شروط الأهلية اللازمة."
+        return f"المستخدم غير مؤهل لـ {operation_name} حسب شروط المنصة."
+    
+    max_len = 70
+    snippet = error_string[:max_len] + "..." if len(error_string) > max_len else error_string
+    return f"فشل في {operation_name}: {snippet}"
+
+
+def get_member_display_name(member_obj, original_index_in_main_list):
+    name_part = member_obj.get_full_name_ar()
+    if not name_part or name_part.isspace():
+        name_part = member_obj.nin 
+    return f"{name_part} (رقم {original_index_in_main_list + 1})"
+
+
+def _apply_candidate_data(member_obj, data):
+    """Copies the validateCandidate fields of a non-beneficiary onto the member."""
+    member_obj.has_actual_pre_inscription = data.get("havePreInscription", False)
+    member_obj.already_has_rdv = data.get("haveRendezVous", False)
+    member_obj.pre_inscription_id = data.get("preInscriptionId")
+    member_obj.demandeur_id = data.get("demandeurId")
+    member_obj.structure_id = data.get("structureId")
+    member_obj.rdv_id = data.get("rendezVousId") 
+    if member_obj.already_has_rdv and member_obj.rdv_source != "system": # Don't overwrite if system booked it
+        member_obj.rdv_source = "discovered"
+
+
+def _invalid_input_message(data):
+    for control in data.get("controls", []):
+        if control.get("result") is False and control.get("name") == "matchIdentity" and control.get("message"):
+            return control.get("message")
+    return "البيانات المدخلة غير متطابقة أو غير صالحة."
+
+
+def _apply_pre_inscription_names(member_obj, data):
+    member_obj.nom_ar = data.get("nomDemandeurAr", "")
+    member_obj.prenom_ar = data.get("prenomDemandeurAr", "")
+    member_obj.nom_fr = data.get("nomDemandeurFr", "")
+    member_obj.prenom_fr = data.get("prenomDemandeurFr", "")
+
+
+class MemberProcessingService:
+    """
+    The member processing stages (initial fetch, validation, name fetch, dates/booking,
+    PDF download) shared by FetchInitialInfoJob, SingleMemberCheckJob and
+    MonitoringThread. The service keeps no state of its own: every stage works on the
+    member it is given and reports through its owner job or thread (owner.api_client,
+    owner.is_running and the owner's update_member_gui_signal, new_data_fetched_signal
+    and global_log_signal, all read at call time). Creating one is a single attribute
+    assignment, so each owner simply holds its own.
+    """
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def _emit_global_log(self, message, is_general=True, member_obj=None, member_idx=-1):
+        self.owner.global_log_signal.emit(message, is_general, member_obj, member_idx)
+
+    def fetch_initial_info(self, main_list_idx, member_obj):
+        """First validation and name fetch of a newly added member (INITIAL_* statuses)."""
+        data_val, error_val = self.owner.api_client.validate_candidate(member_obj.wassit_no, member_obj.nin)
+
+        if not self.owner.is_running: return 
+
+        if error_val:
+            member_obj.status = MemberStatus.INITIAL_VALIDATION_FAILED
+            user_friendly_error = _translate_api_error(error_val, "التحقق من بيانات التسجيل")
+            member_obj.set_activity_detail(user_friendly_error, is_error=True)
+            self._emit_global_log(f"فشل التحقق الأولي: {user_friendly_error}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        elif data_val:
+            member_obj.have_allocation = data_val.get("haveAllocation", False)
+            member_obj.allocation_details = data_val.get("detailsAllocation", {})
+                
+            if member_obj.have_allocation and member_obj.allocation_details:
+                member_obj.status = MemberStatus.BENEFICIARY
+                nom_ar = member_obj.allocation_details.get("nomAr", "")
+                prenom_ar = member_obj.allocation_details.get("prenomAr", "")
+                nom_fr = member_obj.allocation_details.get("nomFr", "")
+                prenom_fr = member_obj.allocation_details.get("prenomFr", "")
+                date_debut = member_obj.allocation_details.get("dateDebut", "غير محدد")
+                if date_debut and "T" in date_debut: date_debut = date_debut.split("T")[0] 
+
+                member_obj.nom_ar = nom_ar
+                member_obj.prenom_ar = prenom_ar
+                member_obj.nom_fr = nom_fr
+                member_obj.prenom_fr = prenom_fr
+                self.owner.new_data_fetched_signal.emit(main_list_idx, nom_ar, prenom_ar)
+                activity_detail_text = f"مستفيد حاليًا. تاريخ بدء الاستفادة: {date_debut}."
+                member_obj.set_activity_detail(activity_detail_text)
+                self._emit_global_log(f"مستفيد حاليًا.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                logger.info(f"العضو {member_obj.nin} ( {member_obj.get_full_name_ar()} ) مستفيد حاليًا من المنحة، تاريخ البدء: {date_debut}.")
+            else:
+                is_eligible_from_validate = data_val.get("eligible", False)
+                _apply_candidate_data(member_obj, data_val)
+
+                if not data_val.get("validInput", True):
+                    error_msg_from_controls = _invalid_input_message(data_val)
+                    member_obj.status = MemberStatus.INVALID_INPUT
+                    member_obj.set_activity_detail(error_msg_from_controls, is_error=True)
+                    self._emit_global_log(f"خطأ في بيانات الإدخال: {error_msg_from_controls}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                    logger.warning(f"خطأ في بيانات الإدخال للعضو {member_obj.nin}: {error_msg_from_controls}")
+                elif member_obj.already_has_rdv:
+                    member_obj.status = MemberStatus.HAS_PRIOR_RDV
+                    activity_msg = f"لديه موعد محجوز بالفعل (ID: {member_obj.rdv_id or 'N/A'})."
+                    if member_obj.pre_inscription_id and not (member_obj.nom_ar and member_obj.prenom_ar):
+                        if not self.owner.is_running: return
+                        data_info, error_info = self.owner.api_client.get_pre_inscription_info(member_obj.pre_inscription_id)
+                        if not self.owner.is_running: return
+                        if data_info:
+                            _apply_pre_inscription_names(member_obj, data_info)
+                            self.owner.new_data_fetched_signal.emit(main_list_idx, member_obj.nom_ar, member_obj.prenom_ar)
+                            activity_msg += f" الاسم: {member_obj.get_full_name_ar()}"
+                            self._emit_global_log(f"تم جلب اسم العضو الذي لديه موعد.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                            logger.info(f"تم جلب الاسم واللقب للعضو {member_obj.nin} الذي لديه موعد مسبق.")
+                        elif error_info:
+                            user_friendly_error_info = _translate_api_error(error_info, "جلب معلومات التسجيل")
+                            activity_msg += f" فشل جلب الاسم: {user_friendly_error_info}"
+                            self._emit_global_log(f"فشل جلب اسم العضو: {user_friendly_error_info}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                    member_obj.set_activity_detail(activity_msg)
+                elif is_eligible_from_validate:
+                    initial_status_text = ""
+                    if member_obj.has_actual_pre_inscription:
+                        member_obj.status = MemberStatus.VALIDATED
+                        initial_status_text = "مؤهل ولديه تسجيل مسبق."
+                    else:
+                        member_obj.status = MemberStatus.PRE_INSCRIPTION_REQUIRED
+                        initial_status_text = "مؤهل ولكن لا يوجد تسجيل مسبق بعد."
+                    member_obj.set_activity_detail(initial_status_text + " جاري جلب الاسم...")
+                        
+                    if member_obj.pre_inscription_id and not (member_obj.nom_ar and member_obj.prenom_ar):
+                        if not self.owner.is_running: return
+                        data_info, error_info = self.owner.api_client.get_pre_inscription_info(member_obj.pre_inscription_id)
+                        if not self.owner.is_running: return
+                        if error_info:
+                            member_obj.status = MemberStatus.INFO_FETCH_FAILED if member_obj.status is not MemberStatus.PRE_INSCRIPTION_REQUIRED else member_obj.status
+                            user_friendly_error_info = _translate_api_error(error_info, "جلب الاسم")
+                            member_obj.set_activity_detail(f"{initial_status_text} فشل جلب الاسم: {user_friendly_error_info}".strip(), is_error=True)
+                            self._emit_global_log(f"فشل جلب اسم العضو: {user_friendly_error_info}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                        elif data_info:
+                            _apply_pre_inscription_names(member_obj, data_info)
+                            self.owner.new_data_fetched_signal.emit(main_list_idx, member_obj.nom_ar, member_obj.prenom_ar)
+                            member_obj.status = MemberStatus.INFO_FETCHED 
+                            final_activity_text = f"تم جلب الاسم: {member_obj.get_full_name_ar()}. {initial_status_text}"
+                            member_obj.set_activity_detail(final_activity_text)
+                            self._emit_global_log(f"تم جلب اسم العضو.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                            logger.info(f"تم جلب الاسم واللقب للعضو {member_obj.nin}: ع ({member_obj.get_full_name_ar()}), ف ({member_obj.nom_fr} {member_obj.prenom_fr})")
+                    elif member_obj.nom_ar and member_obj.prenom_ar: 
+                         member_obj.set_activity_detail(f"{initial_status_text} الاسم: {member_obj.get_full_name_ar()}")
+                    else: 
+                         member_obj.set_activity_detail(initial_status_text)
+
+                else: 
+                    member_obj.status = MemberStatus.INITIALLY_INELIGIBLE
+                    original_api_message = str(data_val.get("message", "المترشح غير مؤهل."))
+                    member_obj.set_activity_detail(original_api_message, is_error=True) 
+                    self._emit_global_log(f"غير مؤهل مبدئيًا: {original_api_message}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                    logger.warning(f"العضو {member_obj.nin} غير مؤهل مبدئيًا: {member_obj.full_last_activity_detail}")
+        else: 
+            member_obj.status = MemberStatus.INITIAL_VALIDATION_FAILED
+            member_obj.set_activity_detail("استجابة فارغة عند التحقق من بيانات التسجيل.", is_error=True)
+            self._emit_global_log(f"فشل التحقق الأولي: استجابة فارغة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+
+    def _update_member_and_emit(self, main_list_idx, member_obj_being_updated, new_status, detail_text, icon_name):
+        member_obj_being_updated.status = new_status # يُسجَّل في السجل مع التفاصيل ضمن set_activity_detail
+        is_error_flag = member_obj_being_updated.status.is_error
+        member_obj_being_updated.set_activity_detail(detail_text, is_error=is_error_flag)
+        member_display_name = get_member_display_name(member_obj_being_updated, main_list_idx)
+        logger.info(f"تحديث حالة العضو {member_display_name}: {new_status} - التفاصيل: {member_obj_being_updated.last_activity_detail}")
+        if self.owner.is_running: 
+            self.owner.update_member_gui_signal.emit(main_list_idx, member_obj_being_updated.status, member_obj_being_updated.last_activity_detail, icon_name)
+
+    def process_validation(self, main_list_idx, member_obj): 
+        if not self.owner.is_running: return False, False
+        operation_name = "التحقق من البيانات (دوري)"
+        member_display_name = get_member_display_name(member_obj, main_list_idx)
+        self._update_member_and_emit(main_list_idx, member_obj, MemberStatus.VALIDATING_CYCLE, f"إعادة التحقق للعضو {member_display_name}", MemberStatus.VALIDATING_CYCLE.icon_name)
+        data, error = self.owner.api_client.validate_candidate(member_obj.wassit_no, member_obj.nin)
+        if not self.owner.is_running: return False, False
+        
+        new_status = member_obj.status 
+        validation_can_progress = False 
+        api_error_occurred = False 
+        detail_text_for_gui = member_obj.last_activity_detail 
+
+        if error:
+            new_status = MemberStatus.VALIDATION_FAILED
+            detail_text_for_gui = _translate_api_error(error, operation_name)
+            api_error_occurred = True
+            self._emit_global_log(f"فشل التحقق الدوري: {detail_text_for_gui}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        elif data:
+            member_obj.have_allocation = data.get("haveAllocation", False)
+            member_obj.allocation_details = data.get("detailsAllocation", {})
+
+            if member_obj.have_allocation and member_obj.allocation_details:
+                new_status = MemberStatus.BENEFICIARY
+                nom_ar = member_obj.allocation_details.get("nomAr", member_obj.nom_ar) 
+                prenom_ar = member_obj.allocation_details.get("prenomAr", member_obj.prenom_ar)
+                nom_fr = member_obj.allocation_details.get("nomFr", member_obj.nom_fr)
+                prenom_fr = member_obj.allocation_details.get("prenomFr", member_obj.prenom_fr)
+                date_debut = member_obj.allocation_details.get("dateDebut", "غير محدد")
+                if date_debut and "T" in date_debut: date_debut = date_debut.split("T")[0]
+
+                if nom_ar != member_obj.nom_ar or prenom_ar != member_obj.prenom_ar: 
+                    member_obj.nom_ar = nom_ar
+                    member_obj.prenom_ar = prenom_ar
+                    member_obj.nom_fr = nom_fr
+                    member_obj.prenom_fr = prenom_fr
+                    if self.owner.is_running: self.owner.new_data_fetched_signal.emit(main_list_idx, nom_ar, prenom_ar) 
+                
+                detail_text_for_gui = f"مستفيد حاليًا. تاريخ بدء الاستفادة: {date_debut}."
+                self._emit_global_log(f"مستفيد حاليًا.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                validation_can_progress = False 
+            else: 
+                _apply_candidate_data(member_obj, data)
+
+                if not data.get("validInput", True):
+                    error_msg_from_controls = _invalid_input_message(data)
+                    new_status = MemberStatus.INVALID_INPUT
+                    detail_text_for_gui = error_msg_from_controls
+                    self._emit_global_log(f"خطأ في بيانات الإدخال (دوري): {error_msg_from_controls}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                elif member_obj.already_has_rdv:
+                    new_status = MemberStatus.HAS_PRIOR_RDV
+                    detail_text_for_gui = f"لديه موعد محجوز بالفعل (ID: {member_obj.rdv_id or 'N/A'})."
+                    self._emit_global_log(f"لديه موعد مسبق.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                    if member_obj.pre_inscription_id and not (member_obj.nom_ar and member_obj.prenom_ar):
+                        validation_can_progress = True 
+                    else:
+                        validation_can_progress = False 
+                elif data.get("eligible", False) and member_obj.has_actual_pre_inscription:
+                    new_status = MemberStatus.VALIDATED 
+                    detail_text_for_gui = "مؤهل ولديه تسجيل مسبق (دورة)."
+                    validation_can_progress = True
+                elif data.get("eligible", False) and not member_obj.has_actual_pre_inscription:
+                    new_status = MemberStatus.PRE_INSCRIPTION_REQUIRED 
+                    detail_text_for_gui = "مؤهل ولكن لا يوجد تسجيل مسبق بعد (بانتظار توفر موعد)."
+                    validation_can_progress = True 
+                elif not data.get("eligible", False): 
+                    new_status = MemberStatus.INELIGIBLE_FOR_BOOKING 
+                    detail_text_for_gui = "نعتذر منكم! لا يمكنكم حجز موعد للاستفادة من منحة البطالة لعدم استيفائك لأحد شروط الأهلية اللازمة."
+                    if isinstance(data, dict) and "message" in data and data["message"]:
+                         detail_text_for_gui = data["message"] 
+                    elif isinstance(data, dict) and data.get("Eligible") is False and data.get("serviceUp") is True: 
+                         detail_text_for_gui = "نعتذر منكم! لا يمكنكم حجز موعد للاستفادة من منحة البطالة لعدم استيفائك لأحد شروط الأهلية اللازمة."
+
+                    self._emit_global_log(f"غير مؤهل للحجز (دوري): {detail_text_for_gui}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                else: 
+                    new_status = MemberStatus.VALIDATION_FAILED 
+                    detail_text_for_gui = "حالة غير معروفة بعد التحقق من البيانات (دوري)."
+                    api_error_occurred = True
+                    self._emit_global_log(f"فشل التحقق الدوري: حالة غير معروفة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        else: 
+            new_status = MemberStatus.VALIDATION_FAILED
+            detail_text_for_gui = "استجابة فارغة من الخادم عند التحقق من البيانات (دوري)."
+            api_error_occurred = True
+            self._emit_global_log(f"فشل التحقق الدوري: استجابة فارغة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        
+        icon = get_icon_name_for_status(new_status) 
+        self._update_member_and_emit(main_list_idx, member_obj, new_status, detail_text_for_gui, icon)
+        return validation_can_progress, api_error_occurred
+
+    def process_pre_inscription_info(self, main_list_idx, member_obj): 
+        if not self.owner.is_running: return False, False
+        operation_name = "جلب معلومات الاسم"
+        member_display_name = get_member_display_name(member_obj, main_list_idx)
+        if not member_obj.pre_inscription_id:
+            detail_text = "ID التسجيل المسبق غير متوفر لجلب الاسم."
+            self._update_member_and_emit(main_list_idx, member_obj, member_obj.status, detail_text, get_icon_name_for_status(member_obj.status))
+            return False, False 
+        
+        self._update_member_and_emit(main_list_idx, member_obj, MemberStatus.FETCHING_NAME, f"محاولة جلب الاسم واللقب للعضو {member_display_name}", MemberStatus.FETCHING_NAME.icon_name)
+        data, error = self.owner.api_client.get_pre_inscription_info(member_obj.pre_inscription_id)
+        if not self.owner.is_running: return False, False
+        
+        new_status = member_obj.status 
+        icon = get_icon_name_for_status(new_status)
+        info_fetched_successfully = False
+        api_error_occurred = False
+        detail_text_for_gui = member_obj.last_activity_detail
+
+        if error:
+            if new_status is MemberStatus.FETCHING_NAME: new_status = MemberStatus.INFO_FETCH_FAILED 
+            detail_text_for_gui = _translate_api_error(error, operation_name)
+            api_error_occurred = True
+            self._emit_global_log(f"فشل جلب اسم العضو: {detail_text_for_gui}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        elif data:
+            _apply_pre_inscription_names(member_obj, data)
+            
+            current_activity = member_obj.last_activity_detail.replace(" جاري جلب الاسم...", "").strip() 
+            
+            if new_status in (MemberStatus.FETCHING_NAME, MemberStatus.VALIDATED): 
+                if member_obj.already_has_rdv: 
+                    new_status = MemberStatus.HAS_PRIOR_RDV 
+                    detail_text_for_gui = f"لديه موعد محجوز بالفعل. الاسم: {member_obj.get_full_name_ar()}"
+                else: 
+                    new_status = MemberStatus.INFO_FETCHED 
+                    detail_text_for_gui = f"تم جلب الاسم: {member_obj.get_full_name_ar()}. {current_activity}"
+            elif member_obj.status is MemberStatus.HAS_PRIOR_RDV: 
+                 detail_text_for_gui = f"لديه موعد محجوز بالفعل. الاسم: {member_obj.get_full_name_ar()}"
+            else: 
+                 new_status = MemberStatus.INFO_FETCHED
+                 detail_text_for_gui = f"تم جلب الاسم: {member_obj.get_full_name_ar()}. {current_activity}"
+            
+            detail_text_for_gui = detail_text_for_gui.strip()
+            if self.owner.is_running: self.owner.new_data_fetched_signal.emit(main_list_idx, member_obj.nom_ar, member_obj.prenom_ar) 
+            self._emit_global_log(f"تم جلب اسم العضو.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+            info_fetched_successfully = True
+        else: 
+            if new_status is MemberStatus.FETCHING_NAME: new_status = MemberStatus.INFO_FETCH_FAILED
+            detail_text_for_gui = "استجابة فارغة عند جلب معلومات الاسم."
+            api_error_occurred = True 
+            self._emit_global_log(f"فشل جلب اسم العضو: استجابة فارغة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        
+        icon = get_icon_name_for_status(new_status)
+        self._update_member_and_emit(main_list_idx, member_obj, new_status, detail_text_for_gui, icon)
+        return info_fetched_successfully, api_error_occurred
+
+
+    def process_available_dates_and_book(self, main_list_idx, member_obj): 
+        if not self.owner.is_running: return False, False
+        operation_name_dates = "البحث عن مواعيد متاحة"
+        operation_name_book = "حجز الموعد"
+        member_display_name = get_member_display_name(member_obj, main_list_idx)
+
+        if not (member_obj.structure_id and member_obj.pre_inscription_id and member_obj.demandeur_id and member_obj.has_actual_pre_inscription):
+            detail_text = "معلومات ناقصة أو التسجيل المسبق غير مؤكد لمحاولة الحجز."
+            self._update_member_and_emit(main_list_idx, member_obj, member_obj.status, detail_text, get_icon_name_for_status(member_obj.status))
+            return False, False 
+        
+        self._update_member_and_emit(main_list_idx, member_obj, MemberStatus.SEARCHING_SLOTS, f"البحث عن مواعيد للعضو {member_display_name}", MemberStatus.SEARCHING_SLOTS.icon_name)
+        self._emit_global_log(f"جاري البحث عن مواعيد...", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        data, error = self.owner.api_client.get_available_dates(member_obj.structure_id, member_obj.pre_inscription_id)
+        if not self.owner.is_running: return False, False
+        
+        new_status = member_obj.status
+        icon = get_icon_name_for_status(new_status)
+        booking_successful = False
+        api_error_occurred_this_stage = False 
+        detail_text_for_gui = member_obj.last_activity_detail
+
+        if error:
+            new_status = MemberStatus.DATES_FETCH_FAILED
+            detail_text_for_gui = _translate_api_error(error, operation_name_dates)
+            api_error_occurred_this_stage = True
+            self._emit_global_log(f"فشل جلب التواريخ: {detail_text_for_gui}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        elif data and "dates" in data:
+            available_dates = data["dates"]
+            if available_dates:
+                selected_date_str = available_dates[0] 
+                try:
+                    day, month, year = selected_date_str.split('/')
+                    formatted_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}" 
+                except ValueError:
+                    new_status = MemberStatus.DATE_FORMAT_ERROR
+                    detail_text_for_gui = f"تنسيق تاريخ غير صالح من الخادم: {selected_date_str}"
+                    api_error_occurred_this_stage = True 
+                    self._emit_global_log(f"خطأ في تنسيق التاريخ من الخادم: {selected_date_str}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                    self._update_member_and_emit(main_list_idx, member_obj, new_status, detail_text_for_gui, get_icon_name_for_status(new_status))
+                    return False, api_error_occurred_this_stage
+                
+                self._update_member_and_emit(main_list_idx, member_obj, MemberStatus.BOOKING, f"محاولة الحجز في {formatted_date}", MemberStatus.BOOKING.icon_name)
+                self._emit_global_log(f"جاري حجز موعد في تاريخ {formatted_date}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                if not (member_obj.ccp and member_obj.nom_fr and member_obj.prenom_fr):
+                    new_status = MemberStatus.BOOKING_FAILED
+                    detail_text_for_gui = "معلومات CCP أو الاسم الفرنسي مفقودة للحجز."
+                    self._emit_global_log(f"فشل حجز الموعد: معلومات ناقصة (CCP أو الاسم الفرنسي).", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                    self._update_member_and_emit(main_list_idx, member_obj, new_status, detail_text_for_gui, get_icon_name_for_status(new_status))
+                    return False, False 
+                
+                if not self.owner.is_running: return False, api_error_occurred_this_stage 
+                book_data, book_error = self.owner.api_client.create_rendezvous(
+                    member_obj.pre_inscription_id, member_obj.ccp, member_obj.nom_fr, member_obj.prenom_fr,
+                    formatted_date, member_obj.demandeur_id
+                )
+                if not self.owner.is_running: return False, api_error_occurred_this_stage 
+
+                if book_error: 
+                    new_status = MemberStatus.BOOKING_FAILED
+                    detail_text_for_gui = _translate_api_error(book_error, operation_name_book)
+                    api_error_occurred_this_stage = True
+                    self._emit_global_log(f"فشل حجز الموعد: {detail_text_for_gui}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                elif book_data: 
+                    if isinstance(book_data, dict) and book_data.get("Eligible") is False and book_data.get("serviceUp") is True:
+                        new_status = MemberStatus.INELIGIBLE_FOR_BOOKING
+                        api_message = book_data.get("message") 
+                        if not api_message or not isinstance(api_message, str) or api_message.strip() == "":
+                             api_message = "نعتذر منكم! لا يمكنكم حجز موعد للاستفادة من منحة البطالة لعدم استيفائك لأحد شروط الأهلية اللازمة."
+                        detail_text_for_gui = api_message
+                        self._emit_global_log(f"غير مؤهل للحجز: {api_message}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                        logger.warning(f"العضو {member_display_name} غير مؤهل للحجز (Eligible:false, serviceUp:true): {book_data}")
+                        api_error_occurred_this_stage = False 
+                    elif isinstance(book_data, dict) and book_data.get("Eligible") is False : 
+                        new_status = MemberStatus.INELIGIBLE_FOR_BOOKING
+                        api_message = book_data.get("message", "نعتذر منكم! لا يمكنكم حجز موعد للاستفادة من منحة البطالة لعدم استيفائك لأحد شروط الأهلية اللازمة.")
+                        detail_text_for_gui = api_message
+                        self._emit_global_log(f"غير مؤهل للحجز: {api_message}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                        logger.warning(f"العضو {member_display_name} غير مؤهل للحجز حسب استجابة الخادم: {book_data}")
+                        api_error_occurred_this_stage = False 
+                    elif isinstance(book_data, dict) and book_data.get("code") == 0 and book_data.get("rendezVousId"): 
+                        member_obj.rdv_id = book_data.get("rendezVousId")
+                        member_obj.rdv_date = formatted_date 
+                        member_obj.rdv_source = "system" # Set source to system
+                        new_status = MemberStatus.BOOKED
+                        detail_text_for_gui = f"تم الحجز بنجاح في: {formatted_date}, ID: {member_obj.rdv_id}"
+                        self._emit_global_log(f"تم حجز موعد بنجاح في {formatted_date}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                        booking_successful = True
+                    else: 
+                        new_status = MemberStatus.BOOKING_FAILED
+                        err_msg_detail = str(book_data.get("message", "خطأ غير معروف من الخادم عند الحجز")) if isinstance(book_data, dict) else str(book_data)
+                        
+                        if isinstance(book_data, dict) and "raw_text" in book_data and "\"Eligible\":false" in book_data["raw_text"].lower(): 
+                             new_status = MemberStatus.INELIGIBLE_FOR_BOOKING
+                             raw_text_message = "نعتذر منكم! لا يمكنكم حجز موعد للاستفادة من منحة البطالة لعدم استيفائك لأحد شروط الأهلية اللازمة. (استجابة نصية)"
+                             try:
+                                 parsed_raw = json.loads(book_data["raw_text"])
+                                 if "message" in parsed_raw: raw_text_message = parsed_raw["message"]
+                             except: pass 
+
+                             detail_text_for_gui = raw_text_message
+                             self._emit_global_log(f"غير مؤهل للحجز (استجابة نصية): {raw_text_message}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                             logger.warning(f"العضو {member_display_name} غير مؤهل للحجز (استجابة نصية): {book_data['raw_text'][:200]}")
+                             api_error_occurred_this_stage = False
+                        else:
+                            detail_text_for_gui = f"فشل الحجز: {err_msg_detail}"
+                            api_error_occurred_this_stage = True 
+                            self._emit_global_log(f"فشل حجز الموعد: {detail_text_for_gui}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                else: 
+                    new_status = MemberStatus.BOOKING_FAILED
+                    detail_text_for_gui = "استجابة غير متوقعة أو فارغة عند محاولة الحجز."
+                    api_error_occurred_this_stage = True
+                    self._emit_global_log(f"فشل حجز الموعد: استجابة غير متوقعة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+            else: 
+                new_status = MemberStatus.NO_SLOTS
+                detail_text_for_gui = "لا توجد مواعيد متاحة حاليًا للحجز."
+                self._emit_global_log(f"لا توجد مواعيد متاحة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+                if not member_obj.has_actual_pre_inscription: 
+                    new_status = MemberStatus.PRE_INSCRIPTION_REQUIRED
+                    detail_text_for_gui = "مؤهل ولكن لا يوجد تسجيل مسبق بعد (لا مواعيد متاحة حاليًا)."
+        else: 
+            new_status = MemberStatus.DATES_FETCH_FAILED
+            detail_text_for_gui = "لم يتم العثور على تواريخ أو استجابة غير صالحة من الخادم."
+            api_error_occurred_this_stage = True
+            self._emit_global_log(f"فشل جلب التواريخ: استجابة غير صالحة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        
+        icon = get_icon_name_for_status(new_status)
+        self._update_member_and_emit(main_list_idx, member_obj, new_status, detail_text_for_gui, icon)
+        return booking_successful, api_error_occurred_this_stage
+
+    def _download_single_pdf_for_monitoring(self, main_list_idx, member_obj, report_type, filename_suffix_base, member_specific_dir):
+        if not self.owner.is_running: return None, False, "", ""
+        operation_name = f"تحميل شهادة {filename_suffix_base}"
+        member_display_name = get_member_display_name(member_obj, main_list_idx)
+        file_path = None
+        success = False
+        error_msg_for_toast = ""
+        status_msg_for_gui_cell = f"جاري تحميل {filename_suffix_base}..."
+        
+        current_path_attr = 'pdf_honneur_path' if report_type == "HonneurEngagementReport" else 'pdf_rdv_path'
+        
+        current_pdf_path_value = getattr(member_obj, current_path_attr)
+        if current_pdf_path_value and os.path.exists(current_pdf_path_value):
+            logger.info(f"ملف {report_type} موجود بالفعل للعضو {member_display_name} في {current_pdf_path_value}. تخطي التحميل.")
+            return current_pdf_path_value, True, "", f"شهادة {filename_suffix_base} موجودة بالفعل."
+
+        # الحالة ثابتة (جاري تحميل الشهادات)، ونوع الشهادة يظهر في التفاصيل
+        self._update_member_and_emit(main_list_idx, member_obj, MemberStatus.DOWNLOADING_PDF, f"{status_msg_for_gui_cell} (بدء تحميل {report_type})", MemberStatus.DOWNLOADING_PDF.icon_name)
+        self._emit_global_log(f"جاري تحميل شهادة {filename_suffix_base}...", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        if not self.owner.is_running: return None, False, "", "" 
+        safe_member_name_part = "".join(c for c in (member_obj.get_full_name_ar() or member_obj.nin) if c.isalnum() or c in (' ', '_', '-')).rstrip().replace(" ","_")
+        if not safe_member_name_part: safe_member_name_part = member_obj.nin 
+        final_filename = f"{filename_suffix_base}_{safe_member_name_part}.pdf" 
+        target_path = os.path.join(member_specific_dir, final_filename)
+        try:
+            # تحميل متدفق: فك base64 والكتابة إلى القرص أثناء القراءة
+            downloaded_path, api_err = self.owner.api_client.download_pdf_to_file(report_type, member_obj.pre_inscription_id, target_path)
+        except PdfStreamError as e_stream:
+            downloaded_path, api_err = None, None
+            logger.warning(f"استجابة تحميل {report_type} غير صالحة للعضو {member_display_name}: {e_stream}")
+            error_msg_for_toast = f"استجابة غير متوقعة من الخادم لـ {operation_name}."
+            self._emit_global_log(f"فشل تحميل شهادة {filename_suffix_base}: استجابة غير متوقعة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        except Exception as e_save:
+            downloaded_path, api_err = None, None
+            error_msg_for_toast = f"خطأ في حفظ ملف {report_type}: {str(e_save)}"
+            self._emit_global_log(f"خطأ في حفظ شهادة {filename_suffix_base}: {e_save}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        if not self.owner.is_running: return None, False, "", "" 
+
+        if api_err:
+            error_msg_for_toast = _translate_api_error(api_err, operation_name)
+            self._emit_global_log(f"فشل تحميل شهادة {filename_suffix_base}: {error_msg_for_toast}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        elif downloaded_path:
+            file_path = downloaded_path
+            setattr(member_obj, current_path_attr, file_path) 
+            success = True
+            status_msg_for_gui_cell = f"تم تحميل {final_filename} بنجاح."
+            self._emit_global_log(f"تم تحميل شهادة {filename_suffix_base} بنجاح.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        elif not error_msg_for_toast:
+            error_msg_for_toast = f"استجابة غير متوقعة من الخادم لـ {operation_name}."
+            self._emit_global_log(f"فشل تحميل شهادة {filename_suffix_base}: استجابة غير متوقعة.", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+        
+        if not success:
+            status_msg_for_gui_cell = f"فشل تحميل {filename_suffix_base}: {error_msg_for_toast.split(':')[0]}" 
+        
+        return file_path, success, error_msg_for_toast, status_msg_for_gui_cell
+
+    def process_pdf_download(self, main_list_idx, member_obj): 
+        if not self.owner.is_running: return False, False
+        member_display_name = get_member_display_name(member_obj, main_list_idx)
+        if not member_obj.pre_inscription_id:
+            detail_text = "ID التسجيل مفقود لتحميل PDF."
+            self._update_member_and_emit(main_list_idx, member_obj, member_obj.status, detail_text, get_icon_name_for_status(member_obj.status))
+            return False, False 
+        
+        documents_location = QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation)
+        base_app_dir_name = "ملفات_المنحة_البرنامج"
+        member_name_for_folder = member_obj.get_full_name_ar()
+        if not member_name_for_folder or member_name_for_folder.isspace(): 
+            member_name_for_folder = member_obj.nin 
+        
+        safe_folder_name_part = "".join(c for c in member_name_for_folder if c.isalnum() or c in (' ', '_', '-')).rstrip().replace(" ", "_")
+        if not safe_folder_name_part: safe_folder_name_part = member_obj.nin 
+        
+        member_specific_output_dir = os.path.join(documents_location, base_app_dir_name, safe_folder_name_part)
+        
+        try:
+            os.makedirs(member_specific_output_dir, exist_ok=True) 
+        except Exception as e_mkdir:
+            logger.error(f"فشل إنشاء مجلد للعضو {member_display_name} في process_pdf_download: {e_mkdir}")
+            user_friendly_mkdir_error = f"فشل إنشاء مجلد لحفظ الملفات: {e_mkdir}"
+            self._update_member_and_emit(main_list_idx, member_obj, MemberStatus.PDF_DOWNLOAD_FAILED, user_friendly_mkdir_error, MemberStatus.PDF_DOWNLOAD_FAILED.icon_name)
+            self._emit_global_log(f"فشل إنشاء مجلد: {e_mkdir}", is_general=False, member_obj=member_obj, member_idx=main_list_idx)
+            return False, False 
+        
+        all_relevant_pdfs_downloaded_successfully = True
+        any_api_error_this_pdf_stage = False
+        download_details_agg = [] 
+
+        if not self.owner.is_running: return False, any_api_error_this_pdf_stage 
+        fp_h, s_h, err_h, stat_h = self._download_single_pdf_for_monitoring(main_list_idx, member_obj, "HonneurEngagementReport", "التزام", member_specific_output_dir)
+        download_details_agg.append(stat_h)
+        if not s_h: all_relevant_pdfs_downloaded_successfully = False
+        if err_h: any_api_error_this_pdf_stage = True 
+        
+        if self.owner.is_running and (member_obj.already_has_rdv or member_obj.rdv_id): 
+            fp_r, s_r, err_r, stat_r = self._download_single_pdf_for_monitoring(main_list_idx, member_obj, "RdvReport", "موعد", member_specific_output_dir)
+            download_details_agg.append(stat_r)
+            if not s_r: all_relevant_pdfs_downloaded_successfully = False
+            if err_r: any_api_error_this_pdf_stage = True
+        elif self.owner.is_running: 
+            msg_skip_rdv = "شهادة الموعد غير مطلوبة (لا يوجد موعد مسجل)."
+            logger.info(msg_skip_rdv + f" للعضو {member_display_name}")
+            download_details_agg.append(msg_skip_rdv)
+        
+        final_status_after_pdfs = member_obj.status
+        if all_relevant_pdfs_downloaded_successfully:
+            if member_obj.status is not MemberStatus.BENEFICIARY: 
+                 final_status_after_pdfs = MemberStatus.COMPLETED
+        else:
+            if final_status_after_pdfs is not MemberStatus.PDF_DOWNLOAD_FAILED and member_obj.status is not MemberStatus.BENEFICIARY: 
+                final_status_after_pdfs = MemberStatus.PDF_DOWNLOAD_FAILED 
+            
+        final_detail_message = "; ".join(msg for msg in download_details_agg if msg) 
+        self._update_member_and_emit(main_list_idx, member_obj, final_status_after_pdfs, final_detail_message, get_icon_name_for_status(final_status_after_pdfs))
+        
+        return all_relevant_pdfs_downloaded_successfully, any_api_error_this_pdf_stage
@@ -0,0 +1,83 @@
+# member_registry.py
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemberRegistry:
+    """
+    Keeps O(1) lookups from a member to its index in the main members list.
+    Every member gets a stable runtime ID (member.member_id) the first time it is seen.
+    """
+
+    def __init__(self, members_list=None):
+        self._id_counter = itertools.count(1)
+        self._members = []
+        self._index_by_id = {}
+        self.rebuild(members_list if members_list is not None else [])
+
+    def _ensure_id(self, member):
+        if member.member_id is None:
+            member.member_id = next(self._id_counter)
+        return member.member_id
+
+    def _reindex_from(self, start_index):
+        for idx in range(start_index, len(self._members)):
+            self._index_by_id[self._members[idx].member_id] = idx
+
+    @property
+    def members(self):
+        return self._members
+
+    def rebuild(self, members_list):
+        """Adopts members_list as the main list and rebuilds every index from scratch."""
+        self._members = members_list
+        self._index_by_id = {self._ensure_id(member): idx for idx, member in enumerate(members_list)}
+
+    def append(self, member):
+        self._ensure_id(member)
+        self._members.append(member)
+        self._index_by_id[member.member_id] = len(self._members) - 1
+        return len(self._members) - 1
+
+    def extend(self, members):
+        """Appends several members. Returns the index of the first one."""
+        first_index = len(self._members)
+        for member in members:
+            self.append(member)
+        return first_index
+
+    def pop(self, index):
+        member = self._members.pop(index)
+        self._index_by_id.pop(member.member_id, None)
+        self._reindex_from(index)
+        return member
+
+    def remove_many(self, members_to_remove):
+        """Removes several members in one pass. Returns the number of members actually removed."""
+        ids_to_remove = {m.member_id for m in members_to_remove if m.member_id in self._index_by_id}
+        if not ids_to_remove:
+            return 0
+        first_affected_index = min(self._index_by_id[member_id] for member_id in ids_to_remove)
+        self._members[:] = [m for m in self._members if m.member_id not in ids_to_remove]
+        for member_id in ids_to_remove:
+            self._index_by_id.pop(member_id, None)
+        self._reindex_from(first_affected_index)
+        return len(ids_to_remove)
+
+    def index_of(self, member):
+        """Index of member in the main list, or -1 if it is not registered."""
+        if member is None or member.member_id is None:
+            return -1
+        idx = self._index_by_id.get(member.member_id, -1)
+        if idx == -1 or idx >= len(self._members) or self._members[idx] is not member:
+            return -1
+        return idx
+
+    def index_of_id(self, member_id):
+        """Index of the member with this runtime ID, or -1."""
+        return self._index_by_id.get(member_id, -1)
+
+    def contains(self, member):
+        return self.index_of(member) != -1
@@ -0,0 +1,200 @@
+# member_scheduler.py
+import os
+import time
+import heapq
+import logging
+import itertools
+
+logger = logging.getLogger(__name__)
+
+_PRIORITY_ACTIVE = 0
+_PRIORITY_BACKOFF = 1
+
+
+def member_pdfs_on_disk(member):
+    """True if every certificate the member needs (same rule as process_pdf_download) is saved on disk."""
+    if not (member.pdf_honneur_path and os.path.exists(member.pdf_honneur_path)):
+        return False
+    if member.already_has_rdv or member.rdv_id:
+        return bool(member.pdf_rdv_path and os.path.exists(member.pdf_rdv_path))
+    return True
+
+
+class _Entry:
+    __slots__ = ('member', 'due', 'version', 'queued', 'status', 'unchanged_checks')
+
+    def __init__(self, member):
+        self.member = member
+        self.due = 0.0
+        self.version = 0
+        self.queued = False
+        self.status = member.status
+        self.unchanged_checks = 0
+
+
+class MemberScheduler:
+    """
+    Members ordered by their next due time (a heap with lazy deletion), used by
+    MonitoringThread instead of a round-robin pass. After each check a member is planned:
+    - bookable / in-progress members: every base_interval seconds;
+    - members waiting for PDFs only or stuck in a state that stops after validation:
+      base_interval x 2^(checks without a status change), up to max_interval;
+    - members with API failures: base_interval x 2^consecutive_failures, up to max_interval;
+    - terminal members, members whose PDFs are all on disk and members over the failure
+      limit drop out until their status is changed elsewhere (edit, manual check).
+    Members are keyed by identity; the scheduler is used from the monitoring thread only.
+    """
+
+    def __init__(self, base_interval, max_interval, max_failures, clock=time.monotonic):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.max_failures = max_failures
+        self._clock = clock
+        self._heap = []
+        self._entries = {}
+        self._seq = itertools.count()
+        self.checks = 0
+
+    def _backoff(self, exponent):
+        return min(self.base_interval * 2 ** min(exponent, 20), max(self.max_interval, self.base_interval))
+
+    def _plan(self, member, unchanged_checks):
+        """(seconds until the next check, priority), or None if the member drops out."""
+        status = member.status
+        if status.is_terminal or member.consecutive_failures >= self.max_failures:
+            return None
+        if status.pdf_only and member_pdfs_on_disk(member):
+            return None
+        if member.consecutive_failures:
+            return self._backoff(member.consecutive_failures), _PRIORITY_BACKOFF
+        if status.pdf_only or (status.pdf_eligible and not status.bookable) or status.stops_after_validation:
+            return self._backoff(unchanged_checks), _PRIORITY_BACKOFF
+        return self.base_interval, _PRIORITY_ACTIVE
+
+    def _push(self, entry, due, priority):
+        entry.due = due
+        entry.version += 1
+        entry.queued = True
+        heapq.heappush(self._heap, (due, priority, next(self._seq), id(entry.member), entry.version))
+
+    def _unqueue(self, entry):
+        entry.version += 1
+        entry.queued = False
+
+    def sync(self, members):
+        """
+        Registers new members (due now), forgets removed ones and re-plans members whose
+        status changed outside the scheduler. Returns {id(member): index in members}.
+        """
+        now = self._clock()
+        index_by_key = {}
+        for index, member in enumerate(members):
+            key = id(member)
+            index_by_key[key] = index
+            entry = self._entries.get(key)
+            if entry is None or entry.member is not member:
+                entry = self._entries[key] = _Entry(member)
+                self._push(entry, now, _PRIORITY_ACTIVE)
+            elif member.status is not entry.status:
+                entry.status = member.status
+                entry.unchanged_checks = 0
+                plan = self._plan(member, 0)
+                if plan is None:
+                    self._unqueue(entry)
+                elif not entry.queued:
+                    self._push(entry, now, plan[1])
+                elif entry.due > now + plan[0]:
+                    self._push(entry, now + plan[0], plan[1])
+        if len(index_by_key) != len(self._entries):
+            for key in [key for key in self._entries if key not in index_by_key]:
+                del self._entries[key]
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            self._heap = [item for item in self._heap if self._is_live(item)]
+            heapq.heapify(self._heap)
+        return index_by_key
+
+    def _is_live(self, item):
+        entry = self._entries.get(item[3])
+        return entry is not None and entry.queued and entry.version == item[4]
+
+    def next_due(self):
+        """(member, seconds until it is due) for the earliest queued member, or (None, None)."""
+        while self._heap:
+            item = self._heap[0]
+            if self._is_live(item):
+                return self._entries[item[3]].member, max(0.0, item[0] - self._clock())
+            heapq.heappop(self._heap)
+        return None, None
+
+    def take(self, member):
+        """Removes a member from the queue while it is being checked."""
+        entry = self._entries.get(id(member))
+        if entry is not None:
+            self._unqueue(entry)
+
+    def reschedule(self, member):
+        """Plans the next check of a member that was just checked (or skipped)."""
+        entry = self._entries.get(id(member))
+        if entry is None or entry.member is not member:
+            entry = self._entries[id(member)] = _Entry(member)
+        elif member.status is entry.status:
+            entry.unchanged_checks += 1
+        else:
+            entry.status = member.status
+            entry.unchanged_checks = 0
+        self.checks += 1
+        plan = self._plan(member, entry.unchanged_checks)
+        if plan is None:
+            self._unqueue(entry)
+            logger.debug(f"الجدولة: العضو {member.nin} ({member.status}) خرج من قائمة المراقبة.")
+        else:
+            self._push(entry, self._clock() + plan[0], plan[1])
+
+    def postpone(self, member, seconds=None):
+        """Checks a member again later without counting a check (e.g. it is busy in another thread)."""
+        entry = self._entries.get(id(member))
+        if entry is not None:
+            self._push(entry, self._clock() + (self.base_interval if seconds is None else seconds), _PRIORITY_ACTIVE)
+
+    def wake_all(self):
+        """
+        Makes every queued member due now (e.g. after the connection comes back), and
+        re-queues dropped members that may be checked again (failure counters reset).
+        """
+        now = self._clock()
+        for entry in self._entries.values():
+            if entry.queued and entry.due <= now:
+                continue
+            plan = self._plan(entry.member, entry.unchanged_checks)
+            if entry.queued or plan is not None:
+                self._push(entry, now, plan[1] if plan else _PRIORITY_ACTIVE)
+
+    def set_base_interval(self, base_interval):
+        """Changes the monitoring interval; queued members keep their share of the wait left."""
+        old_interval, self.base_interval = self.base_interval, base_interval
+        if old_interval == base_interval:
+            return
+        now = self._clock()
+        for entry in self._entries.values():
+            if entry.queued and entry.due > now:
+                remaining = entry.due - now
+                remaining = remaining * base_interval / old_interval if old_interval > 0 else min(remaining, base_interval)
+                plan = self._plan(entry.member, entry.unchanged_checks)
+                self._push(entry, now + remaining, plan[1] if plan else _PRIORITY_ACTIVE)
+
+    def reset(self):
+        """Forgets every member: all of them are due at the next sync."""
+        self._heap = []
+        self._entries = {}
+
+    def stats(self):
+        now = self._clock()
+        due_times = [entry.due for entry in self._entries.values() if entry.queued]
+        return {
+            "members": len(self._entries),
+            "queued": len(due_times),
+            "due_now": sum(1 for due in due_times if due <= now),
+            "dropped": len(self._entries) - len(due_times),
+            "next_due_in": round(max(0.0, min(due_times) - now), 1) if due_times else None,
+            "checks": self.checks,
+        }
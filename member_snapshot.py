@@ -0,0 +1,196 @@
+# member_snapshot.py
+"""
+Compact binary snapshot of the members roster.
+
+Layout (little-endian):
+    header   : magic "AMSN", format version (H), member count (I), column count (H)
+    columns  : one per persisted Member field, in any order
+               name length (B), name (UTF-8), kind (B), payload length (I), payload
+    checksum : CRC32 (I) of everything before it
+
+Column kinds:
+    str      : member count * int32 lengths in characters (-1 = None), then the UTF-8 text of all values
+    interned : JSON table of the distinct values, then member count * uint16 indices (status, rdv_source)
+    bool     : one byte per member (0, 1, 2 = None)
+    int      : member count * int64
+    json     : JSON array of the values (fallback for mixed or nested values, e.g. allocation_details)
+
+Columns are stored by name, so a snapshot written before a field was added
+still loads (the missing field gets its Member default).
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from operator import itemgetter
+
+from member import Member, MEMBER_FIELD_NAMES
+
+SNAPSHOT_MAGIC = b"AMSN"
+SNAPSHOT_VERSION = 1
+INTERNED_FIELDS = frozenset(('status', 'rdv_source')) # قيم قليلة ومتكررة: تُخزن مرة واحدة في جدول
+
+KIND_STR, KIND_INTERNED, KIND_BOOL, KIND_INT, KIND_JSON = range(5)
+
+_HEADER = struct.Struct("<4sHIH")
+_COLUMN_NAME_LENGTH = struct.Struct("<B")
+_COLUMN_HEADER = struct.Struct("<BI")
+_U32 = struct.Struct("<I")
+_NONE_TYPE = type(None)
+_BOOL_NONE = 2
+_NEEDS_BYTESWAP = sys.byteorder != "little"
+_get_persisted_fields = itemgetter(*MEMBER_FIELD_NAMES)
+
+
+class SnapshotFormatError(ValueError):
+    """The data is not a readable members snapshot (bad magic, newer version, checksum mismatch, truncation)."""
+    pass
+
+
+def _array_to_bytes(values):
+    if _NEEDS_BYTESWAP:
+        values.byteswap()
+    return values.tobytes()
+
+
+def _array_from_bytes(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if _NEEDS_BYTESWAP:
+        values.byteswap()
+    return values
+
+
+def _encode_column(name, values):
+    value_types = set(map(type, values))
+    value_types.discard(_NONE_TYPE)
+    has_none = None in values
+
+    if all(issubclass(value_type, str) for value_type in value_types): # str أو MemberStatus
+        if name in INTERNED_FIELDS:
+            table = list(dict.fromkeys(values))
+            if len(table) <= 0xFFFF:
+                index_by_value = {value: idx for idx, value in enumerate(table)}
+                table_bytes = json.dumps(table, ensure_ascii=False).encode('utf-8')
+                indices = array('H', map(index_by_value.__getitem__, values))
+                return KIND_INTERNED, _U32.pack(len(table_bytes)) + table_bytes + _array_to_bytes(indices)
+        if has_none:
+            lengths = array('i', [-1 if value is None else len(value) for value in values])
+            text = "".join([value for value in values if value is not None])
+        else:
+            lengths = array('i', map(len, values))
+            text = "".join(values)
+        return KIND_STR, _array_to_bytes(lengths) + text.encode('utf-8')
+
+    if value_types == {bool}:
+        if has_none:
+            return KIND_BOOL, bytes([_BOOL_NONE if value is None else value for value in values])
+        return KIND_BOOL, bytes(values)
+
+    if value_types == {int} and not has_none:
+        try:
+            return KIND_INT, _array_to_bytes(array('q', values))
+        except OverflowError:
+            pass
+
+    return KIND_JSON, json.dumps(values, ensure_ascii=False).encode('utf-8')
+
+
+def _decode_column(kind, payload, count):
+    if kind == KIND_STR:
+        lengths_size = 4 * count
+        lengths = _array_from_bytes('i', payload[:lengths_size])
+        text = str(payload[lengths_size:], 'utf-8')
+        if count and min(lengths) < 0:
+            ends = list(accumulate(length if length > 0 else 0 for length in lengths))
+            starts = [0] + ends[:-1]
+            return [text[start:end] if length >= 0 else None for start, end, length in zip(starts, ends, lengths)]
+        ends = list(accumulate(lengths))
+        return [text[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+    if kind == KIND_INTERNED:
+        table_size = _U32.unpack_from(payload, 0)[0]
+        table = json.loads(bytes(payload[4:4 + table_size]))
+        indices = _array_from_bytes('H', payload[4 + table_size:])
+        return list(map(table.__getitem__, indices))
+
+    if kind == KIND_BOOL:
+        if _BOOL_NONE in payload:
+            return [None if value == _BOOL_NONE else value == 1 for value in payload]
+        return list(map(bool, payload))
+
+    if kind == KIND_INT:
+        return _array_from_bytes('q', payload).tolist()
+
+    if kind == KIND_JSON:
+        return json.loads(bytes(payload))
+
+    raise SnapshotFormatError(f"Unknown column kind {kind}")
+
+
+def encode_member_snapshot(member_dicts):
+    """Encodes a list of member dicts (Member.to_dict() layout) as snapshot bytes."""
+    try:
+        rows = list(map(_get_persisted_fields, member_dicts))
+    except KeyError:
+        # قواميس بصيغة قديمة (مثلاً عند الترحيل من ملف JSON قديم): نكمل الحقول الناقصة بقيمها الافتراضية
+        rows = [Member.from_dict(d).to_tuple() for d in member_dicts]
+    columns = list(zip(*rows)) if rows else [() for _ in MEMBER_FIELD_NAMES]
+
+    parts = [_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(member_dicts), len(MEMBER_FIELD_NAMES))]
+    for name, values in zip(MEMBER_FIELD_NAMES, columns):
+        kind, payload = _encode_column(name, list(values))
+        name_bytes = name.encode('utf-8')
+        parts.append(_COLUMN_NAME_LENGTH.pack(len(name_bytes)))
+        parts.append(name_bytes)
+        parts.append(_COLUMN_HEADER.pack(kind, len(payload)))
+        parts.append(payload)
+    body = b"".join(parts)
+    return body + _U32.pack(zlib.crc32(body))
+
+
+def decode_member_snapshot(data):
+    """Decodes snapshot bytes back to a list of member dicts. Raises SnapshotFormatError."""
+    if len(data) < _HEADER.size + _U32.size:
+        raise SnapshotFormatError("Snapshot is truncated")
+    view = memoryview(data)
+    body = view[:-_U32.size]
+    if zlib.crc32(body) != _U32.unpack_from(view, len(body))[0]:
+        raise SnapshotFormatError("Snapshot checksum mismatch")
+
+    magic, version, count, column_count = _HEADER.unpack_from(body, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotFormatError("Not a members snapshot")
+    if version > SNAPSHOT_VERSION:
+        raise SnapshotFormatError(f"Snapshot version {version} is newer than supported version {SNAPSHOT_VERSION}")
+
+    names = []
+    columns = []
+    pos = _HEADER.size
+    try:
+        for _ in range(column_count):
+            name_size = _COLUMN_NAME_LENGTH.unpack_from(body, pos)[0]
+            pos += _COLUMN_NAME_LENGTH.size
+            name = str(body[pos:pos + name_size], 'utf-8')
+            pos += name_size
+            kind, payload_size = _COLUMN_HEADER.unpack_from(body, pos)
+            pos += _COLUMN_HEADER.size
+            payload = body[pos:pos + payload_size]
+            pos += payload_size
+            if len(payload) != payload_size:
+                raise SnapshotFormatError(f"Column '{name}' is truncated")
+            if name not in MEMBER_FIELD_NAMES:
+                continue # حقل غير معروف لهذا الإصدار من البرنامج
+            values = _decode_column(kind, payload, count)
+            if len(values) != count:
+                raise SnapshotFormatError(f"Column '{name}' has {len(values)} values, expected {count}")
+            names.append(name)
+            columns.append(values)
+    except (struct.error, UnicodeDecodeError, json.JSONDecodeError, IndexError) as e:
+        raise SnapshotFormatError(f"Corrupt snapshot column: {e}") from e
+
+    if not columns:
+        return [{} for _ in range(count)]
+    return [dict(zip(names, row)) for row in zip(*columns)]
@@ -0,0 +1,118 @@
+# member_status.py
+from enum import Enum
+
+# خصائص الحالة (تُجمع بـ |)
+IS_ERROR = 1 # خطأ/فشل: يُعرض كخطأ في التفاصيل والتنبيهات
+IS_TERMINAL = 2 # لا حاجة لأي معالجة أخرى: المراقبة تتجاوز العضو كليًا
+PDF_ONLY = 4 # المراقبة تكتفي بتحميل الشهادات
+BOOKABLE = 8 # يمكن محاولة حجز موعد انطلاقًا من هذه الحالة
+STOPS_AFTER_VALIDATION = 16 # نتيجة تحقق تمنع متابعة جلب المعلومات والحجز
+PDF_ELIGIBLE = 32 # تستدعي محاولة تحميل الشهادات بعد المعالجة
+IS_SUCCESS = 64
+IN_PROGRESS = 128
+
+
+class MemberStatus(str, Enum):
+    """
+    Status of a member. The value is the Arabic text shown in the table and written
+    to the data files (so saved rosters keep their format); everything the threads
+    and the table need to know about a status is precomputed as attributes.
+    """
+
+    def __new__(cls, text, icon_name, flags=0):
+        status = str.__new__(cls, text)
+        status._value_ = text
+        status.icon_name = icon_name
+        status.is_error = bool(flags & IS_ERROR)
+        status.is_terminal = bool(flags & IS_TERMINAL)
+        status.pdf_only = bool(flags & PDF_ONLY)
+        status.bookable = bool(flags & BOOKABLE)
+        status.stops_after_validation = bool(flags & STOPS_AFTER_VALIDATION)
+        status.pdf_eligible = bool(flags & PDF_ELIGIBLE)
+        status.is_success = bool(flags & IS_SUCCESS)
+        status.in_progress = bool(flags & IN_PROGRESS)
+        return status
+
+    NEW = ("جديد", "SP_CustomBase")
+    VALIDATED = ("تم التحقق", "SP_DialogApplyButton", BOOKABLE)
+    VALIDATED_INSTANT = ("تم التحقق (فوري)", "SP_DialogApplyButton")
+    INFO_FETCHED = ("تم جلب المعلومات", "SP_DialogApplyButton", BOOKABLE)
+    INFO_FETCHED_INSTANT = ("تم جلب المعلومات (فوري)", "SP_DialogApplyButton")
+    PRE_INSCRIPTION_REQUIRED = ("يتطلب تسجيل مسبق", "SP_MessageBoxWarning", BOOKABLE)
+    NO_SLOTS = ("لا توجد مواعيد", "SP_MessageBoxInformation", BOOKABLE)
+    BOOKED = ("تم الحجز", "SP_DialogSaveButton", PDF_ELIGIBLE | IS_SUCCESS)
+    COMPLETED = ("مكتمل", "SP_DialogYesButton", PDF_ONLY | PDF_ELIGIBLE | IS_SUCCESS)
+    HAS_PRIOR_RDV = ("لديه موعد مسبق", "SP_MessageBoxInformation", PDF_ONLY | PDF_ELIGIBLE | STOPS_AFTER_VALIDATION)
+    BENEFICIARY = ("مستفيد حاليًا من المنحة", "SP_DialogYesButton", IS_TERMINAL | STOPS_AFTER_VALIDATION | IS_SUCCESS)
+
+    INVALID_INPUT = ("بيانات الإدخال خاطئة", "SP_MessageBoxCritical", IS_ERROR | STOPS_AFTER_VALIDATION)
+    INITIALLY_INELIGIBLE = ("غير مؤهل مبدئيًا", "SP_MessageBoxCritical", IS_ERROR | STOPS_AFTER_VALIDATION)
+    INELIGIBLE_FOR_BOOKING = ("غير مؤهل للحجز", "SP_MessageBoxCritical", IS_ERROR | STOPS_AFTER_VALIDATION)
+    VALIDATION_FAILED = ("فشل التحقق", "SP_MessageBoxCritical", IS_ERROR | STOPS_AFTER_VALIDATION)
+    INITIAL_VALIDATION_FAILED = ("فشل التحقق الأولي", "SP_MessageBoxCritical", IS_ERROR)
+    INFO_FETCH_FAILED = ("فشل جلب المعلومات", "SP_MessageBoxCritical", IS_ERROR)
+    DATES_FETCH_FAILED = ("فشل جلب التواريخ", "SP_MessageBoxCritical", IS_ERROR | BOOKABLE)
+    BOOKING_FAILED = ("فشل الحجز", "SP_MessageBoxCritical", IS_ERROR)
+    PDF_DOWNLOAD_FAILED = ("فشل تحميل PDF", "SP_MessageBoxCritical", IS_ERROR | PDF_ELIGIBLE)
+    REPEATED_FAILURES = ("فشل بشكل متكرر", "SP_MessageBoxCritical", IS_ERROR)
+    INITIAL_FETCH_ERROR = ("خطأ في الجلب الأولي", "SP_MessageBoxCritical", IS_ERROR)
+    PROCESSING_ERROR = ("خطأ في المعالجة", "SP_MessageBoxCritical", IS_ERROR)
+    DATE_FORMAT_ERROR = ("خطأ في تنسيق التاريخ", "SP_MessageBoxCritical", IS_ERROR)
+    INSTANT_CHECK_ERROR = ("خطأ في الفحص الفوري", "SP_MessageBoxCritical", IS_ERROR)
+
+    VALIDATING_CYCLE = ("جاري التحقق (دورة)...", "SP_ArrowRight", IN_PROGRESS)
+    VALIDATING_INSTANT = ("جاري التحقق (فوري)...", "SP_ArrowRight", IN_PROGRESS)
+    FETCHING_NAME = ("جاري جلب الاسم...", "SP_ArrowRight", IN_PROGRESS)
+    SEARCHING_SLOTS = ("جاري البحث عن مواعيد...", "SP_ArrowRight", IN_PROGRESS)
+    BOOKING = ("جاري حجز الموعد...", "SP_ArrowRight", IN_PROGRESS)
+    DOWNLOADING_PDF = ("جاري تحميل الشهادات...", "SP_ArrowRight", IN_PROGRESS)
+
+    def __str__(self):
+        return self.value
+
+    __format__ = str.__format__
+
+    @property
+    def text(self):
+        """Arabic display text (also the stored value)."""
+        return self.value
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Status for a stored or displayed text. Texts written by older versions that
+        are not an exact status (e.g. "جاري تحميل التزام...") are mapped once with
+        the substring rules the old code used, then remembered.
+        """
+        if text.__class__ is cls:
+            return text
+        status = _STATUS_BY_TEXT.get(text)
+        if status is None:
+            status = _classify_legacy_text(text)
+            if isinstance(text, str) and len(_STATUS_BY_TEXT) < _MAX_CACHED_TEXTS:
+                _STATUS_BY_TEXT[text] = status
+        return status
+
+
+_STATUS_BY_TEXT = {status.value: status for status in MemberStatus}
+_MAX_CACHED_TEXTS = 1024 # نصوص قديمة/ديناميكية محفوظة بعد تصنيفها (حد أعلى لحجم الذاكرة)
+
+
+def _classify_legacy_text(text):
+    if not text or not isinstance(text, str):
+        return MemberStatus.NEW
+    if text.startswith("جاري تحميل"):
+        return MemberStatus.DOWNLOADING_PDF
+    if "فشل تحميل" in text:
+        return MemberStatus.PDF_DOWNLOAD_FAILED
+    if "فشل" in text or "خطأ" in text or "خاطئة" in text:
+        return MemberStatus.PROCESSING_ERROR
+    if "غير مؤهل" in text:
+        return MemberStatus.INELIGIBLE_FOR_BOOKING
+    if "لديه موعد مسبق" in text:
+        return MemberStatus.HAS_PRIOR_RDV
+    if "يتطلب تسجيل مسبق" in text:
+        return MemberStatus.PRE_INSCRIPTION_REQUIRED
+    if "لا توجد مواعيد" in text:
+        return MemberStatus.NO_SLOTS
+    return MemberStatus.NEW
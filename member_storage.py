@@ -0,0 +1,512 @@
+# member_storage.py
+import codecs
+import json
+import mmap
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import logging
+
+from config import (
+    DATA_FILE, DATA_FILE_TMP, DATA_FILE_BAK, MEMBERS_DB_FILE, MEMBERS_STORAGE_BACKEND,
+    MEMBERS_LOAD_BATCH_SIZE, MEMBERS_LOAD_CHUNK_BYTES, MEMBERS_LOAD_USE_MMAP,
+    MEMBERS_SNAPSHOT_FILE, MEMBERS_SNAPSHOT_FILE_TMP, MEMBERS_SNAPSHOT_FILE_BAK
+)
+from member_snapshot import SnapshotFormatError, encode_member_snapshot, decode_member_snapshot
+
+logger = logging.getLogger(__name__)
+
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class MemberStorageError(Exception):
+    """Raised when stored member data exists but cannot be read or written."""
+    pass
+
+
+def iter_json_array_items(path, use_mmap=MEMBERS_LOAD_USE_MMAP, chunk_size=MEMBERS_LOAD_CHUNK_BYTES):
+    """
+    Yields the elements of the top-level JSON array in path one at a time,
+    decoding chunk_size bytes at a time instead of parsing the whole file.
+    With use_mmap the file is memory-mapped instead of read into buffers.
+    Raises json.JSONDecodeError if the file is not a well-formed array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    with open(path, 'rb') as f:
+        mapped = None
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = ""
+        pos = 0
+        offset = 0
+        eof = False
+
+        def read_more():
+            nonlocal buffer, pos, offset, eof
+            if mapped is None:
+                data = f.read(chunk_size)
+            else:
+                data = mapped[offset:offset + chunk_size]
+                offset += len(data)
+            eof = not data
+            buffer = buffer[pos:] + text_decoder.decode(data, final=eof) # ما قبل pos تمت معالجته
+            pos = 0
+
+        def next_char():
+            # يتخطى المسافات ويعيد الحرف التالي ("" عند نهاية الملف)
+            nonlocal pos
+            while True:
+                pos = _JSON_WHITESPACE.match(buffer, pos).end()
+                if pos < len(buffer):
+                    return buffer[pos]
+                if eof:
+                    return ""
+                read_more()
+
+        try:
+            if next_char() != "[":
+                raise json.JSONDecodeError("Expecting '['", buffer, pos)
+            pos += 1
+            if next_char() == "]":
+                return
+            while True:
+                next_char()
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    read_more() # العنصر مقطوع عند حدود القطعة
+                    continue
+                if end == len(buffer) and not eof:
+                    read_more() # قد تكون القيمة (رقم مثلاً) مستمرة في القطعة التالية
+                    continue
+                pos = end
+                yield item
+                separator = next_char()
+                if separator == ",":
+                    pos += 1
+                elif separator == "]":
+                    return
+                else:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+        finally:
+            if mapped is not None:
+                mapped.close()
+
+
+def _batched(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class JsonMemberStorage:
+    """
+    The original members_data.json file: the whole roster is rewritten on each save
+    (.tmp then os.replace, previous file kept as .bak).
+    """
+    name = "json"
+    supports_queries = False
+
+    def __init__(self, data_file=DATA_FILE, tmp_file=DATA_FILE_TMP, bak_file=DATA_FILE_BAK):
+        self.data_file = data_file
+        self.tmp_file = tmp_file
+        self.bak_file = bak_file
+
+    def exists(self):
+        return os.path.exists(self.data_file) or os.path.exists(self.bak_file)
+
+    _decode_errors = (json.JSONDecodeError,)
+
+    def _read_file(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_file(path, member_dicts):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(member_dicts, f, ensure_ascii=False, indent=4)
+
+    def load_member_dicts(self):
+        """
+        Returns (member_dicts, source_path, from_backup).
+        Falls back to the .bak file (and restores the primary from it) when the primary is missing or corrupt.
+        """
+        primary_path = self.data_file
+        backup_path = self.bak_file
+
+        if os.path.exists(primary_path):
+            try:
+                data_list = self._read_file(primary_path)
+                logger.info(f"تم تحميل بيانات {len(data_list)} أعضاء من {primary_path}")
+                return data_list, primary_path, False
+            except self._decode_errors as e:
+                logger.error(f"خطأ في فك تشفير ملف البيانات الأساسي {primary_path} ({self.name}): {e}. محاولة تحميل النسخة الاحتياطية.")
+            except Exception as e:
+                logger.exception(f"خطأ غير متوقع عند تحميل البيانات من {primary_path}: {e}")
+        else:
+            logger.info(f"الملف الأساسي {primary_path} غير موجود. محاولة تحميل النسخة الاحتياطية.")
+
+        if not os.path.exists(backup_path):
+            if os.path.exists(primary_path):
+                raise MemberStorageError(f"ملف البيانات {primary_path} تالف ولا توجد نسخة احتياطية.")
+            return [], None, False
+
+        try:
+            data_list = self._read_file(backup_path)
+        except self._decode_errors as e:
+            logger.error(f"خطأ في فك تشفير الملف الاحتياطي {backup_path} ({self.name}): {e}. قد يكون الملف تالفًا.")
+            raise MemberStorageError(f"خطأ في ملف البيانات الاحتياطي {backup_path}. قد يكون الملف تالفًا.")
+        except Exception as e:
+            logger.exception(f"خطأ غير متوقع عند تحميل البيانات من الملف الاحتياطي {backup_path}: {e}")
+            raise MemberStorageError(f"خطأ غير متوقع عند تحميل البيانات الاحتياطية: {e}")
+
+        logger.info(f"تم تحميل بيانات {len(data_list)} أعضاء من الملف الاحتياطي {backup_path}")
+        try:
+            shutil.copy2(backup_path, primary_path)
+            logger.info(f"تم استعادة الملف الأساسي {primary_path} من النسخة الاحتياطية {backup_path}.")
+        except Exception as e_copy:
+            logger.error(f"فشل في استعادة الملف الأساسي من النسخة الاحتياطية: {e_copy}")
+        return data_list, backup_path, True
+
+    def stream_member_dicts(self, batch_size=MEMBERS_LOAD_BATCH_SIZE):
+        """
+        Returns (batches, source_path), where batches yields lists of up to batch_size
+        member dicts parsed incrementally from the primary file, or None when there is
+        no primary file (load_member_dicts() then handles the .bak fallback).
+        A corrupt file raises MemberStorageError while iterating.
+        """
+        if not os.path.exists(self.data_file):
+            return None
+        return self._iter_file_batches(self.data_file, batch_size), self.data_file
+
+    def _iter_file_batches(self, path, batch_size):
+        loaded_count = 0
+        try:
+            for batch in _batched(iter_json_array_items(path), batch_size):
+                loaded_count += len(batch)
+                yield batch
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"خطأ في فك تشفير JSON للملف {path} بعد قراءة {loaded_count} عضو: {e}")
+            raise MemberStorageError(f"ملف البيانات {path} تالف: {e}") from e
+        except OSError as e:
+            logger.exception(f"خطأ عند قراءة ملف البيانات {path}: {e}")
+            raise MemberStorageError(f"خطأ عند قراءة ملف البيانات {path}: {e}") from e
+        logger.info(f"تم تحميل بيانات {loaded_count} أعضاء من {path} (تحميل تدريجي)")
+
+    def save_member_dicts(self, member_dicts):
+        """Rewrites the whole file. Returns the number of members written."""
+        primary_path = self.data_file
+        tmp_path = self.tmp_file
+        try:
+            self._write_file(tmp_path, member_dicts)
+
+            if os.path.exists(primary_path):
+                try:
+                    shutil.copy2(primary_path, self.bak_file)
+                    logger.debug(f"تم إنشاء نسخة احتياطية من {primary_path} إلى {self.bak_file}")
+                except Exception as e_bak:
+                    logger.error(f"فشل في إنشاء نسخة احتياطية لملف بيانات الأعضاء {primary_path}: {e_bak}")
+
+            os.replace(tmp_path, primary_path)
+            return len(member_dicts)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except Exception as e_del_tmp:
+                    logger.error(f"فشل في حذف الملف المؤقت لبيانات الأعضاء {tmp_path} بعد خطأ في الحفظ: {e_del_tmp}")
+            raise MemberStorageError(str(e)) from e
+
+    def close(self):
+        pass
+
+
+class BinaryMemberStorage(JsonMemberStorage):
+    """
+    Same file handling as JsonMemberStorage (.tmp then os.replace, .bak fallback),
+    but the roster is written as a compact binary snapshot (see member_snapshot).
+    """
+    name = "binary"
+    supports_queries = False
+
+    _decode_errors = (SnapshotFormatError,)
+
+    def __init__(self, data_file=MEMBERS_SNAPSHOT_FILE, tmp_file=MEMBERS_SNAPSHOT_FILE_TMP, bak_file=MEMBERS_SNAPSHOT_FILE_BAK):
+        super().__init__(data_file, tmp_file, bak_file)
+
+    def _read_file(self, path):
+        with open(path, 'rb') as f:
+            return decode_member_snapshot(f.read())
+
+    @staticmethod
+    def _write_file(path, member_dicts):
+        with open(path, 'wb') as f:
+            f.write(encode_member_snapshot(member_dicts))
+
+    def stream_member_dicts(self, batch_size=MEMBERS_LOAD_BATCH_SIZE):
+        """The snapshot is decoded in one pass (fast enough not to need batches): always None."""
+        return None
+
+
+def export_members_json(member_dicts, path):
+    """Writes member_dicts as an indented, human-readable JSON file (whatever the storage backend)."""
+    tmp_path = path + ".tmp"
+    try:
+        JsonMemberStorage._write_file(tmp_path, member_dicts)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except Exception as e_del_tmp:
+                logger.error(f"فشل في حذف الملف المؤقت للتصدير {tmp_path}: {e_del_tmp}")
+        raise MemberStorageError(str(e)) from e
+    logger.info(f"تم تصدير بيانات {len(member_dicts)} عضو إلى {path}")
+    return len(member_dicts)
+
+
+class SQLiteMemberStorage:
+    """
+    One row per member in a SQLite database (WAL mode).
+    The full member dict is stored as JSON in `data`; the columns used by the
+    filter bar are stored separately and indexed.
+    Saves only write rows whose content or position changed. Rows are keyed by NIN,
+    so a roster with a duplicated NIN is refused (MemberStorageError) rather than merged.
+    """
+    name = "sqlite"
+    supports_queries = True
+
+    # مفتاح الفلتر في الواجهة -> العمود المفهرس
+    FILTER_COLUMNS = {
+        "status": "status",
+        "has_rdv": "has_rdv",
+        "have_allocation": "have_allocation",
+        "pdf_honneur": "has_pdf_honneur",
+        "pdf_rdv": "has_pdf_rdv",
+    }
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS members (
+            nin TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            wassit_no TEXT,
+            status TEXT,
+            has_rdv INTEGER NOT NULL DEFAULT 0,
+            have_allocation INTEGER NOT NULL DEFAULT 0,
+            has_pdf_honneur INTEGER NOT NULL DEFAULT 0,
+            has_pdf_rdv INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_members_wassit_no ON members(wassit_no)",
+        "CREATE INDEX IF NOT EXISTS idx_members_status ON members(status)",
+        "CREATE INDEX IF NOT EXISTS idx_members_has_rdv ON members(has_rdv)",
+        "CREATE INDEX IF NOT EXISTS idx_members_have_allocation ON members(have_allocation)",
+        "CREATE INDEX IF NOT EXISTS idx_members_has_pdf_honneur ON members(has_pdf_honneur)",
+        "CREATE INDEX IF NOT EXISTS idx_members_has_pdf_rdv ON members(has_pdf_rdv)",
+        "CREATE INDEX IF NOT EXISTS idx_members_position ON members(position)",
+        "CREATE TABLE IF NOT EXISTS storage_meta (key TEXT PRIMARY KEY, value TEXT)",
+    )
+
+    def __init__(self, db_path=MEMBERS_DB_FILE):
+        self.db_path = db_path
+        self._lock = threading.Lock() # الحفظ قد يتم من خيط الكتابة في الخلفية
+        self._connection = None
+        self._saved_rows_by_nin = {} # nin -> (position, member_dict) كما هي في قاعدة البيانات
+        self.last_save_stats = {"upserted": 0, "deleted": 0, "unchanged": 0}
+
+    def exists(self):
+        """True once the database has been written at least once (even if the roster is now empty)."""
+        if not os.path.exists(self.db_path):
+            return False
+        with self._lock:
+            return self._get_connection().execute("SELECT 1 FROM storage_meta WHERE key = 'initialized'").fetchone() is not None
+
+    def _get_connection(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                for statement in self.SCHEMA:
+                    connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def _row_values(position, member_dict, data_text):
+        return (
+            member_dict['nin'],
+            position,
+            member_dict.get('wassit_no'),
+            member_dict.get('status'),
+            1 if member_dict.get('already_has_rdv') else 0,
+            1 if member_dict.get('have_allocation') else 0,
+            1 if member_dict.get('pdf_honneur_path') else 0,
+            1 if member_dict.get('pdf_rdv_path') else 0,
+            data_text,
+        )
+
+    def load_member_dicts(self):
+        """Returns (member_dicts, source_path, from_backup) like JsonMemberStorage."""
+        try:
+            with self._lock:
+                rows = self._get_connection().execute("SELECT nin, position, data FROM members ORDER BY position").fetchall()
+                member_dicts = []
+                self._saved_rows_by_nin = {}
+                for nin, position, data_text in rows:
+                    member_dict = json.loads(data_text)
+                    member_dicts.append(member_dict)
+                    self._saved_rows_by_nin[nin] = (position, dict(member_dict))
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logger.exception(f"خطأ عند تحميل بيانات الأعضاء من قاعدة البيانات {self.db_path}: {e}")
+            raise MemberStorageError(f"خطأ في قراءة قاعدة بيانات الأعضاء {self.db_path}: {e}") from e
+        logger.info(f"تم تحميل بيانات {len(member_dicts)} أعضاء من {self.db_path}")
+        return member_dicts, self.db_path, False
+
+    def stream_member_dicts(self, batch_size=MEMBERS_LOAD_BATCH_SIZE):
+        """Returns (batches, source_path) like JsonMemberStorage; rows are read batch_size at a time in position order."""
+        return self._iter_row_batches(batch_size), self.db_path
+
+    def _iter_row_batches(self, batch_size):
+        self._saved_rows_by_nin = {}
+        last_position = -1
+        loaded_count = 0
+        while True:
+            try:
+                with self._lock: # القفل لكل دفعة فقط، وليس طوال التحميل
+                    rows = self._get_connection().execute(
+                        "SELECT nin, position, data FROM members WHERE position > ? ORDER BY position LIMIT ?",
+                        (last_position, batch_size)
+                    ).fetchall()
+                batch = []
+                for nin, position, data_text in rows:
+                    member_dict = json.loads(data_text)
+                    batch.append(member_dict)
+                    self._saved_rows_by_nin[nin] = (position, dict(member_dict))
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                logger.exception(f"خطأ عند تحميل بيانات الأعضاء من قاعدة البيانات {self.db_path}: {e}")
+                raise MemberStorageError(f"خطأ في قراءة قاعدة بيانات الأعضاء {self.db_path}: {e}") from e
+            if not rows:
+                break
+            last_position = rows[-1][1]
+            loaded_count += len(batch)
+            yield batch
+        logger.info(f"تم تحميل بيانات {loaded_count} أعضاء من {self.db_path} (تحميل تدريجي)")
+
+    def save_member_dicts(self, member_dicts):
+        """Upserts changed rows and deletes removed members in one transaction. Returns the number of rows written."""
+        rows_to_upsert = []
+        new_rows_by_nin = {}
+        duplicate_nins = []
+        for position, member_dict in enumerate(member_dicts):
+            nin = member_dict['nin']
+            if nin in new_rows_by_nin:
+                duplicate_nins.append(nin)
+                continue
+            saved_row = self._saved_rows_by_nin.get(nin)
+            if saved_row is not None and saved_row[0] == position and saved_row[1] == member_dict:
+                new_rows_by_nin[nin] = saved_row
+                continue
+            new_rows_by_nin[nin] = (position, dict(member_dict))
+            rows_to_upsert.append(self._row_values(position, member_dict, json.dumps(member_dict, ensure_ascii=False)))
+        if duplicate_nins:
+            # صف واحد لكل رقم تعريف: الدمج الصامت يُضيع أحد العضوين
+            duplicate_nins = sorted(set(duplicate_nins))
+            logger.error(f"رفض الحفظ في قاعدة البيانات {self.db_path}: أرقام تعريف مكررة {duplicate_nins}")
+            raise MemberStorageError(f"أرقام تعريف مكررة في قائمة الأعضاء: {', '.join(duplicate_nins)}")
+        nins_to_delete = [(nin,) for nin in self._saved_rows_by_nin if nin not in new_rows_by_nin]
+
+        try:
+            with self._lock:
+                connection = self._get_connection()
+                with connection:
+                    if nins_to_delete:
+                        connection.executemany("DELETE FROM members WHERE nin = ?", nins_to_delete)
+                    if rows_to_upsert:
+                        connection.executemany(
+                            """INSERT INTO members (nin, position, wassit_no, status, has_rdv, have_allocation, has_pdf_honneur, has_pdf_rdv, data)
+                               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                               ON CONFLICT(nin) DO UPDATE SET
+                                   position = excluded.position, wassit_no = excluded.wassit_no, status = excluded.status,
+                                   has_rdv = excluded.has_rdv, have_allocation = excluded.have_allocation,
+                                   has_pdf_honneur = excluded.has_pdf_honneur, has_pdf_rdv = excluded.has_pdf_rdv,
+                                   data = excluded.data""",
+                            rows_to_upsert
+                        )
+                    connection.execute("INSERT OR IGNORE INTO storage_meta (key, value) VALUES ('initialized', '1')")
+                self._saved_rows_by_nin = new_rows_by_nin
+        except sqlite3.Error as e:
+            raise MemberStorageError(f"خطأ في الكتابة إلى قاعدة بيانات الأعضاء {self.db_path}: {e}") from e
+
+        self.last_save_stats = {
+            "upserted": len(rows_to_upsert),
+            "deleted": len(nins_to_delete),
+            "unchanged": len(member_dicts) - len(rows_to_upsert),
+        }
+        logger.debug(f"حفظ قاعدة البيانات: {self.last_save_stats}")
+        return len(rows_to_upsert) + len(nins_to_delete)
+
+    def query_nins(self, filter_key, filter_value):
+        """NINs matching one filter-bar condition, answered from the indexes."""
+        column = self.FILTER_COLUMNS.get(filter_key)
+        if column is None:
+            raise ValueError(f"Unsupported filter key: {filter_key}")
+        if column != "status":
+            filter_value = 1 if filter_value else 0
+        with self._lock:
+            rows = self._get_connection().execute(
+                f"SELECT nin FROM members WHERE {column} = ?", (filter_value,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def migrate_json_storage(json_storage, target_storage):
+    """
+    One-shot import of members_data.json (or its .bak) into an empty storage (SQLite or binary snapshot).
+    Returns the number of migrated members (0 if there was nothing to do). Raises
+    MemberStorageError if the target refuses the data (e.g. duplicate NINs for SQLite).
+    """
+    if target_storage.exists() or not json_storage.exists():
+        return 0
+    member_dicts, source_path, _ = json_storage.load_member_dicts()
+    target_storage.save_member_dicts(member_dicts)
+    logger.info(f"تم ترحيل {len(member_dicts)} عضو من {source_path} إلى التخزين {target_storage.name}.")
+    return len(member_dicts)
+
+
+def create_member_storage(backend=MEMBERS_STORAGE_BACKEND):
+    """
+    Storage selected by MEMBERS_STORAGE_BACKEND. For SQLite and binary, existing JSON data is migrated on first use;
+    if that migration fails, the JSON storage is kept (the migration is retried on the next start).
+    """
+    if backend == "sqlite":
+        target_storage = SQLiteMemberStorage()
+    elif backend == "binary":
+        target_storage = BinaryMemberStorage()
+    else:
+        if backend != "json":
+            logger.warning(f"نوع تخزين غير معروف '{backend}'. سيتم استخدام JSON.")
+        return JsonMemberStorage()
+    try:
+        migrate_json_storage(JsonMemberStorage(), target_storage)
+    except MemberStorageError as e:
+        logger.error(f"فشل ترحيل بيانات الأعضاء من JSON إلى {target_storage.name}: {e}. سيتم الاستمرار على JSON.")
+        target_storage.close()
+        return JsonMemberStorage()
+    return target_storage
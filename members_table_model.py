@@ -0,0 +1,339 @@
+# members_table_model.py
+import logging
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QSortFilterProxyModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+from member_status import MemberStatus
+from utils import QColorConstants, StandardIconCache, get_icon_name_for_status
+
+logger = logging.getLogger(__name__)
+
+
+_STATUS_BACKGROUND_COLORS = {
+    MemberStatus.BENEFICIARY: QColorConstants.BENEFITING_GREEN_DARK_THEME,
+    MemberStatus.INVALID_INPUT: QColorConstants.PINK_DARK_THEME,
+    MemberStatus.HAS_PRIOR_RDV: QColorConstants.LIGHT_BLUE_DARK_THEME,
+    MemberStatus.INELIGIBLE_FOR_BOOKING: QColorConstants.ORANGE_RED_DARK_THEME,
+    MemberStatus.COMPLETED: QColorConstants.LIGHT_GREEN_DARK_THEME,
+    MemberStatus.PRE_INSCRIPTION_REQUIRED: QColorConstants.LIGHT_YELLOW_DARK_THEME,
+}
+for _status in MemberStatus:
+    if _status.is_error:
+        _STATUS_BACKGROUND_COLORS.setdefault(_status, QColorConstants.LIGHT_PINK_DARK_THEME)
+del _status
+
+
+def _status_background_color(status):
+    return _STATUS_BACKGROUND_COLORS.get(status)
+
+
+class MembersTableModel(QAbstractTableModel):
+    """
+    Table model over the main members list held by a MemberRegistry.
+    Source rows are the original member indices, so the signals coming from
+    the threads (original_index, ...) map directly to a row.
+    """
+    COL_ICON, COL_FULL_NAME_AR, COL_NIN, COL_WASSIT, COL_CCP, COL_PHONE_NUMBER, COL_STATUS, COL_RDV_DATE, COL_DETAILS = range(9)
+    HEADERS = [
+        "أيقونة", "الاسم الكامل", "رقم التعريف", "رقم الوسيط",
+        "الحساب البريدي", "رقم الهاتف", "الحالة", "تاريخ الموعد", "آخر تحديث/خطأ"
+    ]
+
+    def __init__(self, member_registry, parent=None):
+        super().__init__(parent)
+        self.member_registry = member_registry
+        self._icon_name_by_id = {} # الأيقونة المرسلة مع آخر إشارة تحديث (إن وجدت)
+        self._icon_cache = StandardIconCache()
+        self._rendered_by_id = {} # آخر قيم معروضة لكل عضو، لإرسال dataChanged للخلايا المتغيرة فقط
+        self._spinner_member_id = None
+        self._spinner_char = ""
+
+    # --- واجهة QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.member_registry.members)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal and 0 <= section < len(self.HEADERS):
+            return self.HEADERS[section]
+        if orientation == Qt.Vertical:
+            return section + 1
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        member = self.member_at(index.row())
+        if member is None:
+            return None
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            if col == self.COL_ICON:
+                return self._spinner_char if self._is_spinner_member(member) else ""
+            return self._display_text(member, col)
+        if role == Qt.DecorationRole:
+            if col == self.COL_ICON and not self._is_spinner_member(member):
+                return self._icon_cache.icon(self._icon_name_for(member))
+            return None
+        if role == Qt.ToolTipRole:
+            if col == self.COL_DETAILS:
+                return member.full_last_activity_detail
+            return None
+        if role == Qt.TextAlignmentRole:
+            if col in (self.COL_ICON, self.COL_RDV_DATE):
+                return Qt.AlignCenter
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == Qt.BackgroundRole:
+            if member.is_processing:
+                return QColorConstants.PROCESSING_ROW_DARK_THEME
+            return _status_background_color(member.status)
+        if role == Qt.ForegroundRole:
+            if member.is_processing:
+                return QColor(Qt.white)
+            return None
+        return None
+
+    # --- قيم العرض ---
+    def _display_text(self, member, col):
+        if col == self.COL_FULL_NAME_AR:
+            return member.get_full_name_ar()
+        if col == self.COL_NIN:
+            return member.nin
+        if col == self.COL_WASSIT:
+            return member.wassit_no
+        if col == self.COL_CCP:
+            if len(member.ccp) == 12:
+                return f"{member.ccp[:10]} {member.ccp[10:]}"
+            return member.ccp
+        if col == self.COL_PHONE_NUMBER:
+            return member.phone_number or ""
+        if col == self.COL_STATUS:
+            return member.status.text # نص عادي: Qt لا يعرض صنفًا فرعيًا من str (يُغلَّف كـ PyQt_PyObject)
+        if col == self.COL_RDV_DATE:
+            rdv_date_display_text = member.rdv_date if member.rdv_date else ""
+            if member.rdv_date:
+                if member.rdv_source == "system":
+                    rdv_date_display_text += " (نظام)"
+                elif member.rdv_source == "discovered":
+                    rdv_date_display_text += " (مكتشف)"
+            return rdv_date_display_text
+        if col == self.COL_DETAILS:
+            return member.last_activity_detail
+        return ""
+
+    def _icon_name_for(self, member):
+        return self._icon_name_by_id.get(member.member_id) or get_icon_name_for_status(member.status)
+
+    def _is_spinner_member(self, member):
+        return self._spinner_member_id is not None and member.member_id == self._spinner_member_id and member.is_processing
+
+    def _render_row(self, member):
+        """Values that decide how each cell of the row looks. Compared to find the touched cells."""
+        row_style = (member.is_processing, member.status)
+        rendered = []
+        for col in range(len(self.HEADERS)):
+            if col == self.COL_ICON:
+                is_spinner = self._is_spinner_member(member)
+                value = (self._spinner_char if is_spinner else self._icon_name_for(member), is_spinner)
+            elif col == self.COL_DETAILS:
+                value = (member.last_activity_detail, member.full_last_activity_detail)
+            else:
+                value = self._display_text(member, col)
+            rendered.append((value, row_style))
+        return rendered
+
+    # --- الوصول إلى الأعضاء ---
+    def member_at(self, row):
+        members = self.member_registry.members
+        if 0 <= row < len(members):
+            return members[row]
+        return None
+
+    # --- التحديثات ---
+    def refresh_member(self, original_index, icon_name_str=None):
+        """
+        Re-reads the member at original_index and emits dataChanged only for
+        the span of columns whose rendered value actually changed.
+        """
+        member = self.member_at(original_index)
+        if member is None:
+            return
+        if icon_name_str:
+            self._icon_name_by_id[member.member_id] = icon_name_str
+
+        new_rendered = self._render_row(member)
+        old_rendered = self._rendered_by_id.get(member.member_id)
+        self._rendered_by_id[member.member_id] = new_rendered
+
+        if old_rendered is None:
+            changed_cols = range(len(new_rendered))
+        else:
+            changed_cols = [col for col, value in enumerate(new_rendered) if value != old_rendered[col]]
+        if not changed_cols:
+            return
+        self.dataChanged.emit(self.index(original_index, min(changed_cols)), self.index(original_index, max(changed_cols)))
+
+    def set_spinner(self, original_index, spinner_char):
+        """Shows spinner_char in the icon cell of the member at original_index (and removes it elsewhere)."""
+        member = self.member_at(original_index)
+        new_spinner_id = member.member_id if member is not None else None
+        previous_index = self.member_registry.index_of_id(self._spinner_member_id) if self._spinner_member_id is not None else -1
+        self._spinner_member_id = new_spinner_id
+        self._spinner_char = spinner_char
+        if previous_index != -1 and previous_index != original_index:
+            self.refresh_member(previous_index)
+        if member is not None:
+            self.refresh_member(original_index)
+
+    def clear_spinner(self):
+        self.set_spinner(-1, "")
+
+    def invalidate_icons(self):
+        """Drops the cached icons (style or theme changed) and repaints the icon column."""
+        self._icon_cache.invalidate()
+        last_row = len(self.member_registry.members) - 1
+        if last_row >= 0:
+            self.dataChanged.emit(self.index(0, self.COL_ICON), self.index(last_row, self.COL_ICON), [Qt.DecorationRole])
+
+    def reset_members(self):
+        """Full reset, used only when the whole list is replaced (e.g. after loading the data file)."""
+        self.beginResetModel()
+        self._icon_name_by_id.clear()
+        self._rendered_by_id.clear()
+        self._spinner_member_id = None
+        self._spinner_char = ""
+        self.endResetModel()
+
+    def append_member(self, member):
+        row = len(self.member_registry.members)
+        self.beginInsertRows(QModelIndex(), row, row)
+        original_index = self.member_registry.append(member)
+        self.endInsertRows()
+        return original_index
+
+    def append_members(self, members):
+        """Appends a batch of members as one block of rows (used by the progressive loader)."""
+        if not members:
+            return
+        first_row = len(self.member_registry.members)
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(members) - 1)
+        self.member_registry.extend(members)
+        self.endInsertRows()
+
+    def remove_member_at(self, original_index):
+        member = self.member_at(original_index)
+        if member is None:
+            return None
+        self.beginRemoveRows(QModelIndex(), original_index, original_index)
+        self.member_registry.pop(original_index)
+        self.endRemoveRows()
+        self._forget(member)
+        return member
+
+    def remove_members(self, members_to_remove):
+        """Removes several members, one contiguous block of rows at a time. Returns the number removed."""
+        indices = sorted({self.member_registry.index_of(m) for m in members_to_remove} - {-1}, reverse=True)
+        removed_count = 0
+        block_start = 0
+        while block_start < len(indices):
+            block_end = block_start
+            while block_end + 1 < len(indices) and indices[block_end + 1] == indices[block_end] - 1:
+                block_end += 1
+            first_row, last_row = indices[block_end], indices[block_start]
+            block_members = self.member_registry.members[first_row:last_row + 1]
+            self.beginRemoveRows(QModelIndex(), first_row, last_row)
+            removed_count += self.member_registry.remove_many(block_members)
+            self.endRemoveRows()
+            for member in block_members:
+                self._forget(member)
+            block_start = block_end + 1
+        return removed_count
+
+    def _forget(self, member):
+        self._icon_name_by_id.pop(member.member_id, None)
+        self._rendered_by_id.pop(member.member_id, None)
+        if self._spinner_member_id == member.member_id:
+            self._spinner_member_id = None
+            self._spinner_char = ""
+
+
+class MembersFilterProxyModel(QSortFilterProxyModel):
+    """Search and filter bar of the main window, applied without rebuilding the table."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._search_term = ""
+        self._filter_key = None
+        self._filter_value = None
+        self._matching_nins = None
+        self.setDynamicSortFilter(True)
+
+    def set_filter(self, search_term, filter_key, filter_value, matching_nins=None):
+        """
+        matching_nins: optional set of NINs already matching filter_key/filter_value
+        (answered by an indexed storage query); it replaces the per-row check.
+        """
+        self._search_term = (search_term or "").lower().strip()
+        self._filter_key = filter_key
+        self._filter_value = filter_value
+        self._matching_nins = matching_nins
+        self.invalidateFilter()
+
+    def is_filter_active(self):
+        return bool(self._search_term or (self._filter_key and self._filter_value is not None))
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        member = self.sourceModel().member_at(source_row)
+        if member is None:
+            return False
+
+        if self._search_term:
+            search_term = self._search_term
+            match_search = (search_term in (member.nin or "").lower() or
+                            search_term in (member.wassit_no or "").lower() or
+                            search_term in (member.get_full_name_ar() or "").lower() or
+                            search_term in (member.nom_fr or "").lower() or
+                            search_term in (member.prenom_fr or "").lower() or
+                            search_term in (member.phone_number or "").lower() or
+                            search_term in (member.ccp or "").lower())
+            if not match_search:
+                return False
+
+        if self._filter_key and self._filter_value is not None:
+            if self._matching_nins is not None:
+                return member.nin in self._matching_nins
+            if self._filter_key == "status":
+                return member.status == self._filter_value
+            if self._filter_key == "has_rdv":
+                return member.already_has_rdv == self._filter_value
+            if self._filter_key == "have_allocation":
+                return member.have_allocation == self._filter_value
+            if self._filter_key == "pdf_honneur":
+                return bool(member.pdf_honneur_path) == self._filter_value
+            if self._filter_key == "pdf_rdv":
+                return bool(member.pdf_rdv_path) == self._filter_value
+        return True
+
+    # --- التحويل بين صفوف العرض والفهارس الأصلية ---
+    def original_index_at(self, view_row):
+        """Original member index shown at view_row, or -1."""
+        source_index = self.mapToSource(self.index(view_row, 0))
+        return source_index.row() if source_index.isValid() else -1
+
+    def view_row_of(self, original_index):
+        """Row in the view showing the member at original_index, or -1 if it is filtered out."""
+        source_model = self.sourceModel()
+        if not (0 <= original_index < source_model.rowCount()):
+            return -1
+        proxy_index = self.mapFromSource(source_model.index(original_index, 0))
+        return proxy_index.row() if proxy_index.isValid() else -1
@@ -0,0 +1,125 @@
+# pdf_download.py
+"""
+Streaming extraction of the base64 PDF returned by the download/* endpoints.
+
+The server answers with either a JSON string ("JVBERi0...") or an object with a
+"base64Pdf" field. Base64PdfWriter is fed the raw response chunks, finds the start of
+the base64 text, decodes it in fixed-size blocks and writes the PDF bytes as it goes,
+so memory stays bounded by the chunk and block sizes whatever the size of the PDF.
+"""
+import os
+import re
+import binascii
+
+DECODE_BLOCK_SIZE = 64 * 1024 # عدد أحرف base64 التي تُفك في كل مرة (مضاعف لـ 4)
+MAX_PREFIX_BYTES = 64 * 1024 # أقصى حجم يُقرأ قبل العثور على بداية حقل base64Pdf
+
+_FIELD_START_RE = re.compile(rb'"base64Pdf"\s*:\s*"')
+_SEEK, _DATA, _DONE = range(3)
+
+
+class PdfStreamError(ValueError):
+    """The response does not hold a base64 PDF (no JSON string / "base64Pdf" field, truncated or empty)."""
+    pass
+
+
+class Base64PdfWriter:
+    """Decodes the base64 PDF of a download response fed in chunks and writes it to out."""
+
+    def __init__(self, out, block_size=DECODE_BLOCK_SIZE):
+        self._out = out
+        self._block_size = block_size - block_size % 4 or 4
+        self._state = _SEEK
+        self._prefix = b""
+        self._carry = b""
+        self._pending = bytearray()
+        self.bytes_written = 0
+
+    def _write_decoded(self, final=False):
+        size = len(self._pending) if final else len(self._pending) - len(self._pending) % 4
+        if size:
+            decoded = binascii.a2b_base64(self._pending[:size])
+            del self._pending[:size]
+            self._out.write(decoded)
+            self.bytes_written += len(decoded)
+
+    def _find_data_start(self, chunk):
+        """Returns the part of chunk after the opening quote of the base64 text, or None if it is not there yet."""
+        self._prefix += chunk
+        stripped = self._prefix.lstrip()
+        if not stripped:
+            return None
+        if stripped[:1] == b'"':
+            return stripped[1:]
+        if stripped[:1] != b'{':
+            raise PdfStreamError("Response is neither a JSON string nor a JSON object")
+        match = _FIELD_START_RE.search(self._prefix)
+        if match is None:
+            if len(self._prefix) > MAX_PREFIX_BYTES:
+                raise PdfStreamError("No base64Pdf field in the response")
+            return None
+        return self._prefix[match.end():]
+
+    def feed(self, chunk):
+        if self._state == _DONE or not chunk:
+            return
+        if self._state == _SEEK:
+            chunk = self._find_data_start(chunk)
+            if chunk is None:
+                return
+            self._prefix = b""
+            self._state = _DATA
+
+        if self._carry:
+            chunk = self._carry + chunk
+            self._carry = b""
+        end = chunk.find(b'"')
+        part = chunk if end == -1 else chunk[:end]
+        if b'\\' in part:
+            if end == -1:
+                trailing = len(part) - len(part.rstrip(b'\\'))
+                if trailing % 2:
+                    # محرف الهروب في نهاية القطعة: يُكمل مع القطعة التالية
+                    self._carry = b'\\'
+                    part = part[:-1]
+            # ترميز JSON قد يهرّب "/" أو يضيف فواصل أسطر داخل نص base64
+            part = part.replace(b'\\/', b'/').replace(b'\\r', b'').replace(b'\\n', b'')
+            if b'\\' in part:
+                raise PdfStreamError("Unexpected escape sequence in the base64 text")
+        self._pending += part
+        if end != -1:
+            self._write_decoded(final=True)
+            self._state = _DONE
+        elif len(self._pending) >= self._block_size:
+            self._write_decoded()
+
+    def close(self):
+        """Checks that a complete, non-empty PDF was written. Returns the number of bytes written."""
+        if self._state != _DONE:
+            raise PdfStreamError("Response ended before the end of the base64 PDF" if self._state == _DATA else "No base64 PDF in the response")
+        if not self.bytes_written:
+            raise PdfStreamError("Empty base64 PDF")
+        return self.bytes_written
+
+
+def write_base64_pdf(chunks, file_path, block_size=DECODE_BLOCK_SIZE):
+    """
+    Writes the PDF held in the download response chunks to file_path through a temporary
+    file (os.replace at the end, so a failed download never leaves a partial PDF).
+    Returns the size of the PDF. Raises PdfStreamError, binascii.Error or OSError.
+    """
+    tmp_path = file_path + ".part"
+    try:
+        with open(tmp_path, 'wb') as f:
+            writer = Base64PdfWriter(f, block_size)
+            for chunk in chunks:
+                writer.feed(chunk)
+            size = writer.close()
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return size
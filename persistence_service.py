@@ -0,0 +1,180 @@
+# persistence_service.py
+import threading
+import logging
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from config import (
+    MEMBERS_SAVE_DEBOUNCE_SECONDS, MEMBERS_JOURNAL_COMPACT_BYTES, MEMBERS_JOURNAL_COMPACT_CHECK_SECONDS
+)
+from member_storage import MemberStorageError
+
+logger = logging.getLogger(__name__)
+
+
+class MembersPersistenceService(QObject):
+    """
+    Writes the members snapshot to a member storage (JSON file or SQLite) on behalf of the main window.
+    request_save() only marks the data as dirty; the pending changes are written
+    at most once every debounce_seconds, or immediately by flush() (e.g. on close).
+    When a MemberJournal is given, each snapshot also compacts the journal, and
+    the snapshot itself is written on a background thread.
+    """
+    save_failed_signal = pyqtSignal(str)
+    _snapshot_written_signal = pyqtSignal(int, bool, str) # (الجيل، النجاح، رسالة الخطأ)
+
+    def __init__(self, member_registry, member_storage, member_journal=None, debounce_seconds=MEMBERS_SAVE_DEBOUNCE_SECONDS, parent=None):
+        super().__init__(parent)
+        self.member_registry = member_registry
+        self.member_storage = member_storage
+        self.member_journal = member_journal
+        self._dirty = False
+        self._held = False
+        self._writer_thread = None
+        self._writer_generation = 0
+        self._writer_result = None
+        self.requested_count = 0
+        self.performed_count = 0
+        self.skipped_count = 0 # طلبات حفظ دُمجت في كتابة معلقة أو لم يكن هناك ما يُحفظ
+        self.failed_count = 0
+        self.compaction_count = 0
+
+        self._snapshot_written_signal.connect(self._on_background_snapshot_written)
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(int(debounce_seconds * 1000))
+        self._save_timer.timeout.connect(self._on_save_timer)
+
+        self._compaction_check_timer = QTimer(self)
+        self._compaction_check_timer.setInterval(MEMBERS_JOURNAL_COMPACT_CHECK_SECONDS * 1000)
+        self._compaction_check_timer.timeout.connect(self._check_journal_size)
+        if self.member_journal is not None:
+            self._compaction_check_timer.start()
+
+    def request_save(self):
+        self.requested_count += 1
+        if self._dirty:
+            self.skipped_count += 1
+        self._dirty = True
+        if not self._save_timer.isActive():
+            self._save_timer.start()
+
+    def is_dirty(self):
+        return self._dirty
+
+    def hold(self):
+        """
+        Suspends writes while the members list is only partially loaded: a snapshot
+        taken now would drop the members not loaded yet. Requests are kept and written after release().
+        """
+        self._held = True
+
+    def release(self):
+        self._held = False
+        if self._dirty and not self._save_timer.isActive():
+            self._save_timer.start()
+
+    def flush(self):
+        """
+        Writes pending changes (and pending journal records) now, on the calling thread.
+        Returns False only if a write was needed and failed.
+        """
+        self._save_timer.stop()
+        if self._writer_thread is not None:
+            self._writer_thread.join()
+            # نتيجة الكتابة الخلفية تُعالج هنا؛ إشارتها المعلقة في الطابور تُتجاهل (الجيل تغير)
+            self._writer_generation += 1
+            self._on_snapshot_written(*self._writer_result)
+        if self._held:
+            # القائمة غير مكتملة: التغييرات محفوظة في ملف السجل وتُطبق عند التحميل التالي
+            logger.warning("تم تخطي حفظ بيانات الأعضاء لأن تحميلها لم يكتمل بعد.")
+            return True
+        journal_pending = self.member_journal is not None and self.member_journal.has_pending_records()
+        if not self._dirty and not journal_pending:
+            self.skipped_count += 1
+            return True
+        data_to_save = self._take_snapshot()
+        success, error_message = self._write_snapshot_file(data_to_save)
+        self._on_snapshot_written(success, error_message)
+        return success
+
+    def stats(self):
+        return {
+            "requested": self.requested_count,
+            "performed": self.performed_count,
+            "skipped": self.skipped_count,
+            "failed": self.failed_count,
+            "compactions": self.compaction_count,
+            "journal_records": self.member_journal.records_written if self.member_journal is not None else 0,
+            "dirty": self._dirty,
+        }
+
+    def _check_journal_size(self):
+        if self.member_journal.size_bytes() >= MEMBERS_JOURNAL_COMPACT_BYTES:
+            logger.info(f"حجم ملف السجل تجاوز {MEMBERS_JOURNAL_COMPACT_BYTES} بايت. جدولة دمجه في ملف البيانات.")
+            self.request_save()
+
+    def _on_save_timer(self):
+        if not self._dirty or self._held:
+            return
+        if self._writer_thread is not None:
+            # كتابة سابقة لا تزال جارية في الخلفية: نؤجل هذه الكتابة
+            self._save_timer.start()
+            return
+        data_to_save = self._take_snapshot()
+        if self.member_journal is None:
+            success, error_message = self._write_snapshot_file(data_to_save)
+            self._on_snapshot_written(success, error_message)
+            return
+        self._writer_generation += 1
+        self._writer_result = None
+        self._writer_thread = threading.Thread(target=self._background_write, args=(data_to_save, self._writer_generation), name="MembersSnapshotWriter", daemon=True)
+        self._writer_thread.start()
+
+    def _take_snapshot(self):
+        # يتم على الخيط الرئيسي: تدوير السجل أولاً ثم التقاط الحالة، فكل سجل لاحق يبقى في السجل الجديد
+        if self.member_journal is not None:
+            self.member_journal.begin_compaction()
+        data_to_save = []
+        for member in self.member_registry.members:
+            member_dict = member.to_dict()
+            member_dict['is_processing'] = False
+            data_to_save.append(member_dict)
+        self._dirty = False
+        return data_to_save
+
+    def _background_write(self, data_to_save, generation):
+        success, error_message = self._write_snapshot_file(data_to_save)
+        self._writer_result = (success, error_message)
+        self._snapshot_written_signal.emit(generation, success, error_message)
+
+    def _on_background_snapshot_written(self, generation, success, error_message):
+        if generation != self._writer_generation:
+            # flush() انتظر هذه الكتابة وعالج نتيجتها بالفعل
+            return
+        self._on_snapshot_written(success, error_message)
+
+    def _on_snapshot_written(self, success, error_message):
+        self._writer_thread = None
+        if success:
+            self.performed_count += 1
+            if self.member_journal is not None:
+                self.member_journal.finish_compaction()
+                self.compaction_count += 1
+            logger.info(f"تم حفظ بيانات الأعضاء بنجاح ({self.member_storage.name}) (كتابات: {self.performed_count}، طلبات مدمجة: {self.skipped_count})")
+        else:
+            self.failed_count += 1
+            self._dirty = True # سجل .compacting يبقى ويُعاد تطبيقه عند التحميل حتى تنجح كتابة لاحقة
+            self.save_failed_signal.emit(error_message)
+
+    def _write_snapshot_file(self, data_to_save):
+        try:
+            self.member_storage.save_member_dicts(data_to_save)
+            return True, ""
+        except MemberStorageError as e:
+            logger.error(f"خطأ عند حفظ بيانات الأعضاء ({self.member_storage.name}): {e}")
+            return False, str(e)
+        except Exception as e:
+            logger.exception(f"خطأ غير متوقع عند حفظ بيانات الأعضاء ({self.member_storage.name}): {e}")
+            return False, str(e)
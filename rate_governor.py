@@ -0,0 +1,129 @@
+# rate_governor.py
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class RequestGovernor:
+    """
+    Process-wide token bucket shared by every AnemAPIClient (config.REQUEST_GOVERNOR).
+    Requests wait for a token (requests_per_second, up to burst at once); a 429 seen by
+    any thread starts a shared cooldown during which no thread sends anything.
+    requests_per_second=None disables the ceiling (the cooldown still applies).
+    """
+
+    def __init__(self, requests_per_second, burst=1):
+        self._cond = threading.Condition()
+        self._rate = requests_per_second
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._last_refill = time.monotonic()
+        self._cooldown_until = 0.0
+        self._cooldown_started = 0.0
+        self._waiting = 0
+        self.throttled_requests = 0
+        self.total_wait_seconds = 0.0
+        self.cooldowns = 0
+
+    def _refill(self, now):
+        if now <= self._last_refill:
+            return # لا تتراكم الرموز قبل نهاية التهدئة
+        if self._rate:
+            self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self._rate)
+        else:
+            self._tokens = float(self._burst)
+        self._last_refill = now
+
+    def _delay_before_next_token(self, now):
+        """Seconds until a request may be sent (0 if it may be sent now). Caller holds the lock."""
+        self._refill(now)
+        cooldown_delay = self._cooldown_until - now
+        if cooldown_delay > 0:
+            return cooldown_delay
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self._rate
+
+    def acquire(self):
+        """Blocks until a request may be sent. Returns the send time to pass to report_429."""
+        start = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    delay = self._delay_before_next_token(time.monotonic())
+                    if delay <= 0:
+                        self._tokens -= 1
+                        break
+                    self._cond.wait(delay)
+            finally:
+                self._waiting -= 1
+            sent_at = time.monotonic()
+            waited = sent_at - start
+            if waited > 0.001:
+                self.throttled_requests += 1
+                self.total_wait_seconds += waited
+        return sent_at
+
+    def try_acquire_delay(self):
+        """
+        Non-blocking acquire (for asyncio callers): takes a token and returns 0 if a request
+        may be sent now, otherwise takes nothing and returns the seconds to wait before asking again.
+        """
+        with self._cond:
+            delay = self._delay_before_next_token(time.monotonic())
+            if delay > 0:
+                return delay
+            self._tokens -= 1
+            return 0.0
+
+    def try_acquire(self):
+        """Takes a token if one is available right now (for optional requests such as keep-alive pings)."""
+        return self.try_acquire_delay() == 0
+
+    def report_429(self, cooldown_seconds, sent_at=None):
+        """
+        Extends the shared cooldown: no thread sends a request for cooldown_seconds.
+        A 429 for a request sent (sent_at, from acquire) before the current cooldown
+        started is already accounted for and does not extend it.
+        """
+        with self._cond:
+            now = time.monotonic()
+            if sent_at is not None and sent_at < self._cooldown_started:
+                return
+            cooldown_until = now + cooldown_seconds
+            if cooldown_until > self._cooldown_until:
+                self._cooldown_until = cooldown_until
+                self._cooldown_started = now
+                self.cooldowns += 1
+                logger.warning(f"تهدئة مشتركة لكل الطلبات لمدة {cooldown_seconds:.1f} ثانية بعد خطأ 429.")
+            # بعد انتهاء التهدئة تُستأنف الطلبات تدريجيًا بدل دفعة كاملة: الرموز تبدأ بالتراكم عند نهايتها فقط
+            self._tokens = min(self._tokens, 0.0)
+            self._last_refill = max(self._last_refill, self._cooldown_until)
+            self._cond.notify_all()
+
+    def set_rate(self, requests_per_second, burst=None):
+        with self._cond:
+            self._refill(time.monotonic())
+            self._rate = requests_per_second
+            if burst is not None:
+                self._burst = max(1, burst)
+                self._tokens = min(self._tokens, self._burst)
+            self._cond.notify_all()
+
+    def stats(self):
+        """Current budget (tokens), queue depth (threads waiting), remaining cooldown and totals."""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "requests_per_second": self._rate,
+                "budget": round(max(self._tokens, 0.0), 2),
+                "queue_depth": self._waiting,
+                "cooldown_remaining": round(max(0.0, self._cooldown_until - now), 2),
+                "throttled_requests": self.throttled_requests,
+                "total_wait_seconds": round(self.total_wait_seconds, 2),
+                "cooldowns": self.cooldowns,
+            }
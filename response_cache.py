@@ -0,0 +1,142 @@
+# response_cache.py
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(endpoint, params):
+    """Endpoint + normalised params: the same params in another order or with extra spaces give the same key."""
+    if not params:
+        return endpoint, ()
+    return endpoint, tuple(sorted((name, str(value).strip()) for name, value in params.items() if value is not None))
+
+
+class ResponseCache:
+    """
+    Process-wide TTL + LRU cache of successful GET responses (config.RESPONSE_CACHE),
+    shared by every AnemAPIClient so a request repeated by another thread within the
+    endpoint's TTL is answered locally. Only endpoints listed in ttl_by_endpoint are
+    cached. Entries can carry a tag (the preInscriptionId of the member) so that
+    invalidate(tag) drops everything known about one member, e.g. after a booking.
+    """
+
+    def __init__(self, ttl_by_endpoint, max_entries=512):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # (endpoint, params) -> (expires_at, data, tag)
+        self.ttl_by_endpoint = dict(ttl_by_endpoint)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def caches(self, endpoint):
+        return self.ttl_by_endpoint.get(endpoint, 0) > 0
+
+    def get(self, endpoint, params):
+        """Returns the cached data, or None on a miss (or if the entry expired)."""
+        key = request_key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, endpoint, params, data, tag=None):
+        ttl = self.ttl_by_endpoint.get(endpoint, 0)
+        if ttl <= 0 or data is None:
+            return
+        key = request_key(endpoint, params)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, data, tag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tag=None):
+        """Drops the entries carrying tag (a preInscriptionId), or every entry if tag is None."""
+        with self._lock:
+            if tag is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                stale_keys = [key for key, entry in self._entries.items() if entry[2] == tag]
+                for key in stale_keys:
+                    del self._entries[key]
+                removed = len(stale_keys)
+            self.invalidations += removed
+        if removed:
+            logger.debug(f"تم إبطال {removed} استجابة مخزنة مؤقتًا (الوسم: {tag}).")
+        return removed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Request coalescing shared by every AnemAPIClient (config.REQUEST_COALESCER): while a
+    request is in flight, identical requests (same method, endpoint and params) from
+    other threads wait for it and get its result instead of being sent again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.requests_saved = 0
+
+    def do(self, method, endpoint, params, func):
+        """Returns func() - run by the first caller only - for every concurrent identical call."""
+        key = (method,) + request_key(endpoint, params)
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _InFlightCall()
+            else:
+                self.requests_saved += 1
+        if not is_leader:
+            logger.debug(f"انتظار طلب مماثل قيد التنفيذ: {method} {endpoint} ({params})")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "requests_saved": self.requests_saved}
@@ -3,6 +3,11 @@ from PyQt5.QtGui import QColor
 from PyQt5.QtWidgets import QApplication, QStyle
 import sys # << تم التأكد من وجود هذا السطر
 import os  # << تم التأكد من وجود هذا السطر
+import logging
+
+from member_status import MemberStatus
+
+logger = logging.getLogger(__name__)
 
 class QColorConstants: # Dark Theme Specific Colors
     PINK_DARK_THEME = QColor(176, 56, 73)
@@ -19,30 +24,42 @@ def get_icon_name_for_status(status_text):
     Determines the QStyle standard pixmap name string based on member status.
     Returns a string like "SP_DialogYesButton".
     """
-    # Order matters: more specific checks should come before general ones.
-
-    if status_text == "مستفيد حاليًا من المنحة": return "SP_ FEATURE_खुशी" # Using a "happy" or "star" like icon if available, SP_DialogApplyButton as fallback
-    if status_text == "مكتمل": return "SP_DialogYesButton"
-    if status_text == "تم الحجز": return "SP_DialogSaveButton"
-    if status_text == "تم جلب المعلومات": return "SP_DialogApplyButton"
-    if status_text == "تم التحقق": return "SP_DialogApplyButton"
-    if status_text == "تم التحقق (فوري)": return "SP_DialogApplyButton"
-    if status_text == "تم جلب المعلومات (فوري)": return "SP_DialogApplyButton"
+    return MemberStatus.from_text(status_text).icon_name
 
 
-    if "فشل" in status_text or "خاطئة" in status_text or "خطأ" in status_text: return "SP_MessageBoxCritical"
-    if "غير مؤهل" in status_text : return "SP_MessageBoxCritical"
+class StandardIconCache:
+    """
+    QIcon per QStyle standard pixmap name (e.g. "SP_DialogYesButton"), built once.
+    The cache is tied to the application style: it empties itself when
+    QApplication.style() changes, and invalidate() can be called on theme changes.
+    """
 
-    if "لديه موعد مسبق" in status_text: return "SP_MessageBoxInformation"
-    if "يتطلب تسجيل مسبق" in status_text: return "SP_MessageBoxWarning"
-    if "لا توجد مواعيد" in status_text: return "SP_MessageBoxInformation"
-    if status_text == "فشل بشكل متكرر": return "SP_MessageBoxWarning"
+    def __init__(self, fallback_pixmap=QStyle.SP_CustomBase):
+        self._fallback_pixmap = fallback_pixmap
+        self._icons = {}
+        self._style = None
 
-    if "جاري" in status_text or "البحث" in status_text or "محاولة" in status_text : return "SP_ArrowRight"
+    def icon(self, icon_name):
+        style = QApplication.style()
+        if style is not self._style:
+            self._icons.clear()
+            self._style = style
+        icon = self._icons.get(icon_name)
+        if icon is None:
+            pixmap = getattr(QStyle, icon_name, None) if icon_name else None
+            if pixmap is None:
+                logger.warning(f"اسم أيقونة غير معروف: {icon_name!r}. سيتم استخدام الأيقونة الافتراضية.")
+                pixmap = self._fallback_pixmap
+            icon = style.standardIcon(pixmap)
+            self._icons[icon_name] = icon
+        return icon
 
-    if status_text == "جديد": return "SP_CustomBase"
+    def icon_for_status(self, status):
+        return self.icon(MemberStatus.from_text(status).icon_name)
 
-    return "SP_CustomBase"
+    def invalidate(self):
+        self._icons.clear()
+        self._style = None
 
 # -->> هذه هي الدالة الجديدة المضافة <<--
 def resource_path(relative_path):